@@ -0,0 +1,119 @@
+"""Benchmark: fechamento de trades com o TradeService síncrono x AsyncTradeService
+
+Uso: python -m benchmarks.bench_async [--trades N] [--clients 1 10 100] [--backend file sqlite]
+
+Cada cliente fecha trades até esgotar a fila. O serviço síncrono é
+compartilhado atrás de um lock (como no daemon), pois é bloqueante e não
+thread-safe; o assíncrono atende todos os clientes no mesmo loop de eventos.
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from models.account import TradePlan
+from models.trade import TradeResult, TradeType
+from core.logging import logger
+from services.trade_service import TradeService
+from services.async_trade_service import AsyncTradeService
+
+# Resultado informado explicitamente: mede apenas o custo de leitura/gravação
+RESULT = 2.5
+
+def _plan() -> TradePlan:
+    return TradePlan(initial_balance=10000.0, risk_per_trade=1.0, total_trades=100, leverage=1)
+
+def _trades(n: int) -> list:
+    now = datetime.now()
+    return [
+        TradeResult(type=TradeType.LONG, entry=100.0, target=110.0, stop=95.0, result=0,
+                    balance_before=10000.0, balance_after=10000.0, timestamp=now,
+                    leverage=1, position_size_percent=50.0)
+        for _ in range(n)
+    ]
+
+def _sync_backend(backend: str, directory: Path):
+    if backend == 'sqlite':
+        from repositories.sqlalchemy_repository import SQLAlchemyRepository, SQLAlchemyUnitOfWork
+        repository = SQLAlchemyRepository(f'sqlite:///{directory}/trades.db')
+        return repository, SQLAlchemyUnitOfWork(repository)
+    from repositories.file_repository import FileRepository, FileUnitOfWork
+    repository = FileRepository(str(directory / 'trades.json'))
+    return repository, FileUnitOfWork(repository)
+
+def _async_backend(backend: str, directory: Path, sync_repository):
+    if backend == 'sqlite':
+        from repositories.async_sqlalchemy_repository import AsyncSQLAlchemyRepository, AsyncSQLAlchemyUnitOfWork
+        repository = AsyncSQLAlchemyRepository(f'sqlite:///{directory}/trades.db')
+        return repository, AsyncSQLAlchemyUnitOfWork(repository)
+    from repositories.async_file_repository import AsyncFileRepository, AsyncFileUnitOfWork
+    repository = AsyncFileRepository(sync_repository)
+    return repository, AsyncFileUnitOfWork(repository)
+
+def run_sync(backend: str, n: int, clients: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        repository, unit_of_work = _sync_backend(backend, Path(directory))
+        trades = _trades(n)
+        repository.add_many(trades)
+        service = TradeService(_plan(), repository, unit_of_work)
+        ids = iter([trade.id for trade in trades])
+        lock = threading.Lock()
+
+        def client():
+            while True:
+                with lock:
+                    trade_id = next(ids, None)
+                    if trade_id is None:
+                        return
+                    service.close_trade(trade_id, 105.0, RESULT)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            for future in [executor.submit(client) for _ in range(clients)]:
+                future.result()
+        return n / (time.perf_counter() - started)
+
+def run_async(backend: str, n: int, clients: int) -> float:
+    async def main(directory: Path) -> float:
+        sync_repository, _ = _sync_backend(backend, directory)
+        trades = _trades(n)
+        sync_repository.add_many(trades)
+        repository, unit_of_work = _async_backend(backend, directory, sync_repository)
+        service = AsyncTradeService(_plan(), repository, unit_of_work)
+        ids = iter([trade.id for trade in trades])
+
+        async def client():
+            for trade_id in ids:
+                await service.close_trade(trade_id, 105.0, RESULT)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        await service.close()
+        return n / elapsed
+
+    with tempfile.TemporaryDirectory() as directory:
+        return asyncio.run(main(Path(directory)))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trades', type=int, default=500)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--backend', nargs='+', default=['file', 'sqlite'], choices=['file', 'sqlite'])
+    args = parser.parse_args()
+    # O log por operação distorceria a medição
+    logger.setLevel(logging.WARNING)
+
+    print(f"{'backend':<8} {'clientes':>8} {'síncrono':>14} {'assíncrono':>14}")
+    for backend in args.backend:
+        for clients in args.clients:
+            sync_rate = run_sync(backend, args.trades, clients)
+            async_rate = run_async(backend, args.trades, clients)
+            print(f"{backend:<8} {clients:>8} {sync_rate:>10,.0f} op/s {async_rate:>10,.0f} op/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark: relatório de desempenho a partir do repositório x armazenamento Parquet
+
+Uso: python -m benchmarks.bench_columnar [n]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from models.trade import TradeResult, TradeType, TradeStatus
+from repositories.file_repository import FileRepository
+from repositories.parquet_store import ParquetTradeStore
+from services.analytics import compute_performance, frame_from_store, performance_from_trades
+
+def _trades(n: int) -> list:
+    rng = np.random.default_rng(0)
+    results = rng.normal(1.0, 10.0, n).round(2)
+    return [
+        TradeResult(type=TradeType.SHORT if i % 3 == 0 else TradeType.LONG, entry=100.0, target=110.0, stop=95.0,
+                    result=float(results[i]), balance_before=10000.0, balance_after=10000.0,
+                    timestamp=f'2024-01-01T00:00:{i % 60:02d}', leverage=2, position_size_percent=50.0,
+                    id=i + 1, status=TradeStatus.CLOSED, close_price=105.0,
+                    close_timestamp=f'2024-{1 + i * 12 // n:02d}-02T00:00:{i % 60:02d}')
+        for i in range(n)
+    ]
+
+def _timed(label: str, func) -> None:
+    started = time.perf_counter()
+    report = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<48} {elapsed * 1000:9.1f} ms  (saldo final {report.final_balance:,.2f})")
+
+def main(n: int = 200_000) -> None:
+    trades = _trades(n)
+    with tempfile.TemporaryDirectory() as directory:
+        repository = FileRepository(str(Path(directory) / 'trades.json'))
+        repository.add_many(trades)
+        store = ParquetTradeStore(str(Path(directory) / 'closed'), flush_every=n)
+        store.append_many(trades)
+        store.compact()
+
+        print(f"Relatório sobre {n} trades fechados")
+        _timed("repositório JSON (decodifica TradeResult)",
+               lambda: performance_from_trades(repository.iter_trades(status=TradeStatus.CLOSED), 10000.0))
+        _timed("Parquet, colunas do relatório completo",
+               lambda: compute_performance(frame_from_store(store), 10000.0))
+        _timed("Parquet, só id/result/close_timestamp",
+               lambda: compute_performance(frame_from_store(store, ('id', 'result', 'close_timestamp')), 10000.0))
+        _timed("Parquet, shorts com prejuízo (filtro no pyarrow)",
+               lambda: compute_performance(frame_from_store(
+                   store, ('id', 'result', 'close_timestamp'), filters=[('type', '==', 'short'), ('result', '<', 0)]
+               ), 10000.0))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,103 @@
+"""Teste de estresse do FileRepository com escritores concorrentes
+
+Uso: python -m benchmarks.bench_file_locking [--operations N] [--writers 1 2 4 8 16]
+
+O total de operações é fixo e dividido entre os escritores, então o tamanho
+do arquivo é o mesmo em todas as linhas e a vazão reflete só a concorrência.
+
+1. Processos: cada processo fecha a sua parte dos trades (get + update em uma
+   FileUnitOfWork). Sem lock, as regravações concorrentes perdem fechamentos.
+2. Threads: cada thread cria a sua parte dos trades pelo TradeService (uma
+   FileUnitOfWork compartilhada por create_trade); compara a vazão com e sem
+   group commit e confere que nenhuma inclusão foi perdida.
+"""
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from models.account import TradePlan
+from models.trade import TradeResult, TradeType, TradeStatus
+from repositories.file_repository import FileRepository, FileUnitOfWork
+from services.trade_service import TradeService
+
+TRADE_DATA = {'type': 'long', 'entry': 100.0, 'target': 110.0, 'stop': 95.0, 'leverage': 1, 'position_size': 50.0}
+
+def _trade() -> TradeResult:
+    return TradeResult(type=TradeType.LONG, entry=100.0, target=110.0, stop=95.0, result=0,
+                       balance_before=10000.0, balance_after=10000.0, timestamp=datetime.now().isoformat(),
+                       leverage=1, position_size_percent=50.0)
+
+def _close_trades(path: str, ids: list, locking: bool) -> None:
+    repository = FileRepository(path, locking=locking)
+    for trade_id in ids:
+        with FileUnitOfWork(repository):
+            trade = repository.get(trade_id)
+            trade.status = TradeStatus.CLOSED
+            trade.close_price = 105.0
+            repository.update(trade)
+
+def run_processes(writers: int, writes: int, locking: bool) -> tuple:
+    """Retorna (fechamentos perdidos, fechamentos/s)"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'trades.json')
+        FileRepository(path).add_many([_trade() for _ in range(writers * writes)])
+        chunks = [list(range(1 + i * writes, 1 + (i + 1) * writes)) for i in range(writers)]
+        started = time.perf_counter()
+        processes = [multiprocessing.Process(target=_close_trades, args=(path, ids, locking)) for ids in chunks]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+        closed = len(FileRepository(path).find(status=TradeStatus.CLOSED))
+        return writers * writes - closed, writers * writes / elapsed
+
+def run_threads(writers: int, writes: int, group_commit: bool) -> tuple:
+    """Retorna (inclusões perdidas, inclusões/s)"""
+    with tempfile.TemporaryDirectory() as directory:
+        repository = FileRepository(str(Path(directory) / 'trades.json'), group_commit=group_commit)
+        service = TradeService(TradePlan(initial_balance=10000.0, total_trades=10 ** 6),
+                               repository, FileUnitOfWork(repository))
+
+        def writer():
+            for _ in range(writes):
+                service.create_trade(dict(TRADE_DATA))
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stored = repository.list()
+        lost = writers * writes - len({trade.id for trade in stored})
+        return lost, writers * writes / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--operations', type=int, default=960, help="Total de operações por execução")
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print("Processos fechando trades (get + update por Unit of Work)")
+    print(f"{'escritores':>10} {'sem lock':>24} {'com lock':>24}")
+    for writers in args.writers:
+        writes = args.operations // writers
+        unlocked = run_processes(writers, writes, locking=False)
+        locked = run_processes(writers, writes, locking=True)
+        print(f"{writers:>10} {unlocked[0]:>6} perdidos {unlocked[1]:>7,.0f} op/s {locked[0]:>6} perdidos {locked[1]:>7,.0f} op/s")
+
+    print("\nThreads criando trades pelo TradeService")
+    print(f"{'escritores':>10} {'lock por transação':>24} {'group commit':>24}")
+    for writers in args.writers:
+        writes = args.operations // writers
+        single = run_threads(writers, writes, group_commit=False)
+        grouped = run_threads(writers, writes, group_commit=True)
+        print(f"{writers:>10} {single[0]:>6} perdidos {single[1]:>7,.0f} op/s {grouped[0]:>6} perdidos {grouped[1]:>7,.0f} op/s")
+
+if __name__ == '__main__':
+    main()
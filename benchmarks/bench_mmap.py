@@ -0,0 +1,68 @@
+"""Benchmark: repositório binário mapeado em memória
+
+Uso: python -m benchmarks.bench_mmap [n]
+
+Grava n trades fechados, mede get/update por ID e o relatório de desempenho
+calculado sobre a visão NumPy do arquivo, com o pico de memória do processo.
+"""
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from models.trade import TradeResult, TradeType, TradeStatus
+from repositories.mmap_repository import MmapTradeRepository
+from services.analytics import compute_performance, frame_from_records
+
+CHUNK = 100_000
+
+def _trades(start: int, count: int) -> list:
+    return [
+        TradeResult(type=TradeType.SHORT if i % 3 == 0 else TradeType.LONG, entry=100.0, target=110.0, stop=95.0,
+                    result=float(i % 21 - 10), balance_before=10000.0, balance_after=10000.0,
+                    timestamp='2024-01-01T00:00:00', leverage=2, position_size_percent=50.0,
+                    status=TradeStatus.CLOSED, close_price=105.0, close_timestamp=f'2024-01-02T00:00:{i % 60:02d}')
+        for i in range(start, start + count)
+    ]
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main(n: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        repository = MmapTradeRepository(str(Path(directory) / 'trades.bin'))
+        started = time.perf_counter()
+        for start in range(0, n, CHUNK):
+            repository.add_many(_trades(start, min(CHUNK, n - start)))
+        elapsed = time.perf_counter() - started
+        size = (Path(directory) / 'trades.bin').stat().st_size
+        print(f"gravação: {n} trades em {elapsed:.2f} s ({n / elapsed:,.0f} trades/s), arquivo {size / 2**20:.0f} MiB")
+
+        ids = [random.randint(1, n) for _ in range(10_000)]
+        started = time.perf_counter()
+        for trade_id in ids:
+            repository.get(trade_id)
+        print(f"get por ID: {(time.perf_counter() - started) / len(ids) * 1e6:.1f} µs")
+
+        trades = [repository.get(trade_id) for trade_id in ids]
+        started = time.perf_counter()
+        for trade in trades:
+            trade.close_price = 106.0
+            repository.update(trade)
+        print(f"update no lugar: {(time.perf_counter() - started) / len(trades) * 1e6:.1f} µs")
+
+        repository.close()
+        # Reabre para medir o relatório sem as páginas gravadas acima na conta
+        repository = MmapTradeRepository(str(Path(directory) / 'trades.bin'))
+        rss_before = _peak_rss_mb()
+        started = time.perf_counter()
+        records = repository.records()
+        report = compute_performance(frame_from_records(records), 10000.0)
+        elapsed = time.perf_counter() - started
+        print(f"relatório sobre a visão do arquivo: {elapsed * 1000:.0f} ms, "
+              f"{report.total_trades} trades, pico de memória {rss_before:.0f} -> {_peak_rss_mb():.0f} MiB")
+        repository.close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
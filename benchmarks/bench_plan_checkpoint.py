@@ -0,0 +1,60 @@
+"""Benchmark: carga do TradePlan no formato antigo x checkpoint + eventos recentes
+
+Uso: python -m benchmarks.bench_plan_checkpoint [tamanhos do histórico...]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from models.account import TradePlan
+from models.trade import TradeResult, TradeType
+from utils.plan_checkpoint import PlanStateStore
+
+def _plan(n: int) -> TradePlan:
+    plan = TradePlan(initial_balance=10000.0, total_trades=n)
+    plan.trade_history = [
+        TradeResult(type=TradeType.LONG, entry=100.0, target=110.0, stop=95.0, result=1.0,
+                    balance_before=10000.0 + i, balance_after=10001.0 + i,
+                    timestamp='2025-01-01T00:00:00', leverage=2, position_size_percent=50.0, id=i + 1)
+        for i in range(n)
+    ]
+    plan.current_balance = 10000.0 + n
+    plan.completed_trades = n
+    return plan
+
+def _best(func, runs: int = 3) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(sizes) -> None:
+    print(f"{'histórico':>10} {'JSON único':>12} {'checkpoint':>12}")
+    for n in sizes:
+        plan = _plan(n)
+        with tempfile.TemporaryDirectory() as directory:
+            legacy_path = Path(directory) / 'legacy.json'
+            legacy_path.write_text(json.dumps({
+                'current_balance': plan.current_balance,
+                'trade_history': [trade.to_record() for trade in plan.trade_history]
+            }))
+            store = PlanStateStore(str(Path(directory) / 'trades.json'))
+            store.rewrite(plan)
+            # Atividade recente após o último checkpoint
+            for trade in plan.trade_history[:50]:
+                plan.trade_history.append(trade)
+                store.save(plan)
+
+            def load_legacy():
+                data = json.loads(legacy_path.read_text())
+                return [TradeResult.from_record(trade) for trade in data['trade_history']]
+
+            legacy = _best(load_legacy)
+            checkpoint = _best(lambda: store.load(TradePlan(initial_balance=10000.0, total_trades=n)))
+            print(f"{n:>10} {legacy * 1000:>9.1f} ms {checkpoint * 1000:>9.2f} ms")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,70 @@
+"""Benchmark: vazão do feed de preços com marcação a mercado das operações abertas
+
+Uso: python -m benchmarks.bench_price_feed [ticks] [operações abertas]
+
+Gera um CSV de ticks (5 instrumentos) e mede o replay por arquivo e por
+socket Unix, com a marcação de todas as operações abertas a cada bloco.
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from models.trade import TradeResult, TradeType
+from services.price_feed import CsvTickSource, PriceFeed, SocketTickSource
+
+INSTRUMENTS = ('BTC', 'ETH', 'SOL', 'BNB', 'XRP')
+
+def _write_ticks(path: str, n: int) -> None:
+    rng = np.random.default_rng(0)
+    names = np.array(INSTRUMENTS)[rng.integers(0, len(INSTRUMENTS), n)]
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.01, n))
+    with open(path, 'w') as f:
+        f.write('instrument,price\n')
+        f.writelines(f'{name},{price:.4f}\n' for name, price in zip(names.tolist(), prices.tolist()))
+
+def _trades(n: int) -> list:
+    return [
+        TradeResult(type=TradeType.SHORT if i % 3 == 0 else TradeType.LONG, entry=100.0 + i % 7,
+                    target=120.0, stop=90.0, result=0.0, balance_before=10000.0, balance_after=10000.0,
+                    timestamp='2024-01-01T00:00:00', leverage=2, position_size_percent=10.0, id=i + 1)
+        for i in range(n)
+    ]
+
+def _serve(path: str, address: str, ready: threading.Event) -> None:
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(1)
+    ready.set()
+    conn, _ = server.accept()
+    with conn, open(path, 'rb') as f:
+        conn.sendfile(f)
+    server.close()
+
+def _run(label: str, source, trades: list, n: int) -> None:
+    feed = PriceFeed(source, trades, instrument=lambda trade: INSTRUMENTS[trade.id % len(INSTRUMENTS)])
+    started = time.perf_counter()
+    snapshot = feed.run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {n / elapsed:>12,.0f} ticks/s   PnL não realizado {snapshot.total_unrealized:>12,.2f}")
+
+def main(n: int = 1_000_000, open_trades: int = 1_000) -> None:
+    trades = _trades(open_trades)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ticks.csv')
+        _write_ticks(path, n)
+        print(f"{n} ticks, {open_trades} operações abertas marcadas a cada bloco de 10.000 ticks")
+        _run('replay de CSV', CsvTickSource(path, 'BTC'), trades, n)
+
+        address = os.path.join(directory, 'feed.sock')
+        ready = threading.Event()
+        server = threading.Thread(target=_serve, args=(path, address, ready), daemon=True)
+        server.start()
+        ready.wait()
+        _run('socket Unix', SocketTickSource(address, 'BTC'), trades, n)
+        server.join()
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
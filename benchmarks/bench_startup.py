@@ -0,0 +1,70 @@
+"""Benchmark de inicialização da CLI por comando (estilo -X importtime)
+
+Uso: python -m benchmarks.bench_startup [--runs N] [--top N] [--output arquivo.json] [--baseline arquivo.json]
+
+Para cada comando mede o menor tempo total entre N execuções e lista os
+módulos com maior tempo cumulativo de importação. Com --output os
+resultados são gravados para servirem de baseline em execuções futuras.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    'help': ['--help'],
+    'list': ['list', '--limit', '1'],
+    'report': ['report'],
+    'create --help': ['create', '--help'],
+}
+
+def _run(args: list) -> tuple:
+    """Executa a CLI com -X importtime; retorna (tempo em s, importações por tempo cumulativo)"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'main.py', *args],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    imports = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split('|')
+        # Apenas módulos de topo (sem indentação extra) somam o custo total
+        if not module[1:].startswith(' '):
+            imports[module.strip()] = int(cumulative_us)
+    return elapsed, imports
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    options = parser.parse_args()
+
+    baseline = json.loads(Path(options.baseline).read_text()) if options.baseline else {}
+    results = {}
+    for name, args in COMMANDS.items():
+        runs = [_run(args) for _ in range(options.runs)]
+        elapsed, imports = min(runs, key=lambda run: run[0])
+        import_total = sum(imports.values()) / 1e6
+        results[name] = {'elapsed': elapsed, 'imports': import_total}
+
+        line = f"{name:<16} total {elapsed * 1000:7.1f} ms | importações {import_total * 1000:7.1f} ms"
+        if name in baseline:
+            line += f" | baseline {baseline[name]['elapsed'] * 1000:7.1f} ms"
+        print(line)
+        for module, cumulative in sorted(imports.items(), key=lambda item: -item[1])[:options.top]:
+            print(f"    {cumulative / 1000:7.1f} ms  {module}")
+
+    if options.output:
+        Path(options.output).write_text(json.dumps(results, indent=4))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: histórico do TradePlan em lista de TradeResult x TradeHistory colunar
+
+Uso: python -m benchmarks.bench_trade_history [n]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+import numpy as np
+from models.history import TradeHistory
+from models.trade import TradeResult, TradeType, TradeStatus
+from services.analytics import performance_from_trades
+
+CHUNK = 100_000
+
+def _trades(start: int, count: int) -> list:
+    return [
+        TradeResult(type=TradeType.SHORT if i % 3 == 0 else TradeType.LONG, entry=100.0 + i * 1e-6, target=110.0,
+                    stop=95.0, result=float(i % 21 - 10), balance_before=10000.0 + i, balance_after=10000.5 + i,
+                    timestamp=f'2024-01-01T00:00:{i % 60:02d}', leverage=2, position_size_percent=50.0,
+                    id=i + 1, status=TradeStatus.CLOSED, close_price=105.0,
+                    close_timestamp=f'2024-01-02T00:00:{i % 60:02d}')
+        for i in range(start, start + count)
+    ]
+
+def _build(container, n: int):
+    for start in range(0, n, CHUNK):
+        container.extend(_trades(start, min(CHUNK, n - start)))
+    return container
+
+def _traced(build) -> tuple:
+    """(objeto construído, bytes retidos)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def _timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def main(n: int = 1_000_000) -> None:
+    trades, list_bytes = _traced(lambda: _build([], n))
+    history, history_bytes = _traced(lambda: _build(TradeHistory(), n))
+    print(f"{n} trades no histórico")
+    print(f"{'':<36} {'lista':>12} {'TradeHistory':>14}")
+    print(f"{'bytes por trade':<36} {list_bytes / n:>12,.0f} {history_bytes / n:>14,.0f}")
+
+    def list_drawdown():
+        balances = np.fromiter((trade.balance_after for trade in trades), 'float64', len(trades))
+        return float((np.maximum.accumulate(balances) - balances).max())
+
+    print(f"{'drawdown máximo':<36} {_timed(list_drawdown) * 1000:>9.1f} ms "
+          f"{_timed(lambda: history.max_drawdown) * 1000:>11.1f} ms")
+    print(f"{'PnL acumulado (último valor)':<36} "
+          f"{_timed(lambda: sum(trade.result for trade in trades)) * 1000:>9.1f} ms "
+          f"{_timed(lambda: history.cumulative_pnl[-1]) * 1000:>11.3f} ms")
+    print(f"{'relatório de desempenho':<36} "
+          f"{_timed(lambda: performance_from_trades(trades, 10000.0)) * 1000:>9.1f} ms "
+          f"{_timed(lambda: performance_from_trades(history, 10000.0)) * 1000:>11.1f} ms")
+
+    extra = _trades(n, 10_000)
+    appended = []
+    list_append = _timed(lambda: [appended.append(trade) for trade in extra])
+    history_append = _timed(lambda: [history.append(trade) for trade in extra])
+    print(f"{'append (um trade por vez)':<36} {list_append / len(extra) * 1e6:>9.2f} µs "
+          f"{history_append / len(extra) * 1e6:>11.2f} µs")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
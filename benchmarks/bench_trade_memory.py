@@ -0,0 +1,76 @@
+"""Benchmark: memória por trade e custo das métricas derivadas do TradeResult
+
+Uso: python -m benchmarks.bench_trade_memory [n]
+
+Compara o TradeResult atual (slots + cache de gain/loss) com o dataclass
+anterior, com __dict__ por instância e propriedades recalculadas a cada acesso.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass, field
+from models.trade import TradeResult, TradeType, TradeStatus
+from models.records import TRADE_DTYPE
+
+def _legacy_class():
+    def gain(self):
+        from utils.math_utils import calculate_pnl
+        return calculate_pnl(entry=self.entry, exit_price=self.target,
+                             position_size=(self.position_size_percent / 100) * self.leverage, trade_type=self.type.value)
+
+    def loss(self):
+        from utils.math_utils import calculate_pnl
+        return calculate_pnl(entry=self.entry, exit_price=self.stop,
+                             position_size=(self.position_size_percent / 100) * self.leverage, trade_type=self.type.value)
+
+    def risk_reward(self):
+        return abs(self.gain / self.loss)
+
+    return make_dataclass(
+        'LegacyTradeResult',
+        [(f.name, f.type, field(default=f.default)) for f in fields(TradeResult)],
+        namespace={'gain': property(gain), 'loss': property(loss), 'risk_reward': property(risk_reward)}
+    )
+
+def _build(cls, n: int) -> list:
+    # Valores distintos por trade, como num histórico real (sem floats/textos compartilhados)
+    return [
+        cls(type=TradeType.LONG, entry=100.0 + i * 1e-6, target=110.0 + i * 1e-6, stop=95.0 + i * 1e-6,
+            result=i * 0.01, balance_before=10000.0 + i, balance_after=10000.5 + i,
+            timestamp=f'2024-01-01T00:00:00.{i:06d}', leverage=2, position_size_percent=50.0,
+            id=i + 1, status=TradeStatus.CLOSED, close_price=105.0 + i * 1e-6)
+        for i in range(n)
+    ]
+
+def _bytes_per_trade(cls, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    trades = _build(cls, n)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del trades
+    return size / n
+
+def _risk_reward_times(cls, n: int) -> tuple:
+    """Tempo médio do primeiro acesso a risk_reward e dos acessos seguintes"""
+    trades = _build(cls, n)
+    times = []
+    for _ in range(2):
+        started = time.perf_counter()
+        for trade in trades:
+            trade.risk_reward
+        times.append((time.perf_counter() - started) / n)
+    return tuple(times)
+
+def main(n: int = 1_000_000) -> None:
+    legacy = _legacy_class()
+    print(f"{n} trades em memória")
+    print(f"{'':<34} {'bytes/trade':>12} {'risk_reward (1º acesso / seguintes)':>38}")
+    for label, cls in (('dataclass com __dict__ (anterior)', legacy), ('TradeResult com slots + cache', TradeResult)):
+        first, repeated = _risk_reward_times(cls, n // 10)
+        print(f"{label:<34} {_bytes_per_trade(cls, n):>12,.0f} {first * 1e9:>25,.0f} ns / {repeated * 1e9:,.0f} ns")
+    print(f"{'registro do MmapTradeRepository':<34} {TRADE_DTYPE.itemsize:>12,}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
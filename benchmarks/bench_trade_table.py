@@ -0,0 +1,51 @@
+"""Benchmark: atualização da tabela de operações abertas (modelo, sem Tk)
+
+Uso: python -m benchmarks.bench_trade_table [n]
+
+Compara a reconstrução completa das linhas (o que a tela fazia a cada
+atualização) com o diff por ID do OpenTradesModel, com 1% dos trades
+alterados, e mede a troca de coluna de ordenação e a janela visível.
+"""
+import sys
+import time
+from dataclasses import replace
+from models.trade import TradeResult, TradeType
+from views.trade_table import OpenTradesModel, _build_row
+
+def _trades(n: int) -> list:
+    return [
+        TradeResult(type=TradeType.SHORT if i % 3 == 0 else TradeType.LONG, entry=100.0 + i * 1e-3,
+                    target=90.0 if i % 3 == 0 else 110.0, stop=105.0 if i % 3 == 0 else 95.0,
+                    result=0.0, balance_before=10000.0, balance_after=10000.0,
+                    timestamp='2024-01-01T00:00:00', leverage=2, position_size_percent=10.0 + i % 40, id=i + 1)
+        for i in range(n)
+    ]
+
+def _timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def main(n: int = 10_000) -> None:
+    trades = _trades(n)
+    model = OpenTradesModel()
+    model.update(trades)
+
+    # 1% dos trades com novo alvo, alguns fechados e alguns novos
+    changed = list(trades)
+    for i in range(0, n, 100):
+        changed[i] = replace(changed[i], target=changed[i].target + 1.0)
+    changed = changed[10:] + _trades(n + 10)[n:]
+
+    rebuild = _timed(lambda: [_build_row(trade) for trade in changed])
+    diff_time = _timed(lambda: model.update(changed))
+    print(f"{n} operações abertas, 1% alteradas")
+    print(f"{'reconstrução completa das linhas':<34} {rebuild * 1000:>8.1f} ms")
+    print(f"{'diff por ID':<34} {diff_time * 1000:>8.1f} ms")
+    print(f"{'atualização sem mudanças':<34} {_timed(lambda: model.update(changed)) * 1000:>8.1f} ms")
+    print(f"{'ordenar por Risco/Recompensa':<34} {_timed(lambda: model.sort_by(7)) * 1000:>8.1f} ms")
+    print(f"{'inverter a ordem':<34} {_timed(lambda: model.sort_by(7)) * 1000:>8.3f} ms")
+    print(f"{'janela visível (30 linhas)':<34} {_timed(lambda: model.window(n // 2, 30)) * 1e6:>8.1f} µs")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,101 @@
+"""Benchmark: custo por tick dos gatilhos de stop/alvo com muitas operações em repouso
+
+Uso: python -m benchmarks.bench_triggers [operações em repouso]
+
+Compara a busca no TriggerIndex com a varredura linear das operações
+abertas (em Python e vetorizada) para 1k, 10k e 100k operações, e mede o
+fechamento em lote de um tick que dispara muitas operações de uma vez.
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from models.account import TradePlan
+from models.trade import TradeResult, TradeType
+from repositories.file_repository import FileUnitOfWork
+from repositories.mmap_repository import MmapTradeRepository
+from services.trade_service import TradeService
+from services.triggers import TriggerEngine, TriggerIndex
+
+TICKS = 20_000
+
+def _trades(n: int, seed: int = 0) -> list:
+    # Operações abertas perto do preço atual (100), com stops e alvos ainda não atingidos
+    rng = np.random.default_rng(seed)
+    entries = 100.0 + rng.normal(0, 0.5, n)
+    risk, reward = rng.uniform(2, 20, n), rng.uniform(2, 40, n)
+    trades = []
+    for i in range(n):
+        short = i % 2 == 1
+        entry = float(entries[i])
+        trades.append(TradeResult(
+            type=TradeType.SHORT if short else TradeType.LONG, entry=entry,
+            target=entry - float(reward[i]) if short else entry + float(reward[i]),
+            stop=entry + float(risk[i]) if short else entry - float(risk[i]),
+            result=0.0, balance_before=10000.0, balance_after=10000.0, timestamp='2024-01-01T00:00:00',
+            leverage=1, position_size_percent=1.0, id=i + 1))
+    return trades
+
+def _linear(trades: list, price: float) -> list:
+    hits = []
+    for trade in trades:
+        if trade.type == TradeType.LONG:
+            if price <= trade.stop or price >= trade.target:
+                hits.append(trade.id)
+        elif price >= trade.stop or price <= trade.target:
+            hits.append(trade.id)
+    return hits
+
+def _vectorized(columns: tuple, price: float) -> np.ndarray:
+    is_short, stop, target = columns
+    long_hit = (price <= stop) | (price >= target)
+    short_hit = (price >= stop) | (price <= target)
+    return np.flatnonzero(np.where(is_short, short_hit, long_hit))
+
+def _per_tick(func, prices: np.ndarray) -> float:
+    started = time.perf_counter()
+    for price in prices.tolist():
+        func(price)
+    return (time.perf_counter() - started) / len(prices)
+
+def _resting_costs(sizes: list) -> None:
+    # Ticks perto de 100: poucos níveis cruzados, como num mercado sem grandes saltos
+    prices = 100.0 + np.random.default_rng(1).normal(0, 0.2, TICKS)
+    print(f"{'operações em repouso':<22} {'TriggerIndex':>14} {'varredura NumPy':>16} {'varredura Python':>17}")
+    for n in sizes:
+        trades = _trades(n)
+        index = TriggerIndex(trades)
+        columns = (np.array([t.type == TradeType.SHORT for t in trades]),
+                   np.array([t.stop for t in trades]), np.array([t.target for t in trades]))
+        python_ticks = prices[:max(TICKS * 1000 // n, 20)]
+        print(f"{n:<22,} {_per_tick(index.crossed, prices) * 1e6:>11.2f} µs "
+              f"{_per_tick(lambda p: _vectorized(columns, p), prices) * 1e6:>13.2f} µs "
+              f"{_per_tick(lambda p: _linear(trades, p), python_ticks) * 1e6:>14.1f} µs")
+
+def _batched_close(n: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        repository = MmapTradeRepository(os.path.join(directory, 'trades.bin'))
+        trades = _trades(n)
+        repository.add_many(trades)
+        service = TradeService(TradePlan(initial_balance=10000.0, total_trades=10 ** 7),
+                               repository, FileUnitOfWork(repository))
+        engine = TriggerEngine(service, trades)
+        # Queda que atinge os stops long mais próximos (cerca de 1,5% das operações)
+        price = 97.5
+        started = time.perf_counter()
+        triggered = len(engine.index.crossed(price))
+        closed = engine.on_price(price)
+        elapsed = time.perf_counter() - started
+        print(f"tick com {triggered} disparos em {n:,} operações: {len(closed)} fechadas em uma transação "
+              f"em {elapsed * 1000:.1f} ms ({elapsed / max(len(closed), 1) * 1e6:.0f} µs por operação)")
+        repository.close()
+
+def main(n: int = 100_000) -> None:
+    import logging
+    logging.getLogger('planotrade').setLevel(logging.WARNING)
+    _resting_costs([1_000, 10_000, n])
+    _batched_close(n)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,82 @@
+"""Micro-benchmark da validação de trades
+
+Uso: python -m benchmarks.bench_validation [n]
+
+O "antes" é o TradeSchema original (validators no estilo @validator),
+reproduzido aqui.
+"""
+import sys
+import time
+import warnings
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field
+from core.schemas import validate_trade, validate_trades
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    from pydantic import validator
+
+    class BaselineTradeSchema(BaseModel):
+        """TradeSchema anterior à unificação da validação"""
+        type: Literal['long', 'short']
+        leverage: int = Field(ge=1, le=10)
+        position_size: float = Field(ge=1, le=100)
+        entry: float
+        target: float
+        stop: float
+        timestamp: datetime = Field(default_factory=datetime.now)
+
+        @validator('target', 'stop')
+        def validate_prices(cls, value, values):
+            if 'type' not in values:
+                return value
+            if values['type'] == 'long':
+                if 'entry' in values:
+                    if value <= values['entry']:
+                        raise ValueError('Preço inválido para operação long')
+            else:
+                if 'entry' in values:
+                    if value >= values['entry']:
+                        raise ValueError('Preço inválido para operação short')
+            return value
+
+        @validator('position_size')
+        def validate_position_size(cls, value):
+            if not 1 <= value <= 100:
+                raise ValueError('Tamanho da posição deve estar entre 1% e 100%')
+            return value
+
+def _rows(n: int, stop: float = 95.0) -> list:
+    now = datetime.now()
+    return [
+        {'type': 'long', 'entry': 100.0, 'target': 105.0 + i % 7, 'stop': stop,
+         'leverage': 2, 'position_size': 50.0, 'timestamp': now}
+        for i in range(n)
+    ]
+
+def _text(rows: list) -> list:
+    return [{k: str(v) for k, v in row.items()} for row in rows]
+
+def _per_trade(label: str, n: int, func) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / n * 1e6:8.2f} µs/trade")
+
+def main(n: int = 100_000) -> None:
+    rows = _rows(n)
+    # O schema original exigia stop acima da entrada também em long: as linhas dele seguem essa regra
+    baseline_rows = _rows(n, stop=105.0)
+    warnings.simplefilter('ignore', DeprecationWarning)
+    print(f"Validando {n} trades")
+    _per_trade("antes: TradeSchema(**row).dict()", n, lambda: [BaselineTradeSchema(**row).dict() for row in baseline_rows])
+    _per_trade("depois: validate_trade (individual)", n, lambda: [validate_trade(row) for row in rows])
+    _per_trade("depois: validate_trades (lote)", n, lambda: validate_trades(rows))
+    # Entradas que exigem conversão (ex.: CSV) seguem pelo TradeSchema, em lote
+    text_rows, baseline_text = _text(rows[:n // 10]), _text(baseline_rows[:n // 10])
+    _per_trade("antes: texto/CSV", len(baseline_text), lambda: [BaselineTradeSchema(**row).dict() for row in baseline_text])
+    _per_trade("depois: validate_trades (texto/CSV)", len(text_rows), lambda: validate_trades(text_rows))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,11 +1,19 @@
 import typer
+from itertools import islice
 from typing import Optional
 from core.factory import ServiceFactory
-from core.logging import logger
+from core.logging import logger, configure_logging
+from config.settings import settings
 from models.trade import TradeStatus, TradeResult
 
 app = typer.Typer()
 
+def _forward(command: str, **args):
+    """Encaminha o comando ao daemon (serve); retorna None se ele não estiver rodando"""
+    from core.daemon import forward
+    
+    return forward(str(settings.daemon_socket), command, **args)
+
 @app.command()
 def create(
     type: str = typer.Option(..., help="Tipo da operação (long/short)"),
@@ -17,8 +25,6 @@ def create(
 ):
     """Cria uma nova operação"""
     try:
-        trade_service = ServiceFactory.create_trade_service()
-        
         trade_data = {
             'type': type,
             'entry': entry,
@@ -28,31 +34,44 @@ def create(
             'position_size': position_size
         }
         
-        trade = trade_service.create_trade(trade_data)
+        created = _forward('create', trade_data=trade_data)
+        if created is not None:
+            trade = TradeResult.from_record(created)
+        else:
+            trade = ServiceFactory.create_trade_service().create_trade(trade_data)
         logger.info(f"Operação criada com sucesso: {trade}")
     except Exception as e:
         logger.error(f"Erro ao criar operação: {str(e)}")
         raise typer.Exit(code=1)
 
 @app.command()
-def list():
+def list(
+    limit: Optional[int] = typer.Option(None, help="Número máximo de operações exibidas"),
+    after: Optional[int] = typer.Option(None, help="Exibe apenas operações com ID maior que este")
+):
     """Lista operações abertas"""
     try:
-        trade_service = ServiceFactory.create_trade_service()
-        open_trades = trade_service.get_open_trades()
+        listed = _forward('list', limit=limit, after=after)
+        if listed is not None:
+            open_trades = (TradeResult.from_record(data) for data in listed)
+        else:
+            trade_service = ServiceFactory.create_trade_service()
+            # Itera em lotes para manter a memória constante independente do histórico
+            open_trades = islice(trade_service.iter_open_trades(after_id=after), limit)
         
-        if not open_trades:
-            logger.info("Nenhuma operação aberta")
-            return
-            
+        found = False
         for i, trade in enumerate(open_trades):
-            logger.info(f"\nOperação {i+1}:")
+            found = True
+            logger.info(f"\nOperação {i+1} (ID {trade.id}):")
             logger.info(f"Tipo: {trade.type.value.upper()}")
             logger.info(f"Entrada: {trade.entry}")
             logger.info(f"Alvo: {trade.target}")
             logger.info(f"Stop: {trade.stop}")
             logger.info(f"Alavancagem: {trade.leverage}x")
             logger.info(f"Tamanho da posição: {trade.position_size_percent}%")
+            
+        if not found:
+            logger.info("Nenhuma operação aberta")
     except Exception as e:
         logger.error(f"Erro ao listar operações: {str(e)}")
         raise typer.Exit(code=1)
@@ -65,8 +84,11 @@ def close(
 ):
     """Fecha uma operação aberta"""
     try:
-        trade_service = ServiceFactory.create_trade_service()
-        trade = trade_service.close_trade(trade_id, price, result)
+        closed = _forward('close', trade_id=trade_id, price=price, result=result)
+        if closed is not None:
+            trade = TradeResult.from_record(closed)
+        else:
+            trade = ServiceFactory.create_trade_service().close_trade(trade_id, price, result)
         
         logger.info(f"Operação {trade_id} fechada com sucesso!")
         logger.info(f"Resultado: {trade.result}")
@@ -78,7 +100,230 @@ def close(
         logger.exception(e)
         raise typer.Exit(code=1)
 
+@app.command()
+def report():
+    """Exibe o relatório de desempenho das operações fechadas"""
+    try:
+        from views.reports import show_performance_report
+        
+        trade_service = ServiceFactory.create_trade_service()
+        show_performance_report(trade_service.get_performance_report())
+    except Exception as e:
+        logger.error(f"Erro ao gerar relatório: {str(e)}")
+        raise typer.Exit(code=1)
+
+@app.command()
+def simulate(
+    paths: int = typer.Option(10000, help="Número de caminhos simulados"),
+    trades: Optional[int] = typer.Option(None, help="Operações por caminho (padrão: total do plano)"),
+    risk: Optional[float] = typer.Option(None, help="Risco por operação em % (padrão: do plano)"),
+    win_rate: Optional[float] = typer.Option(None, help="Taxa de acerto em % (sem ela, reamostra o histórico)"),
+    reward_risk: Optional[float] = typer.Option(None, help="Relação R:R usada com --win-rate"),
+    ruin: float = typer.Option(50.0, help="Perda (% do saldo inicial) considerada ruína"),
+    seed: Optional[int] = typer.Option(None, help="Semente para resultados reproduzíveis"),
+    workers: int = typer.Option(1, help="Número de processos"),
+    chunk_size: int = typer.Option(2000, help="Caminhos por bloco enviado a cada processo"),
+    scaling: bool = typer.Option(False, help="Mede a vazão com 1, 2, 4... até --workers processos")
+):
+    """Simula o plano de trade com Monte Carlo"""
+    try:
+        from services.simulation import simulate as run_simulation, scaling_worker_counts
+        from views.reports import show_simulation_report
+        
+        trade_service = ServiceFactory.create_trade_service()
+        plan = trade_service.trade_plan
+        r_multiples = trade_service.get_r_multiples() if win_rate is None else None
+        
+        def run(n_workers: int):
+            return run_simulation(
+                total_trades=trades or plan.total_trades,
+                risk_per_trade=risk if risk is not None else plan.risk_per_trade,
+                initial_balance=plan.initial_balance,
+                paths=paths,
+                r_multiples=r_multiples,
+                win_rate=win_rate,
+                reward_risk=reward_risk,
+                ruin_percent=ruin,
+                seed=seed,
+                workers=n_workers,
+                chunk_size=chunk_size
+            )
+        
+        if scaling:
+            for n_workers in scaling_worker_counts(workers):
+                result = run(n_workers)
+                logger.info(f"{n_workers} processo(s): {result.paths_per_second:,.0f} caminhos/s ({result.elapsed:.3f}s)")
+        else:
+            show_simulation_report(run(workers))
+    except Exception as e:
+        logger.error(f"Erro ao simular plano: {str(e)}")
+        raise typer.Exit(code=1)
+
+@app.command()
+def backtest(
+    bars: str = typer.Argument(..., help="Arquivo OHLC (CSV ou Parquet) com colunas timestamp, high e low"),
+    setups: str = typer.Argument(..., help="Configurações de trade em JSONL ou CSV"),
+    output: str = typer.Option('backtest.json', help="Repositório de saída (.json ou .db)"),
+    chunk_size: int = typer.Option(100000, help="Barras lidas por bloco"),
+    initial_balance: Optional[float] = typer.Option(None, help="Saldo inicial (padrão: do plano)"),
+    overwrite: bool = typer.Option(False, "--overwrite", help="Substitui um repositório de saída que já tenha operações")
+):
+    """Resolve alvo/stop das configurações reproduzindo barras OHLC"""
+    try:
+        import os
+        from services.backtest import load_setups, run_backtest
+        from services.analytics import performance_from_trades
+        from views.reports import show_performance_report
+        
+        if overwrite and os.path.exists(output):
+            os.remove(output)
+        if output.endswith('.db'):
+            from repositories.sqlalchemy_repository import SQLAlchemyRepository
+            repository = SQLAlchemyRepository(f'sqlite:///{output}')
+        else:
+            from repositories.file_repository import FileRepository
+            repository = FileRepository(output)
+        # O relatório lê o repositório inteiro: trades de outra execução seriam somados a estes
+        if next(repository.iter_trades(batch_size=1), None) is not None:
+            raise ValueError(f"{output} já contém operações; use --overwrite para substituí-lo ou outro --output")
+        
+        balance = initial_balance
+        if balance is None:
+            balance = ServiceFactory.create_trade_service().trade_plan.initial_balance
+        summary = run_backtest(bars, load_setups(setups), repository, balance, chunk_size)
+        
+        logger.info(f"Barras processadas: {summary.bars}")
+        logger.info(f"Alvos atingidos: {summary.target_hits} | Stops: {summary.stop_hits} | Em aberto: {summary.unresolved}")
+        closed_trades = repository.iter_trades(status=TradeStatus.CLOSED)
+        show_performance_report(performance_from_trades(closed_trades, balance))
+    except Exception as e:
+        logger.error(f"Erro ao executar backtest: {str(e)}")
+        raise typer.Exit(code=1)
+
+@app.command(name='import')
+def import_trades(
+    path: str = typer.Argument(..., help="Arquivo CSV ou JSONL com as operações"),
+    chunk_size: int = typer.Option(5000, help="Linhas validadas e gravadas por bloco"),
+    rejects: Optional[str] = typer.Option(None, help="Arquivo JSONL de rejeitados (padrão: <arquivo>.rejects.jsonl)")
+):
+    """Importa operações em lote a partir de CSV/JSONL"""
+    try:
+        import json
+        from utils.file_utils import iter_rows
+        
+        trade_service = ServiceFactory.create_trade_service()
+        rejects_path = rejects or f'{path}.rejects.jsonl'
+        
+        with open(rejects_path, 'w', encoding='utf-8') as rejects_file:
+            def on_reject(line_number: int, row, reason: str):
+                rejects_file.write(json.dumps({'line': line_number, 'row': row, 'reason': reason}, default=str) + '\n')
+            
+            # Linhas que nem chegam a ser lidas (JSON inválido) também vão para os rejeitados
+            unreadable = []
+            
+            def on_unreadable(line_number: int, line: str, reason: str):
+                unreadable.append(line_number)
+                on_reject(line_number, line, reason)
+            
+            def on_progress(summary):
+                logger.info(f"{summary.total + len(unreadable)} linhas processadas ({summary.rows_per_second:,.0f} linhas/s)")
+            
+            summary = trade_service.import_trades(iter_rows(path, on_error=on_unreadable), chunk_size, on_reject, on_progress)
+            summary.total += len(unreadable)
+            summary.rejected += len(unreadable)
+        
+        logger.info(f"Importação concluída: {summary.imported} importadas, {summary.rejected} rejeitadas "
+                    f"em {summary.elapsed:.2f}s ({summary.rows_per_second:,.0f} linhas/s)")
+        if summary.rejected:
+            logger.info(f"Linhas rejeitadas gravadas em {rejects_path}")
+    except Exception as e:
+        logger.error(f"Erro ao importar operações: {str(e)}")
+        raise typer.Exit(code=1)
+
+@app.command()
+def serve(
+    socket_path: Optional[str] = typer.Option(None, "--socket", help="Caminho do socket Unix (padrão: data/planotrade.sock)")
+):
+    """Mantém o serviço carregado e atende create/list/close pela CLI"""
+    try:
+        from core.daemon import DaemonServer
+        
+        settings.ensure_data_dir()
+        path = socket_path or str(settings.daemon_socket)
+        server = DaemonServer(path, ServiceFactory.create_trade_service(background_compaction=True))
+    except Exception as e:
+        logger.error(f"Erro ao iniciar o daemon: {str(e)}")
+        raise typer.Exit(code=1)
+    
+    logger.info(f"Daemon aguardando comandos em {path} (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Daemon encerrado")
+    finally:
+        server.server_close()
+
+@app.command()
+def prices(
+    source: str = typer.Argument(..., help="CSV de ticks (instrumento,preço) ou socket local (host:porta ou caminho Unix)"),
+    instrument: str = typer.Option(settings.price_feed_instrument, help="Instrumento das operações abertas e dos ticks sem instrumento"),
+    batch_size: int = typer.Option(10000, help="Ticks aplicados por bloco"),
+    interval: float = typer.Option(1.0, help="Segundos entre os resumos exibidos durante o feed"),
+    auto_close: bool = typer.Option(False, help="Fecha automaticamente as operações que atingirem stop ou alvo")
+):
+    """Marca as operações abertas a mercado com um feed de preços local"""
+    try:
+        import time
+        import numpy as np
+        from services.price_feed import PriceFeed, open_tick_source
+        from views.reports import show_mark_to_market
+        
+        trade_service = ServiceFactory.create_trade_service()
+        open_trades = trade_service.get_open_trades()
+        feed = PriceFeed(open_tick_source(source, instrument, batch_size), open_trades, instrument)
+        started = last_log = time.perf_counter()
+        on_ticks = None
+        
+        if auto_close:
+            from services.triggers import TriggerEngine
+            
+            engine = TriggerEngine(trade_service, open_trades)
+            
+            def on_ticks(instruments, prices):
+                # Os gatilhos valem para as operações do instrumento do plano
+                mask = np.fromiter((name == instrument for name in instruments), bool, len(instruments))
+                closed = engine.on_prices(prices[mask])
+                if closed:
+                    for trade in closed:
+                        logger.info(f"Operação {trade.id} fechada automaticamente a {trade.close_price} "
+                                    f"(resultado: {trade.result:.2f})")
+                    feed.set_trades(trade_service.get_open_trades())
+        
+        def on_update(mark):
+            nonlocal last_log
+            now = time.perf_counter()
+            if now - last_log >= interval:
+                last_log = now
+                logger.info(f"{mark.ticks} ticks ({mark.ticks / (now - started):,.0f} ticks/s) | "
+                            f"PnL não realizado: ${mark.total_unrealized:.2f} | Exposição líquida: {mark.net_exposure:.2f}")
+        
+        try:
+            feed.run(on_update, on_ticks=on_ticks)
+        except KeyboardInterrupt:
+            logger.info("Feed interrompido")
+        elapsed = time.perf_counter() - started
+        
+        if feed.snapshot is None:
+            logger.info("Nenhum tick recebido")
+            return
+        logger.info(f"{feed.book.ticks} ticks em {elapsed:.2f}s ({feed.book.ticks / elapsed:,.0f} ticks/s)")
+        show_mark_to_market(feed.snapshot)
+    except Exception as e:
+        logger.error(f"Erro no feed de preços: {str(e)}")
+        raise typer.Exit(code=1)
+
 def main():
+    configure_logging()
     app()
 
 @app.command()
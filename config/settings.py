@@ -4,13 +4,40 @@ import os
 # Configurações do sistema
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / 'data'
-DATA_DIR.mkdir(exist_ok=True)
 
 # Caminho para o arquivo de trades
 TRADES_FILE = DATA_DIR / 'trades.json'
 
-# Configurações de banco de dados
-DATABASE_URL = os.getenv('DATABASE_URL', f'sqlite:///{DATA_DIR}/trades.db')
+# Modo journal (append-only) para o repositório em arquivo
+FILE_JOURNAL = os.getenv('PLANOTRADE_FILE_JOURNAL', '0') == '1'
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv('PLANOTRADE_JOURNAL_COMPACT_THRESHOLD', '1000'))
+
+# Group commit: agrupa as gravações concorrentes do repositório em arquivo
+FILE_GROUP_COMMIT = os.getenv('PLANOTRADE_FILE_GROUP_COMMIT', '0') == '1'
+
+# Arquivo binário mapeado em memória para o repositório de trades; vazio desativa
+MMAP_TRADES_FILE = os.getenv('PLANOTRADE_MMAP_FILE', '')
+
+# Tamanho máximo do cache de leitura dos repositórios (0 desativa)
+REPOSITORY_CACHE_SIZE = int(os.getenv('PLANOTRADE_REPOSITORY_CACHE_SIZE', '10000'))
+
+# Socket do daemon (comando serve) usado pela CLI quando estiver rodando
+DAEMON_SOCKET = Path(os.getenv('PLANOTRADE_SOCKET', str(DATA_DIR / 'planotrade.sock')))
+
+# Diretório do armazenamento colunar (Parquet) de trades fechados; vazio desativa
+ANALYTICS_STORE_DIR = os.getenv('PLANOTRADE_ANALYTICS_STORE', '')
+
+# Intervalo de atualização automática da aba de operações abertas na GUI (0 desativa)
+GUI_REFRESH_INTERVAL_MS = int(os.getenv('PLANOTRADE_GUI_REFRESH_MS', '5000'))
+
+# Feed de preços: origem usada pela GUI (CSV ou endereço de socket; vazio desativa)
+# e instrumento das operações (os trades não guardam o ativo)
+PRICE_FEED_SOURCE = os.getenv('PLANOTRADE_PRICE_FEED', '')
+PRICE_FEED_INSTRUMENT = os.getenv('PLANOTRADE_PRICE_INSTRUMENT', 'default')
+
+# Configurações de banco de dados; o SQLite padrão só vale quando nenhum backend em arquivo foi escolhido
+FILE_BACKEND_SELECTED = FILE_JOURNAL or FILE_GROUP_COMMIT or bool(MMAP_TRADES_FILE)
+DATABASE_URL = os.getenv('DATABASE_URL', '' if FILE_BACKEND_SELECTED else f'sqlite:///{DATA_DIR}/trades.db')
 
 # Configurações padrão do TradePlan
 DEFAULT_TRADE_PLAN = {
@@ -25,7 +52,21 @@ class Settings:
         self.base_dir = BASE_DIR
         self.data_dir = DATA_DIR
         self.trades_file = TRADES_FILE
+        self.file_journal = FILE_JOURNAL
+        self.journal_compact_threshold = JOURNAL_COMPACT_THRESHOLD
+        self.file_group_commit = FILE_GROUP_COMMIT
+        self.mmap_trades_file = MMAP_TRADES_FILE
+        self.repository_cache_size = REPOSITORY_CACHE_SIZE
+        self.daemon_socket = DAEMON_SOCKET
+        self.analytics_store_dir = ANALYTICS_STORE_DIR
+        self.gui_refresh_interval_ms = GUI_REFRESH_INTERVAL_MS
+        self.price_feed_source = PRICE_FEED_SOURCE
+        self.price_feed_instrument = PRICE_FEED_INSTRUMENT
         self.database_url = DATABASE_URL
         self.default_trade_plan = DEFAULT_TRADE_PLAN
 
+    def ensure_data_dir(self):
+        """Cria o diretório de dados (adiado até o primeiro uso)"""
+        self.data_dir.mkdir(exist_ok=True)
+
 settings = Settings()
\ No newline at end of file
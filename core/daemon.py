@@ -0,0 +1,117 @@
+import copy
+import json
+import os
+import socket
+import socketserver
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Tempo máximo de espera pela resposta do daemon
+CLIENT_TIMEOUT = 30.0
+
+class DaemonError(Exception):
+    """Erro retornado pelo daemon ao executar um comando"""
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Atende requisições JSON (uma por linha) usando o TradeService do servidor"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = self.server.dispatch(request['command'], request.get('args', {}))
+                response = {'ok': True, 'result': result}
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write((json.dumps(response, default=str) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor que mantém um TradeService aquecido (caches, pool de conexões)
+
+    Cada comando recebe uma cópia do plano inicial, como a CLI sem daemon,
+    que cria o plano padrão a cada execução: saldo e tamanho de posição de
+    um create não dependem de o daemon estar rodando.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, trade_service):
+        self.socket_path = Path(socket_path)
+        self.trade_service = trade_service
+        self._initial_plan = copy.deepcopy(trade_service.trade_plan)
+        # O TradeService não é thread-safe: os comandos são executados em série
+        self._service_lock = threading.Lock()
+        self._commands: Dict[str, Callable[..., Any]] = {
+            'ping': lambda: 'pong',
+            'create': self._create,
+            'list': self._list,
+            'close': self._close,
+        }
+        _remove_stale_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _Handler)
+
+    def dispatch(self, command: str, args: dict) -> Any:
+        handler = self._commands.get(command)
+        if handler is None:
+            raise ValueError(f"Comando desconhecido: {command}")
+        with self._service_lock:
+            self.trade_service.trade_plan = copy.deepcopy(self._initial_plan)
+            return handler(**args)
+
+    def _create(self, trade_data: dict) -> dict:
+        return self.trade_service.create_trade(trade_data).to_record()
+
+    def _list(self, limit: Optional[int] = None, after: Optional[int] = None) -> list:
+        trades = islice(self.trade_service.iter_open_trades(after_id=after), limit)
+        return [trade.to_record() for trade in trades]
+
+    def _close(self, trade_id: int, price: float, result: Optional[float] = None) -> dict:
+        return self.trade_service.close_trade(trade_id, price, result).to_record()
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove o arquivo de socket deixado por um daemon que não está mais rodando"""
+    if not socket_path.exists():
+        return
+    if _connect(socket_path) is not None:
+        raise RuntimeError(f"Já existe um daemon ativo em {socket_path}")
+    socket_path.unlink()
+
+def _connect(socket_path: Path) -> Optional[socket.socket]:
+    """Conecta ao daemon; retorna None se ele não estiver rodando"""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CLIENT_TIMEOUT)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        client.close()
+        return None
+    return client
+
+def forward(socket_path: str, command: str, **args) -> Any:
+    """Encaminha o comando ao daemon
+
+    Retorna None quando não há daemon rodando (o chamador executa localmente).
+    Erros do comando no daemon são levantados como DaemonError.
+    """
+    client = _connect(Path(socket_path))
+    if client is None:
+        return None
+    with client, client.makefile('rwb') as stream:
+        stream.write((json.dumps({'command': command, 'args': args}) + '\n').encode('utf-8'))
+        stream.flush()
+        response = json.loads(stream.readline())
+    if not response['ok']:
+        raise DaemonError(response['error'])
+    return response['result']
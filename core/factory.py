@@ -1,34 +1,104 @@
-from repositories.file_repository import FileRepository, FileUnitOfWork
-from repositories.sqlalchemy_repository import SQLAlchemyRepository, SQLAlchemyUnitOfWork
 from services.trade_service import TradeService
 from models.account import TradePlan
 from config.settings import settings
+from core.repository import CachedRepository
 
 class ServiceFactory:
     """Factory para criação dos serviços e dependências"""
     
     @staticmethod
-    def create_trade_service() -> TradeService:
-        """Cria uma instância do TradeService com todas as dependências"""
-        # Cria o TradePlan padrão
-        trade_plan = TradePlan(
+    def _default_trade_plan() -> TradePlan:
+        """Cria o TradePlan padrão a partir das configurações"""
+        return TradePlan(
             initial_balance=settings.default_trade_plan['initial_balance'],
             risk_per_trade=settings.default_trade_plan['risk_per_trade'],
             total_trades=settings.default_trade_plan['total_trades'],
             leverage=settings.default_trade_plan['leverage']
         )
+    
+    @staticmethod
+    def create_trade_service(background_compaction: bool = False) -> TradeService:
+        """Cria uma instância do TradeService com todas as dependências
+
+        background_compaction só vale para o modo journal: processos de longa
+        duração (daemon) compactam em segundo plano; a CLI compacta antes de
+        sair, senão a thread morreria com o processo e o journal nunca seria
+        zerado.
+        """
+        # Cria o TradePlan padrão
+        trade_plan = ServiceFactory._default_trade_plan()
         
         # Configura o repositório baseado nas configurações
+        # (os backends são importados sob demanda para acelerar a inicialização da CLI)
+        settings.ensure_data_dir()
         if settings.database_url:
+            from repositories.sqlalchemy_repository import SQLAlchemyRepository, SQLAlchemyUnitOfWork
             trade_repository = SQLAlchemyRepository(settings.database_url)
             unit_of_work = SQLAlchemyUnitOfWork(trade_repository)
+        elif settings.mmap_trades_file:
+            from repositories.file_repository import FileUnitOfWork
+            from repositories.mmap_repository import MmapTradeRepository
+            trade_repository = MmapTradeRepository(settings.mmap_trades_file)
+            unit_of_work = FileUnitOfWork(trade_repository)
+        elif settings.file_journal:
+            from repositories.file_repository import FileUnitOfWork
+            from repositories.journal_repository import JournalFileRepository
+            trade_repository = JournalFileRepository(
+                str(settings.trades_file),
+                compact_threshold=settings.journal_compact_threshold,
+                background_compaction=background_compaction
+            )
+            unit_of_work = FileUnitOfWork(trade_repository)
         else:
-            trade_repository = FileRepository(str(settings.trades_file))
+            from repositories.file_repository import FileRepository, FileUnitOfWork
+            trade_repository = FileRepository(str(settings.trades_file), group_commit=settings.file_group_commit)
             unit_of_work = FileUnitOfWork(trade_repository)
         
+        # Cache de leitura para os repositórios em arquivo (invalidado por mtime/tamanho);
+        # o binário já lê cada trade por offset
+        if not settings.database_url and not settings.mmap_trades_file and settings.repository_cache_size > 0:
+            trade_repository = CachedRepository(trade_repository, settings.repository_cache_size)
+        
         # Cria o TradeService
         return TradeService(
             trade_plan=trade_plan,
             trade_repository=trade_repository,
+            unit_of_work=unit_of_work,
+            analytics_store=ServiceFactory._create_analytics_store(trade_repository)
+        )
+    
+    @staticmethod
+    def _create_analytics_store(trade_repository):
+        """Abre o armazenamento colunar, se configurado, importando os trades já fechados na primeira vez"""
+        if not settings.analytics_store_dir:
+            return None
+        from repositories.parquet_store import ParquetTradeStore
+        from models.trade import TradeStatus
+        
+        store = ParquetTradeStore(settings.analytics_store_dir)
+        if store.is_empty():
+            store.append_many(trade_repository.iter_trades(status=TradeStatus.CLOSED))
+            store.flush()
+        return store
+    
+    @staticmethod
+    def create_async_trade_service():
+        """Cria o AsyncTradeService com o backend assíncrono equivalente"""
+        from services.async_trade_service import AsyncTradeService
+        
+        settings.ensure_data_dir()
+        if settings.database_url:
+            from repositories.async_sqlalchemy_repository import AsyncSQLAlchemyRepository, AsyncSQLAlchemyUnitOfWork
+            trade_repository = AsyncSQLAlchemyRepository(settings.database_url)
+            unit_of_work = AsyncSQLAlchemyUnitOfWork(trade_repository)
+        else:
+            from repositories.async_file_repository import AsyncFileRepository, AsyncFileUnitOfWork
+            # Reaproveita o repositório em arquivo configurado (journal/cache), executado em threads
+            trade_repository = AsyncFileRepository(ServiceFactory.create_trade_service().trade_repository)
+            unit_of_work = AsyncFileUnitOfWork(trade_repository)
+        
+        return AsyncTradeService(
+            trade_plan=ServiceFactory._default_trade_plan(),
+            trade_repository=trade_repository,
             unit_of_work=unit_of_work
         )
\ No newline at end of file
@@ -4,23 +4,37 @@ from config.settings import settings
 
 # Configuração do logging
 LOG_DIR = settings.data_dir / 'logs'
-LOG_DIR.mkdir(exist_ok=True)
 
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_FILE = LOG_DIR / 'planotrade.log'
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+class _DeferredFileHandler(logging.FileHandler):
+    """FileHandler que só cria o diretório e abre o arquivo no primeiro registro"""
+
+    def __init__(self, filename: Path):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 logger = logging.getLogger('planotrade')
 
+_configured = False
+
 def configure_logging():
-    """Configura o logging do sistema"""
-    logger.info('Logging configurado com sucesso')
-    logger.info(f'Logs serão salvos em: {LOG_FILE}')
\ No newline at end of file
+    """Configura o logging do sistema (chamado pelos pontos de entrada)"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            _DeferredFileHandler(LOG_FILE),
+            logging.StreamHandler()
+        ]
+    )
+    logger.debug('Logging configurado com sucesso')
+    logger.debug(f'Logs serão salvos em: {LOG_FILE}')
@@ -1,5 +1,7 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Iterator, TypeVar, List, Optional
 from datetime import datetime
 
 T = TypeVar('T')
@@ -32,6 +34,274 @@ class Repository(ABC, Generic[T]):
         """Remove uma entidade pelo ID"""
         pass
 
+    def find(self, **criteria) -> List[T]:
+        """Lista as entidades cujos atributos são iguais aos critérios informados"""
+        return [
+            entity for entity in self.list()
+            if all(getattr(entity, name) == value for name, value in criteria.items())
+        ]
+
+    def iter_trades(self, batch_size: int = 1000, after_id: Any = None,
+                    order_by: str = 'id', **criteria) -> Iterator[T]:
+        """Itera sobre as entidades em ordem, a partir da entidade seguinte a after_id
+
+        A ordenação usa (order_by, id) como chave. Esta implementação padrão
+        materializa list(); os backends a sobrescrevem com paginação por chave
+        para manter o uso de memória constante.
+        """
+        entities = sorted(self.find(**criteria), key=lambda e: _order_key(e, order_by))
+        if after_id is not None:
+            position = next((i for i, e in enumerate(entities) if getattr(e, 'id', None) == after_id), None)
+            if position is None and order_by == 'id':
+                entities = [e for e in entities if e.id is not None and e.id > after_id]
+            elif position is None:
+                entities = []
+            else:
+                entities = entities[position + 1:]
+        yield from entities
+
+    def add_many(self, entities: List[T], batch_size: int = 1000) -> None:
+        """Adiciona várias entidades (implementações podem gravar em lote)"""
+        for entity in entities:
+            self.add(entity)
+
+    def update_many(self, entities: List[T], batch_size: int = 1000) -> None:
+        """Atualiza várias entidades (implementações podem gravar em lote)"""
+        for entity in entities:
+            self.update(entity)
+
+    def cache_token(self) -> Optional[tuple]:
+        """Retorna um token que muda quando o armazenamento é alterado externamente
+
+        None indica que o repositório não consegue detectar alterações externas;
+        nesse caso o cache só é invalidado pelas escritas feitas através dele.
+        """
+        return None
+
+class CachedRepository(Repository[T]):
+    """Cache de leitura (identity map) sobre outro repositório
+
+    Mantém as entidades já decodificadas por ID, com limite de tamanho e
+    descarte LRU. O cache é invalidado quando o cache_token() do repositório
+    interno muda (ex.: mtime/tamanho do arquivo) e atualizado nas escritas
+    feitas através dele. As entidades retornadas são compartilhadas: alterações
+    devem ser persistidas com update().
+    """
+
+    def __init__(self, repository: Repository[T], max_size: int = 10000):
+        self.repository = repository
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Any, T]" = OrderedDict()
+        self._list_cache: Optional[List[T]] = None
+        self._find_cache: Dict[tuple, List[T]] = {}
+        self._token: Optional[tuple] = None
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        # Delega métodos específicos do backend (load_trade_plan, compact, ...)
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def _validate(self) -> None:
+        """Descarta o cache se o armazenamento foi alterado externamente"""
+        token = self.repository.cache_token()
+        if token != self._token:
+            if self._entries or self._list_cache is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._list_cache = None
+            self._find_cache.clear()
+            self._token = token
+
+    def _remember(self, entity: T) -> None:
+        """Insere/atualiza uma entidade no cache respeitando o limite LRU"""
+        entity_id = getattr(entity, 'id', None)
+        if entity_id is None or self.max_size <= 0:
+            return
+        self._entries[entity_id] = entity
+        self._entries.move_to_end(entity_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            # A lista completa deixa de caber no cache
+            self._list_cache = None
+
+    def invalidate(self, id: Any = None) -> None:
+        """Remove uma entidade (ou todo o cache, se id for None)"""
+        with self._lock:
+            if id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(id, None)
+            self._list_cache = None
+            self._find_cache.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores do cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
+
+    def get(self, id: Any) -> Optional[T]:
+        with self._lock:
+            self._validate()
+            if id in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(id)
+                return self._entries[id]
+            self.misses += 1
+            entity = self.repository.get(id)
+            if entity is not None:
+                self._remember(entity)
+            return entity
+
+    def list(self) -> List[T]:
+        with self._lock:
+            self._validate()
+            if self._list_cache is not None:
+                self.hits += 1
+                return list(self._list_cache)
+            self.misses += 1
+            entities = self.repository.list()
+            if len(entities) <= self.max_size:
+                # Reaproveita objetos já em cache para manter a identidade por ID
+                entities = [self._entries.get(getattr(e, 'id', None), e) for e in entities]
+                for entity in entities:
+                    self._remember(entity)
+                self._list_cache = entities
+            return list(entities)
+
+    def find(self, **criteria) -> List[T]:
+        with self._lock:
+            self._validate()
+            key = tuple(sorted(criteria.items()))
+            if key in self._find_cache:
+                self.hits += 1
+                return list(self._find_cache[key])
+            if self._list_cache is not None:
+                self.hits += 1
+                entities = [
+                    e for e in self._list_cache
+                    if all(getattr(e, name) == value for name, value in criteria.items())
+                ]
+            else:
+                self.misses += 1
+                entities = [
+                    self._entries.get(getattr(e, 'id', None), e)
+                    for e in self.repository.find(**criteria)
+                ]
+                for entity in entities:
+                    self._remember(entity)
+            if len(entities) <= self.max_size:
+                self._find_cache[key] = entities
+            return list(entities)
+
+    def iter_trades(self, batch_size: int = 1000, after_id: Any = None,
+                    order_by: str = 'id', **criteria) -> Iterator[T]:
+        # Leituras em streaming não passam pelo cache para manter a memória constante
+        return self.repository.iter_trades(batch_size, after_id, order_by, **criteria)
+
+    def _after_write(self) -> None:
+        """Aceita o novo token gerado pela própria escrita"""
+        # Os resultados de find() podem ter mudado com a escrita
+        self._find_cache.clear()
+        self._token = self.repository.cache_token()
+
+    def add(self, entity: T) -> None:
+        with self._lock:
+            self._validate()
+            try:
+                self.repository.add(entity)
+            except Exception:
+                self.invalidate()
+                raise
+            self._remember(entity)
+            if self._list_cache is not None:
+                self._list_cache.append(entity)
+            self._after_write()
+
+    def add_many(self, entities: List[T], batch_size: int = 1000) -> None:
+        with self._lock:
+            self._validate()
+            try:
+                self.repository.add_many(entities, batch_size)
+            except Exception:
+                self.invalidate()
+                raise
+            for entity in entities:
+                self._remember(entity)
+            if self._list_cache is not None:
+                self._list_cache.extend(entities)
+            self._after_write()
+
+    def update_many(self, entities: List[T], batch_size: int = 1000) -> None:
+        with self._lock:
+            self._validate()
+            try:
+                self.repository.update_many(entities, batch_size)
+            except Exception:
+                self.invalidate()
+                raise
+            updated = {getattr(e, 'id', None): e for e in entities}
+            for entity in entities:
+                self._remember(entity)
+            if self._list_cache is not None:
+                self._list_cache = [updated.get(getattr(e, 'id', None), e) for e in self._list_cache]
+            self._after_write()
+
+    def update(self, entity: T) -> None:
+        with self._lock:
+            self._validate()
+            entity_id = getattr(entity, 'id', None)
+            try:
+                self.repository.update(entity)
+            except Exception:
+                self.invalidate(entity_id)
+                raise
+            cached = self._entries.get(entity_id)
+            self._remember(entity)
+            if self._list_cache is not None and cached is not entity:
+                self._list_cache = [
+                    entity if getattr(e, 'id', None) == entity_id else e
+                    for e in self._list_cache
+                ]
+            self._after_write()
+
+    def delete(self, id: Any) -> None:
+        with self._lock:
+            self._validate()
+            try:
+                self.repository.delete(id)
+            except Exception:
+                self.invalidate(id)
+                raise
+            self._entries.pop(id, None)
+            if self._list_cache is not None:
+                self._list_cache = [e for e in self._list_cache if getattr(e, 'id', None) != id]
+            self._after_write()
+
+    def cache_token(self) -> Optional[tuple]:
+        return self.repository.cache_token()
+
+def _order_key(entity: Any, order_by: str) -> tuple:
+    """Chave de ordenação (campo, id) usada na paginação"""
+    entity_id = getattr(entity, 'id', None)
+    id_key = (entity_id is None, entity_id or 0)
+    if order_by == 'id':
+        return id_key
+    return (getattr(entity, order_by), id_key)
+
 class UnitOfWork(ABC):
     """Interface para Unit of Work"""
     
@@ -53,4 +323,56 @@ class UnitOfWork(ABC):
     @abstractmethod
     def rollback(self):
         """Desfaz as alterações"""
-        pass
\ No newline at end of file
+        pass
+
+class AsyncRepository(ABC, Generic[T]):
+    """Interface base para repositórios assíncronos (mesmas operações de Repository)"""
+    
+    @abstractmethod
+    async def add(self, entity: T) -> None:
+        """Adiciona uma nova entidade ao repositório"""
+        pass
+    
+    @abstractmethod
+    async def get(self, id: Any) -> Optional[T]:
+        """Obtém uma entidade pelo ID"""
+        pass
+    
+    @abstractmethod
+    async def list(self) -> List[T]:
+        """Lista todas as entidades"""
+        pass
+    
+    @abstractmethod
+    async def update(self, entity: T) -> None:
+        """Atualiza uma entidade existente"""
+        pass
+    
+    @abstractmethod
+    async def delete(self, id: Any) -> None:
+        """Remove uma entidade pelo ID"""
+        pass
+
+    async def find(self, **criteria) -> List[T]:
+        """Lista as entidades cujos atributos são iguais aos critérios informados"""
+        return [
+            entity for entity in await self.list()
+            if all(getattr(entity, name) == value for name, value in criteria.items())
+        ]
+
+    async def close(self) -> None:
+        """Libera os recursos do repositório (conexões, threads)"""
+        pass
+
+class AsyncUnitOfWork(ABC):
+    """Interface para Unit of Work assíncrona (async with)"""
+    
+    @abstractmethod
+    async def __aenter__(self):
+        """Inicia uma transação"""
+        pass
+    
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Finaliza a transação"""
+        pass
@@ -1,7 +1,16 @@
-from pydantic import BaseModel, validator, Field
-from typing import Literal
+from pydantic import BaseModel, TypeAdapter, ValidationError, ValidationInfo, field_validator, Field
+from typing import Dict, List, Literal, Optional, Union, get_args
 from datetime import datetime
 
+def _price_is_valid(trade_type: str, entry: float, value: float, field: str) -> bool:
+    """Regra de preço compartilhada pelo schema e pelo caminho rápido
+
+    Long: stop < entrada < alvo; short: alvo < entrada < stop.
+    """
+    if (trade_type == 'long') == (field == 'target'):
+        return value > entry
+    return value < entry
+
 class TradeSchema(BaseModel):
     """Schema para validação de dados de trade"""
     type: Literal['long', 'short']
@@ -12,22 +21,19 @@ class TradeSchema(BaseModel):
     stop: float
     timestamp: datetime = Field(default_factory=datetime.now)
 
-    @validator('target', 'stop')
-    def validate_prices(cls, value, values):
+    @field_validator('target', 'stop')
+    @classmethod
+    def validate_prices(cls, value, info: ValidationInfo):
+        values = info.data
         if 'type' not in values:
             return value
-            
-        if values['type'] == 'long':
-            if 'entry' in values:
-                if value <= values['entry']:
-                    raise ValueError('Preço inválido para operação long')
-        else:
-            if 'entry' in values:
-                if value >= values['entry']:
-                    raise ValueError('Preço inválido para operação short')
+
+        if 'entry' in values and not _price_is_valid(values['type'], values['entry'], value, info.field_name):
+            raise ValueError(f"Preço inválido para operação {values['type']}")
         return value
 
-    @validator('position_size')
+    @field_validator('position_size')
+    @classmethod
     def validate_position_size(cls, value):
         if not 1 <= value <= 100:
             raise ValueError('Tamanho da posição deve estar entre 1% e 100%')
@@ -38,4 +44,109 @@ class TradePlanSchema(BaseModel):
     initial_balance: float = Field(gt=0)
     risk_per_trade: float = Field(ge=0.1, le=5)
     total_trades: int = Field(ge=1)
-    leverage: int = Field(ge=1, le=10)
\ No newline at end of file
+    leverage: int = Field(ge=1, le=10)
+
+def _field_bounds(model, name: str) -> tuple:
+    """Extrai os limites ge/le declarados em um campo do schema"""
+    lower = upper = None
+    for constraint in model.model_fields[name].metadata:
+        lower = getattr(constraint, 'ge', lower)
+        upper = getattr(constraint, 'le', upper)
+    return lower, upper
+
+# Regras do caminho rápido derivadas do próprio TradeSchema
+_TRADE_TYPES = get_args(TradeSchema.model_fields['type'].annotation)
+_LEVERAGE_MIN, _LEVERAGE_MAX = _field_bounds(TradeSchema, 'leverage')
+_POSITION_MIN, _POSITION_MAX = _field_bounds(TradeSchema, 'position_size')
+_NUMBER_TYPES = (int, float)
+
+def _fast_validate(data: dict) -> Optional[dict]:
+    """Valida o caso comum (tipos já corretos) sem passar pelo pydantic
+
+    Retorna None sempre que a entrada exigir conversão ou for inválida; nesse
+    caso o TradeSchema é usado, garantindo as mesmas mensagens de erro.
+    """
+    try:
+        trade_type = data['type']
+        leverage = data['leverage']
+        position_size = data['position_size']
+        entry = data['entry']
+        target = data['target']
+        stop = data['stop']
+    except (KeyError, TypeError):
+        return None
+    if type(trade_type) is not str or trade_type not in _TRADE_TYPES:
+        return None
+    if type(leverage) is not int or not _LEVERAGE_MIN <= leverage <= _LEVERAGE_MAX:
+        return None
+    if type(position_size) not in _NUMBER_TYPES or not _POSITION_MIN <= position_size <= _POSITION_MAX:
+        return None
+    if type(entry) not in _NUMBER_TYPES or type(target) not in _NUMBER_TYPES or type(stop) not in _NUMBER_TYPES:
+        return None
+    entry = float(entry)
+    target = float(target)
+    stop = float(stop)
+    if not _price_is_valid(trade_type, entry, target, 'target') or not _price_is_valid(trade_type, entry, stop, 'stop'):
+        return None
+    timestamp = data.get('timestamp')
+    if timestamp is None:
+        if 'timestamp' in data:
+            return None
+        timestamp = datetime.now()
+    elif type(timestamp) is not datetime:
+        return None
+    return {
+        'type': trade_type,
+        'leverage': leverage,
+        'position_size': float(position_size),
+        'entry': entry,
+        'target': target,
+        'stop': stop,
+        'timestamp': timestamp
+    }
+
+def validate_trade(data: dict) -> dict:
+    """Valida um trade e retorna os dados normalizados (levanta ValidationError)"""
+    validated = _fast_validate(data)
+    if validated is None:
+        validated = TradeSchema.model_validate(data).model_dump()
+    return validated
+
+# Lista de TradeSchema validada e serializada em uma chamada ao pydantic-core
+_TRADE_LIST = TypeAdapter(List[TradeSchema])
+
+def _validate_many(rows: List[dict]) -> List[Union[dict, ValidationError]]:
+    """Valida as linhas com o TradeSchema em lote; linhas inválidas recebem o próprio ValidationError
+
+    Os erros do lote são separados pela posição da linha (primeiro item do
+    loc); só as linhas válidas são validadas de novo para obter os dados.
+    """
+    try:
+        return _TRADE_LIST.dump_python(_TRADE_LIST.validate_python(rows))
+    except ValidationError as e:
+        errors: Dict[int, list] = {}
+        for error in e.errors():
+            details = {'type': error['type'], 'loc': error['loc'][1:], 'input': error['input']}
+            if 'ctx' in error:
+                details['ctx'] = error['ctx']
+            errors.setdefault(error['loc'][0], []).append(details)
+    valid = iter(_TRADE_LIST.dump_python(_TRADE_LIST.validate_python(
+        [row for position, row in enumerate(rows) if position not in errors]
+    )))
+    return [
+        ValidationError.from_exception_data(TradeSchema.__name__, errors[position]) if position in errors else next(valid)
+        for position in range(len(rows))
+    ]
+
+def validate_trades(rows: List[dict]) -> List[Union[dict, ValidationError]]:
+    """Valida um lote de trades; cada posição contém os dados validados ou o erro
+
+    O caso comum passa pelo caminho rápido; as linhas restantes (ex.: texto
+    de CSV) são validadas juntas pelo TradeSchema.
+    """
+    results: List[Union[dict, ValidationError, None]] = [_fast_validate(row) for row in rows]
+    slow = [position for position, validated in enumerate(results) if validated is None]
+    if slow:
+        for position, validated in zip(slow, _validate_many([rows[position] for position in slow])):
+            results[position] = validated
+    return results
@@ -1,7 +1,6 @@
 from dataclasses import dataclass, field
-from typing import List
 from datetime import datetime
-from .trade import TradeResult, AccountOperation
+from .history import TradeHistory, OperationHistory
 
 @dataclass
 class TradePlan:
@@ -9,8 +8,8 @@ class TradePlan:
     total_trades: int
     current_balance: float = field(init=False)
     completed_trades: int = 0
-    trade_history: List[TradeResult] = field(default_factory=list)
-    account_operations: List[AccountOperation] = field(default_factory=list)
+    trade_history: TradeHistory = field(default_factory=TradeHistory)
+    account_operations: OperationHistory = field(default_factory=OperationHistory)
     max_drawdown: float = 0
     max_balance: float = field(init=False)
     leverage: int = 2  # Default 2x leverage (1-10)
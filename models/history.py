@@ -0,0 +1,297 @@
+from abc import abstractmethod
+from collections.abc import MutableSequence
+from typing import TYPE_CHECKING, Iterable, Iterator, List
+from models.trade import AccountOperation, AccountOperationType, TradeResult
+
+if TYPE_CHECKING:
+    import numpy as np
+    from models import records as _records
+else:
+    # NumPy e os codecs de models.records (que importa o NumPy) são carregados
+    # na primeira alocação de colunas: um TradePlan vazio não paga esse import
+    np = _records = None
+
+def _load_numpy() -> None:
+    global np, _records
+    if np is None:
+        import numpy
+        from models import records
+        np, _records = numpy, records
+
+INITIAL_CAPACITY = 64
+
+# Linhas decodificadas por bloco na iteração
+_ITER_CHUNK = 4096
+
+class _ColumnarSequence(MutableSequence):
+    """Sequência guardada em colunas NumPy com capacidade dobrada ao encher
+
+    Cada campo do dtype (e cada agregado da subclasse) fica em um array
+    próprio, então append é O(1) amortizado e column() expõe a coluna sem
+    cópia. As colunas só são alocadas no primeiro item. A indexação
+    reconstrói o objeto da linha: os objetos devolvidos são cópias e
+    alterações precisam ser regravadas com seq[i] = objeto.
+    edited indica que itens existentes foram alterados, removidos ou
+    inseridos (append/extend não contam); quem grava o histórico limpa a marca.
+    """
+
+    aggregates: tuple = ()
+
+    def __init__(self, items: Iterable = ()):
+        self.edited = False
+        self._size = 0
+        self._names: tuple = ()
+        self._columns = None
+        self.extend(items)
+
+    @classmethod
+    @abstractmethod
+    def _dtype(cls) -> 'np.dtype':
+        """dtype das colunas (chamado na alocação, com o NumPy já carregado)"""
+        pass
+
+    def _allocate(self) -> None:
+        _load_numpy()
+        dtype = self._dtype()
+        self._names = dtype.names
+        self._columns = {name: np.zeros(INITIAL_CAPACITY, dtype[name]) for name in self._names}
+        for name in self.aggregates:
+            self._columns[name] = np.zeros(INITIAL_CAPACITY, 'float64')
+
+    @abstractmethod
+    def _encode(self, items: List) -> 'np.ndarray':
+        """Converte os itens em um array estruturado do dtype"""
+        pass
+
+    @abstractmethod
+    def _encode_row(self, item) -> tuple:
+        """Valores de um único item na ordem do dtype (caminho rápido do append)"""
+        pass
+
+    @abstractmethod
+    def _decode(self, values: tuple):
+        """Reconstrói o item a partir dos valores de uma linha"""
+        pass
+
+    def _update_aggregates(self, start: int) -> None:
+        """Recalcula os agregados a partir da linha start (as anteriores não mudaram)"""
+
+    def _reserve(self, size: int) -> None:
+        if self._columns is None:
+            self._allocate()
+        capacity = len(self._columns[self._names[0]])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('índice fora do intervalo')
+        return index
+
+    def _row(self, index: int) -> tuple:
+        return tuple(self._columns[name].item(index) for name in self._names)
+
+    def column(self, name: str) -> 'np.ndarray':
+        """Visão somente leitura da coluna (campo ou agregado), sem cópia"""
+        if self._columns is None:
+            self._allocate()
+        view = self._columns[name][:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(self._row(i)) for i in range(*index.indices(self._size))]
+        return self._decode(self._row(self._index(index)))
+
+    def __iter__(self) -> Iterator:
+        for start in range(0, self._size, _ITER_CHUNK):
+            end = min(start + _ITER_CHUNK, self._size)
+            columns = [self._columns[name][start:end].tolist() for name in self._names]
+            for values in zip(*columns):
+                yield self._decode(values)
+
+    def extend(self, items: Iterable) -> None:
+        items = list(items)
+        if not items:
+            return
+        start, end = self._size, self._size + len(items)
+        self._reserve(end)
+        records = self._encode(items)
+        for name in self._names:
+            self._columns[name][start:end] = records[name]
+        self._size = end
+        self._update_aggregates(start)
+
+    def append(self, item) -> None:
+        index = self._size
+        self._reserve(index + 1)
+        for name, value in zip(self._names, self._encode_row(item)):
+            self._columns[name][index] = value
+        self._size = index + 1
+        self._update_aggregates(index)
+
+    def insert(self, index: int, item) -> None:
+        index = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self.edited = True
+        self._reserve(self._size + 1)
+        record = self._encode([item])
+        for name in self._names:
+            column = self._columns[name]
+            column[index + 1:self._size + 1] = column[index:self._size]
+            column[index] = record[name][0]
+        self._size += 1
+        self._update_aggregates(index)
+
+    def __setitem__(self, index, item) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = item
+            self.clear()
+            self.extend(items)
+            return
+        index = self._index(index)
+        self.edited = True
+        record = self._encode([item])
+        for name in self._names:
+            self._columns[name][index] = record[name][0]
+        self._update_aggregates(index)
+
+    def __delitem__(self, index) -> None:
+        self.edited = True
+        if self._columns is None:
+            self._allocate()
+        keep = np.ones(self._size, dtype=bool)
+        keep[index if isinstance(index, slice) else self._index(index)] = False
+        size = int(keep.sum())
+        for name, column in self._columns.items():
+            column[:size] = column[:self._size][keep]
+        self._size = size
+        self._update_aggregates(0)
+
+    def clear(self) -> None:
+        self.edited = True
+        self._size = 0
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._size} itens)'
+
+class TradeHistory(_ColumnarSequence):
+    """Histórico de trades em colunas, com saldo e PnL acumulado mantidos no append
+
+    Itera como uma lista de TradeResult para o código existente e expõe as
+    colunas (column('result'), column('balance_after'), ...) para as análises.
+    """
+
+    aggregates = ('cumulative_pnl', 'peak_balance')
+
+    @classmethod
+    def _dtype(cls) -> 'np.dtype':
+        return _records.TRADE_DTYPE
+
+    def _encode(self, items: List[TradeResult]) -> 'np.ndarray':
+        return _records.encode_records(items)
+
+    def _encode_row(self, item: TradeResult) -> tuple:
+        return _records.encode_row(item)
+
+    def _decode(self, values: tuple) -> TradeResult:
+        return _records.decode_record(values)
+
+    def _update_aggregates(self, start: int) -> None:
+        end = self._size
+        if start >= end:
+            return
+        pnl = self._columns['cumulative_pnl']
+        peak = self._columns['peak_balance']
+        if end - start == 1:
+            # append: atualização escalar, sem criar arrays
+            result = self._columns['result'].item(start)
+            balance = self._columns['balance_after'].item(start)
+            pnl[start] = pnl.item(start - 1) + result if start else result
+            peak[start] = max(peak.item(start - 1), balance) if start else balance
+            return
+        pnl[start:end] = np.cumsum(self._columns['result'][start:end]) + (pnl[start - 1] if start else 0.0)
+        running_peak = np.maximum.accumulate(self._columns['balance_after'][start:end])
+        peak[start:end] = np.maximum(running_peak, peak[start - 1]) if start else running_peak
+
+    @property
+    def balances(self) -> 'np.ndarray':
+        """Saldo após cada trade"""
+        return self.column('balance_after')
+
+    @property
+    def cumulative_pnl(self) -> 'np.ndarray':
+        return self.column('cumulative_pnl')
+
+    @property
+    def peak_balance(self) -> 'np.ndarray':
+        """Maior saldo até cada trade"""
+        return self.column('peak_balance')
+
+    @property
+    def drawdown(self) -> 'np.ndarray':
+        return self.peak_balance - self.balances
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(self.drawdown.max()) if self._size else 0.0
+
+OPERATION_FIELDS = [('amount', '<f8'), ('timestamp', '<M8[us]'), ('type', 'i1')]
+OPERATION_TYPES = tuple(AccountOperationType)
+
+class OperationHistory(_ColumnarSequence):
+    """Aportes e saques em colunas, com o saldo líquido acumulado mantido no append"""
+
+    aggregates = ('net_amount',)
+
+    @classmethod
+    def _dtype(cls) -> 'np.dtype':
+        return np.dtype(OPERATION_FIELDS)
+
+    def _encode_row(self, item: AccountOperation) -> tuple:
+        return item.amount, np.datetime64(item.timestamp, 'us'), OPERATION_TYPES.index(item.type)
+
+    def _encode(self, items: List[AccountOperation]) -> 'np.ndarray':
+        records = np.zeros(len(items), OPERATION_FIELDS)
+        records['amount'] = [operation.amount for operation in items]
+        records['timestamp'] = [np.datetime64(operation.timestamp, 'us') for operation in items]
+        records['type'] = [OPERATION_TYPES.index(operation.type) for operation in items]
+        return records
+
+    def _decode(self, values: tuple) -> AccountOperation:
+        amount, timestamp, type_code = values
+        # Mesmo formato usado pelo AccountService ('%Y-%m-%d %H:%M:%S')
+        return AccountOperation(
+            type=OPERATION_TYPES[type_code],
+            amount=amount,
+            timestamp=str(timestamp) if timestamp is not None else None
+        )
+
+    def _update_aggregates(self, start: int) -> None:
+        end = self._size
+        if start >= end:
+            return
+        withdraw = OPERATION_TYPES.index(AccountOperationType.WITHDRAW)
+        amounts = self._columns['amount'][start:end]
+        signed = np.where(self._columns['type'][start:end] == withdraw, -amounts, amounts)
+        net = self._columns['net_amount']
+        net[start:end] = np.cumsum(signed) + (net[start - 1] if start else 0.0)
+
+    @property
+    def net_amount(self) -> 'np.ndarray':
+        """Aportes menos saques acumulados até cada operação"""
+        return self.column('net_amount')
@@ -0,0 +1,122 @@
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import List
+import numpy as np
+from models.trade import TradeResult, TradeType, TradeStatus, enum_member
+
+# Registro de tamanho fixo de um TradeResult (96 bytes com alinhamento)
+TRADE_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('entry', '<f8'),
+    ('target', '<f8'),
+    ('stop', '<f8'),
+    ('result', '<f8'),
+    ('balance_before', '<f8'),
+    ('balance_after', '<f8'),
+    ('position_size_percent', '<f8'),
+    ('close_price', '<f8'),
+    ('timestamp', '<M8[us]'),
+    ('close_timestamp', '<M8[us]'),
+    ('leverage', '<i4'),
+    ('type', 'i1'),
+    ('status', 'i1'),
+], align=True)
+
+# Códigos gravados nas colunas type/status (posição no enum)
+TRADE_TYPES = tuple(TradeType)
+TRADE_STATUSES = tuple(TradeStatus)
+
+_TYPE_CODES = {member: code for code, member in enumerate(TRADE_TYPES)}
+_STATUS_CODES = {member: code for code, member in enumerate(TRADE_STATUSES)}
+
+_TIME_FIELDS = ('timestamp', 'close_timestamp')
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = np.datetime64('NaT', 'us')
+
+def _to_datetime64(value) -> np.datetime64:
+    """Converte o timestamp ISO (ou datetime) em microssegundos desde a época; vazio vira NaT"""
+    if not value:
+        return _NAT
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    # Aritmética de timedelta é mais rápida que np.datetime64(datetime)
+    return np.datetime64((value - _EPOCH) // _MICROSECOND, 'us')
+
+def encode_field(name: str, value):
+    """Converte o valor de um campo do TradeResult para o tipo da coluna"""
+    if name == 'type':
+        return _TYPE_CODES[enum_member(TradeType, value)]
+    if name == 'status':
+        return _STATUS_CODES[enum_member(TradeStatus, value)]
+    if name in _TIME_FIELDS:
+        return _to_datetime64(value)
+    if name == 'id' and value is None:
+        # 0 representa trade ainda sem ID (os IDs começam em 1)
+        return 0
+    return value
+
+def _to_datetime64_array(values: List) -> np.ndarray:
+    # O NumPy converte textos ISO sem fuso de uma vez; os demais passam por _to_datetime64
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            return np.array([value or None for value in values], dtype='M8[us]')
+    except (ValueError, TypeError, Warning):
+        return np.array([_to_datetime64(value) for value in values], dtype='M8[us]')
+
+def encode_records(entities: List[TradeResult]) -> np.ndarray:
+    """Converte os TradeResult em um array do TRADE_DTYPE, coluna a coluna"""
+    records = np.zeros(len(entities), TRADE_DTYPE)
+    for name in TRADE_DTYPE.names:
+        values = [getattr(entity, name) for entity in entities]
+        if name in _TIME_FIELDS:
+            records[name] = _to_datetime64_array(values)
+        elif name in ('type', 'status', 'id'):
+            records[name] = [encode_field(name, value) for value in values]
+        else:
+            records[name] = values
+    return records
+
+def encode_row(entity: TradeResult) -> tuple:
+    """Valores de um único TradeResult na ordem do TRADE_DTYPE"""
+    return (
+        encode_field('id', entity.id),
+        entity.entry,
+        entity.target,
+        entity.stop,
+        entity.result,
+        entity.balance_before,
+        entity.balance_after,
+        entity.position_size_percent,
+        entity.close_price,
+        _to_datetime64(entity.timestamp),
+        _to_datetime64(entity.close_timestamp),
+        entity.leverage,
+        encode_field('type', entity.type),
+        encode_field('status', entity.status),
+    )
+
+def decode_record(values: tuple) -> TradeResult:
+    """Converte a tupla de um registro (record.item()) em TradeResult"""
+    (id, entry, target, stop, result, balance_before, balance_after, position_size_percent,
+     close_price, timestamp, close_timestamp, leverage, type_code, status_code) = values
+    return TradeResult(
+        type=TRADE_TYPES[type_code],
+        entry=entry,
+        target=target,
+        stop=stop,
+        result=result,
+        balance_before=balance_before,
+        balance_after=balance_after,
+        timestamp=timestamp.isoformat() if timestamp is not None else None,
+        leverage=leverage,
+        position_size_percent=position_size_percent,
+        id=id or None,
+        status=TRADE_STATUSES[status_code],
+        close_price=close_price,
+        close_timestamp=close_timestamp.isoformat() if close_timestamp is not None else None
+    )
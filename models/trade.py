@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
-from typing import Optional
-from pydantic import validator
+from typing import Dict, Optional
+from utils.math_utils import calculate_pnl
 
 class TradeType(Enum):
     LONG = 'long'
@@ -12,8 +12,12 @@ class TradeStatus(Enum):
     OPEN = 'open'
     CLOSED = 'closed'
 
-@dataclass
-class TradeResult:
+class _DerivedMetrics:
+    # Slot do cache de gain/loss, fora dos campos do dataclass (não entra em eq/repr/fields)
+    __slots__ = ('_metrics',)
+
+@dataclass(slots=True)
+class TradeResult(_DerivedMetrics):
     type: TradeType
     entry: float
     target: float
@@ -29,46 +33,97 @@ class TradeResult:
     close_price: float = 0.0
     close_timestamp: str = None
 
-    @validator('stop')
-    def validate_stop_price(cls, v, values):
-        """Valida o preço de stop"""
-        if v <= 0:
-            raise ValueError('Preço inválido para operação')
-            
-        # Validação específica para operações short
-        if 'type' in values and values['type'] == TradeType.SHORT:
-            if 'entry' in values and v >= values['entry']:
-                raise ValueError('Para operações short, o stop deve ser menor que a entrada')
-        # Validação para operações long
-        elif 'type' in values and values['type'] == TradeType.LONG:
-            if 'entry' in values and v <= values['entry']:
-                raise ValueError('Para operações long, o stop deve ser maior que a entrada')
-                
-        return v
+    def _derived(self) -> tuple:
+        """(gain, loss) calculados uma vez e recalculados só se tipo, preços, tamanho ou alavancagem mudarem"""
+        key = (self.type, self.entry, self.target, self.stop, self.position_size_percent, self.leverage)
+        try:
+            cached_key, gain, loss = self._metrics
+            if cached_key == key:
+                return gain, loss
+        except AttributeError:
+            pass
+        position_size = (self.position_size_percent / 100) * self.leverage
+        trade_type = self.type.value
+        gain = calculate_pnl(entry=self.entry, exit_price=self.target, position_size=position_size, trade_type=trade_type)
+        loss = calculate_pnl(entry=self.entry, exit_price=self.stop, position_size=position_size, trade_type=trade_type)
+        self._metrics = (key, gain, loss)
+        return gain, loss
 
     @property
     def gain(self):
-        from utils.math_utils import calculate_pnl
-        return calculate_pnl(
-            entry=self.entry,
-            exit_price=self.target,
-            position_size=(self.position_size_percent / 100) * self.leverage,
-            trade_type=self.type.value
-        )
+        return self._derived()[0]
 
     @property
     def loss(self):
-        from utils.math_utils import calculate_pnl
-        return calculate_pnl(
-            entry=self.entry,
-            exit_price=self.stop,
-            position_size=(self.position_size_percent / 100) * self.leverage,
-            trade_type=self.type.value
-        )
+        return self._derived()[1]
 
     @property
     def risk_reward(self):
-        return abs(self.gain / self.loss)
+        gain, loss = self._derived()
+        return abs(gain / loss)
+
+    def to_record(self) -> dict:
+        """Dicionário serializável em JSON (enums pelo valor, datas em ISO 8601)"""
+        return {
+            'type': self.type.value,
+            'entry': self.entry,
+            'target': self.target,
+            'stop': self.stop,
+            'result': self.result,
+            'balance_before': self.balance_before,
+            'balance_after': self.balance_after,
+            'timestamp': _isoformat(self.timestamp),
+            'leverage': self.leverage,
+            'position_size_percent': self.position_size_percent,
+            'id': self.id,
+            'status': self.status.value,
+            'close_price': self.close_price,
+            'close_timestamp': _isoformat(self.close_timestamp),
+        }
+
+    @classmethod
+    def from_record(cls, data: dict) -> 'TradeResult':
+        """Reconstrói o trade de to_record
+
+        Aceita também os registros antigos: enums gravados como
+        'TradeType.LONG', ID em texto e campos de fechamento ausentes.
+        """
+        trade_id = data.get('id')
+        return cls(
+            type=enum_member(TradeType, data['type']),
+            entry=data['entry'],
+            target=data['target'],
+            stop=data['stop'],
+            result=data['result'],
+            balance_before=data['balance_before'],
+            balance_after=data['balance_after'],
+            timestamp=data['timestamp'],
+            leverage=data['leverage'],
+            position_size_percent=data['position_size_percent'],
+            id=int(trade_id) if isinstance(trade_id, str) else trade_id,
+            status=enum_member(TradeStatus, data.get('status', 'open')),
+            close_price=data.get('close_price', 0.0),
+            close_timestamp=data.get('close_timestamp')
+        )
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+# Tabelas de enum_member, montadas no primeiro uso de cada enum
+_ENUM_TABLES: Dict[type, dict] = {}
+
+def enum_member(enum_class, value):
+    """Membro do enum a partir do membro, do valor ('long') ou do texto de versões antigas ('TradeType.LONG')"""
+    table = _ENUM_TABLES.get(enum_class)
+    if table is None:
+        table = _ENUM_TABLES[enum_class] = {}
+        for member in enum_class:
+            table[member] = table[member.value] = table[str(member)] = table[member.name] = member
+    try:
+        return table[value]
+    except (KeyError, TypeError):
+        # Variações de caixa ('Long', 'tradetype.long'); valores desconhecidos levantam ValueError
+        return enum_class(str(value).rpartition('.')[2].lower())
 
 class AccountOperationType(Enum):
     DEPOSIT = 'deposit'
@@ -0,0 +1,95 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, List, Optional
+from models.trade import TradeResult
+from core.repository import AsyncRepository, AsyncUnitOfWork, Repository
+
+class AsyncFileRepository(AsyncRepository[TradeResult]):
+    """Adapta um repositório síncrono (FileRepository, journal, cache) para asyncio
+
+    Cada operação roda em um executor, então o loop de eventos não bloqueia
+    na leitura/gravação do arquivo. As operações são serializadas por um
+    asyncio.Lock; a tarefa dentro de uma AsyncFileUnitOfWork mantém o lock até
+    o commit. O executor padrão tem uma única thread, porque a transação dos
+    repositórios em arquivo pertence à thread que a iniciou.
+    """
+
+    def __init__(self, repository: Repository[TradeResult], executor: Optional[Executor] = None):
+        self.repository = repository
+        # Só o executor criado aqui é encerrado em close()
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='planotrade-file')
+        self._lock = asyncio.Lock()
+        # Marca a tarefa que está dentro da Unit of Work (e já detém o lock)
+        self._in_transaction: ContextVar[bool] = ContextVar(f'async_file_tx_{id(self)}', default=False)
+
+    async def _run_unlocked(self, func, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """Executa a operação síncrona no executor, serializada com as demais"""
+        if self._in_transaction.get():
+            return await self._run_unlocked(func, *args, **kwargs)
+        async with self._lock:
+            return await self._run_unlocked(func, *args, **kwargs)
+
+    async def add(self, entity: TradeResult) -> None:
+        await self._run(self.repository.add, entity)
+
+    async def get(self, id: int) -> Optional[TradeResult]:
+        return await self._run(self.repository.get, id)
+
+    async def list(self) -> List[TradeResult]:
+        return await self._run(self.repository.list)
+
+    async def find(self, **criteria) -> List[TradeResult]:
+        return await self._run(self.repository.find, **criteria)
+
+    async def update(self, entity: TradeResult) -> None:
+        await self._run(self.repository.update, entity)
+
+    async def delete(self, id: int) -> None:
+        await self._run(self.repository.delete, id)
+
+    async def close(self) -> None:
+        """Encerra o executor criado pelo repositório (aguardando as operações em andamento)"""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+class AsyncFileUnitOfWork(AsyncUnitOfWork):
+    """Unit of Work assíncrona sobre a transação em buffer do FileRepository"""
+
+    def __init__(self, repository: AsyncFileRepository):
+        self.repository = repository
+        self._depth: ContextVar[int] = ContextVar(f'async_file_uow_depth_{id(self)}', default=0)
+
+    async def __aenter__(self):
+        depth = self._depth.get()
+        if depth == 0:
+            await self.repository._lock.acquire()
+            try:
+                await self.repository._run_unlocked(self.repository.repository.begin_transaction)
+            except BaseException:
+                self.repository._lock.release()
+                raise
+            self.repository._in_transaction.set(True)
+        self._depth.set(depth + 1)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        depth = self._depth.get() - 1
+        self._depth.set(depth)
+        if depth:
+            return
+        repository = self.repository.repository
+        try:
+            if exc_type is not None:
+                await self.repository._run_unlocked(repository.rollback_transaction)
+            else:
+                await self.repository._run_unlocked(repository.commit_transaction)
+        finally:
+            self.repository._in_transaction.set(False)
+            self.repository._lock.release()
@@ -0,0 +1,144 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from models.trade import TradeResult
+from core.repository import AsyncRepository, AsyncUnitOfWork
+from repositories.sqlalchemy_repository import TradeModel, SQLAlchemyRepository
+
+# Drivers assíncronos usados quando a URL não informa um
+_ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def to_async_url(db_url: str) -> str:
+    """Converte a URL síncrona (ex.: sqlite:///trades.db) para o driver assíncrono"""
+    url = make_url(db_url)
+    driver = _ASYNC_DRIVERS.get(url.drivername.split('+')[0])
+    if driver is None:
+        raise ValueError(f"Banco sem driver assíncrono conhecido: {url.drivername}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+class AsyncSQLAlchemyRepository(AsyncRepository[TradeResult]):
+    """Implementação assíncrona usando SQLAlchemy asyncio (aiosqlite/asyncpg)
+
+    Usa o mesmo TradeModel do repositório síncrono. A sessão da Unit of Work
+    ativa é guardada por tarefa (ContextVar), como a versão síncrona faz por thread.
+    """
+
+    # Conversões compartilhadas com o repositório síncrono
+    _to_mapping = SQLAlchemyRepository._to_mapping
+    _to_model = SQLAlchemyRepository._to_model
+    _from_model = SQLAlchemyRepository._from_model
+
+    def __init__(self, db_url: str):
+        self.engine = create_async_engine(to_async_url(db_url))
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self._active_session: ContextVar[Optional[AsyncSession]] = ContextVar(f'async_session_{id(self)}', default=None)
+        self._schema_ready = False
+
+    async def _ensure_schema(self) -> None:
+        """Cria ou migra as tabelas na primeira operação (mesma migração do repositório síncrono)"""
+        if self._schema_ready:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(SQLAlchemyRepository._migrate)
+        self._schema_ready = True
+
+    @property
+    def active_session(self) -> Optional[AsyncSession]:
+        """Sessão da Unit of Work ativa na tarefa atual, se houver"""
+        return self._active_session.get()
+
+    @active_session.setter
+    def active_session(self, session: Optional[AsyncSession]) -> None:
+        self._active_session.set(session)
+
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Usa a sessão da Unit of Work ativa ou abre uma sessão própria"""
+        await self._ensure_schema()
+        session = self.active_session
+        if session is not None:
+            yield session
+            return
+        async with self.Session() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def add(self, entity: TradeResult) -> None:
+        async with self._session_scope() as session:
+            model = self._to_model(entity)
+            session.add(model)
+            await session.flush()
+            entity.id = model.id
+
+    async def get(self, id: int) -> Optional[TradeResult]:
+        async with self._session_scope() as session:
+            model = await session.get(TradeModel, id)
+            return self._from_model(model) if model else None
+
+    async def list(self) -> List[TradeResult]:
+        async with self._session_scope() as session:
+            models = await session.scalars(select(TradeModel).order_by(TradeModel.id))
+            return [self._from_model(m) for m in models]
+
+    async def find(self, **criteria) -> List[TradeResult]:
+        """Lista os trades que atendem aos critérios (executado como WHERE)"""
+        async with self._session_scope() as session:
+            query = select(TradeModel).filter_by(**criteria).order_by(TradeModel.id)
+            return [self._from_model(m) for m in await session.scalars(query)]
+
+    async def update(self, entity: TradeResult) -> None:
+        async with self._session_scope() as session:
+            model = await session.get(TradeModel, entity.id)
+            if model:
+                for column, value in self._to_mapping(entity).items():
+                    setattr(model, column, value)
+                await session.flush()
+
+    async def delete(self, id: int) -> None:
+        async with self._session_scope() as session:
+            model = await session.get(TradeModel, id)
+            if model:
+                await session.delete(model)
+                await session.flush()
+
+    async def close(self) -> None:
+        await self.engine.dispose()
+
+class AsyncSQLAlchemyUnitOfWork(AsyncUnitOfWork):
+    """Unit of Work assíncrona: as operações da tarefa dentro do bloco formam uma transação"""
+
+    def __init__(self, repository: AsyncSQLAlchemyRepository):
+        self.repository = repository
+        self._depth: ContextVar[int] = ContextVar(f'async_uow_depth_{id(self)}', default=0)
+
+    async def __aenter__(self):
+        depth = self._depth.get()
+        if depth == 0:
+            await self.repository._ensure_schema()
+            self.repository.active_session = self.repository.Session()
+        self._depth.set(depth + 1)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        depth = self._depth.get() - 1
+        self._depth.set(depth)
+        if depth:
+            return
+        session = self.repository.active_session
+        try:
+            if exc_type is not None:
+                await session.rollback()
+            else:
+                await session.commit()
+        finally:
+            await session.close()
+            self.repository.active_session = None
@@ -1,16 +1,96 @@
 import json
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Type, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Type, List, Optional
 from datetime import datetime
 from core.repository import Repository, UnitOfWork
-from models.trade import TradeResult
+from models.trade import TradeResult, TradeType, TradeStatus, enum_member
 from models.account import TradePlan
 
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+# Campos gravados como enum: comparados pelo valor ('open'), qualquer que seja a forma gravada
+_ENUM_FIELDS = {'type': TradeType, 'status': TradeStatus}
+
+def _field_value(name: str, value):
+    enum_class = _ENUM_FIELDS.get(name)
+    if enum_class is None or value is None:
+        return value
+    return enum_member(enum_class, value).value
+
+# Valores padrão do TradeResult para registros antigos sem o campo
+_FIELD_DEFAULTS = {
+    'status': TradeStatus.OPEN.value,
+    'close_price': 0.0,
+    'close_timestamp': None,
+}
+
+def _matches(item: dict, expected: dict) -> bool:
+    """Verifica se o registro atende aos critérios (já normalizados)"""
+    return all(
+        _field_value(name, item.get(name, _FIELD_DEFAULTS.get(name))) == value
+        for name, value in expected.items()
+    )
+
+class _PendingWrite:
+    """Alteração aguardando a próxima gravação do group commit"""
+    
+    __slots__ = ('apply', 'done', 'result', 'error')
+    
+    def __init__(self, apply: Callable[[List[dict]], Any]):
+        self.apply = apply
+        self.done = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class _Transaction(threading.local):
+    """Transação da thread atual (buffer em memória usado pelo FileUnitOfWork)
+
+    O estado é por thread, como a sessão do SQLAlchemyUnitOfWork: threads que
+    compartilham o repositório (e a Unit of Work) não misturam seus buffers.
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.data: Optional[List[dict]] = None
+        self.dirty = False
+        self.lock_file = None
+        # Group commit: registros lidos no início, alterações a reaplicar no commit e IDs alterados
+        self.original: Optional[List[dict]] = None
+        self.changes: List[Callable[[List[dict]], Any]] = []
+        self.touched: set = set()
+
 class FileRepository(Repository[TradeResult]):
-    """Implementação de Repository para persistência em arquivos JSON"""
+    """Implementação de Repository para persistência em arquivos JSON
+
+    Cada alteração (read-modify-write) e cada transação da Unit of Work é feita
+    sob um lock consultivo (fcntl) em <arquivo>.lock, então processos
+    concorrentes não perdem atualizações. Com group_commit=True, as alterações
+    de threads que chegam enquanto uma gravação está em andamento são
+    aplicadas juntas na gravação seguinte; as transações também entram nessa
+    fila no commit, reaplicadas sobre o arquivo atual (falham se outra
+    transação alterou um trade que elas alteraram).
+    """
     
-    def __init__(self, file_path: str):
+    # Cada commit regrava o arquivo inteiro: cargas em lote usam uma única transação
+    rewrites_on_commit = True
+    
+    def __init__(self, file_path: str, fsync: bool = False, locking: bool = True, group_commit: bool = False):
         self.file_path = Path(file_path)
+        self.fsync = fsync
+        self.locking = locking and fcntl is not None
+        self.lock_path = self.file_path.with_name(self.file_path.name + '.lock')
+        self.group_commit = group_commit
+        self._pending: List[_PendingWrite] = []
+        self._group_condition = threading.Condition()
+        self._writing = False
+        self._tx = _Transaction()
+        self._generation = 0
         self._ensure_file_exists()
         
     def _ensure_file_exists(self) -> None:
@@ -19,7 +99,18 @@ class FileRepository(Repository[TradeResult]):
             self.file_path.write_text('[]')
             
     def _load_data(self) -> List[dict]:
-        """Carrega os dados do arquivo"""
+        """Carrega os dados do arquivo (ou do buffer da transação ativa)"""
+        tx = self._tx
+        if tx.depth:
+            if tx.data is None:
+                tx.data = self._read_file()
+                if self.group_commit:
+                    tx.original = list(tx.data)
+            return tx.data
+        return self._read_file()
+
+    def _read_file(self) -> List[dict]:
+        """Lê e decodifica o arquivo JSON"""
         with open(self.file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
             # Converte IDs para int se necessário
@@ -28,106 +119,364 @@ class FileRepository(Repository[TradeResult]):
                     item['id'] = int(item['id'])
             return data
             
+    def _iter_file(self, chunk_size: int = 65536) -> Iterator[dict]:
+        """Decodifica o array JSON do arquivo de forma incremental, item a item"""
+        decoder = json.JSONDecoder()
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            buffer, pos = '', 0
+            started = eof = False
+            while True:
+                # Pula separadores, lendo mais dados quando o buffer acaba
+                while True:
+                    while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        break
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer, pos = chunk, 0
+                if pos >= len(buffer):
+                    return
+                if not started:
+                    if buffer[pos] != '[':
+                        raise ValueError(f"Arquivo {self.file_path} não contém uma lista de trades")
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == ']':
+                    return
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # Registro incompleto: junta o próximo bloco e tenta de novo
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                if 'id' in item and isinstance(item['id'], str):
+                    item['id'] = int(item['id'])
+                yield item
+
+    def _iter_records(self) -> Iterator[dict]:
+        """Itera sobre os registros atuais sem materializar o arquivo inteiro"""
+        if self._tx.depth and self._tx.data is not None:
+            return iter(self._tx.data)
+        return self._iter_file()
+
     def _save_data(self, data: List[dict]) -> None:
-        """Salva os dados no arquivo"""
+        """Salva os dados no arquivo (ou no buffer da transação ativa)"""
         # Converte IDs para int se necessário
         for item in data:
             if 'id' in item and isinstance(item['id'], str):
                 item['id'] = int(item['id'])
-        with open(self.file_path, 'w', encoding='utf-8') as f:
+        if self._tx.depth:
+            self._tx.data = data
+            self._tx.dirty = True
+            return
+        self._write_atomic(data)
+
+    def _write_atomic(self, data, fsync: bool = False) -> None:
+        """Grava em arquivo temporário e substitui o original com os.replace (fsync=True força o fsync)"""
+        # Temporário por processo/thread: escritores sem lock não gravam no mesmo arquivo
+        tmp_path = self.file_path.with_name(f'{self.file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=4, default=str)
-            
+            if fsync or self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def _acquire_lock(self):
+        """Obtém o lock exclusivo do arquivo (bloqueia até os outros processos liberarem)"""
+        if not self.locking:
+            return None
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            lock_file.close()
+            raise
+        return lock_file
+
+    @staticmethod
+    def _release_lock(lock_file) -> None:
+        if lock_file is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        lock_file = self._acquire_lock()
+        try:
+            yield
+        finally:
+            self._release_lock(lock_file)
+
+    def _mutate(self, apply: Callable[[List[dict]], Any], touched: Iterable[int] = ()) -> Any:
+        """Aplica uma alteração aos registros lendo e gravando o arquivo sob o lock
+
+        Dentro de uma transação a alteração vai para o buffer (o lock já é da
+        transação, ou, no group commit, ela é guardada para o commit junto com
+        os IDs existentes que altera); fora dela, no modo group commit, entra
+        na fila da próxima gravação.
+        """
+        tx = self._tx
+        if tx.depth:
+            data = self._load_data()
+            if self.group_commit:
+                tx.changes.append(apply)
+                tx.touched.update(touched)
+            result = apply(data)
+            self._save_data(data)
+            return result
+        if self.group_commit:
+            return self._group_commit(apply)
+        with self._file_lock():
+            data = self._read_file()
+            result = apply(data)
+            self._write_atomic(data)
+            return result
+
+    def _group_commit(self, apply: Callable[[List[dict]], Any]) -> Any:
+        """Enfileira a alteração; quem encontra o arquivo livre grava todas as pendentes de uma vez"""
+        pending = _PendingWrite(apply)
+        with self._group_condition:
+            self._pending.append(pending)
+            while self._writing and not pending.done:
+                self._group_condition.wait()
+            if not pending.done:
+                self._writing = True
+                batch, self._pending = self._pending, []
+        if not pending.done:
+            try:
+                with self._file_lock():
+                    data = self._read_file()
+                    for item in batch:
+                        # Cada alteração é tudo ou nada (os registros são substituídos, não modificados)
+                        before = list(data)
+                        try:
+                            item.result = item.apply(data)
+                        except Exception as e:
+                            item.error = e
+                            data[:] = before
+                    self._write_atomic(data)
+            except BaseException as e:
+                for item in batch:
+                    item.error = item.error or e
+            finally:
+                with self._group_condition:
+                    for item in batch:
+                        item.done = True
+                    self._writing = False
+                    self._group_condition.notify_all()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def begin_transaction(self) -> None:
+        """Inicia (ou aninha) uma transação com escrita em buffer na thread atual
+
+        A transação mais externa mantém o lock do arquivo até o commit/rollback,
+        então as leituras feitas nela não ficam desatualizadas. No modo group
+        commit o lock só é obtido na gravação do grupo.
+        """
+        tx = self._tx
+        if not tx.depth and not self.group_commit:
+            tx.lock_file = self._acquire_lock()
+        tx.depth += 1
+
+    def commit_transaction(self) -> None:
+        """Grava o buffer uma única vez ao fechar a transação mais externa"""
+        tx = self._tx
+        if not tx.depth:
+            return
+        tx.depth -= 1
+        if tx.depth:
+            return
+        data, dirty, lock_file = tx.data, tx.dirty, tx.lock_file
+        original, changes, touched = tx.original, tx.changes, tx.touched
+        self._reset_transaction(tx)
+        if self.group_commit:
+            if changes:
+                base = self._base_records(original, touched)
+                self._group_commit(lambda data: self._replay(data, changes, base))
+            return
+        try:
+            if dirty:
+                self._write_atomic(data)
+        finally:
+            self._release_lock(lock_file)
+
+    def rollback_transaction(self) -> None:
+        """Descarta o buffer da transação"""
+        tx = self._tx
+        if not tx.depth:
+            return
+        if tx.dirty:
+            # Entidades em cache podem refletir alterações descartadas
+            self._generation += 1
+        lock_file = tx.lock_file
+        self._reset_transaction(tx)
+        self._release_lock(lock_file)
+
+    @staticmethod
+    def _reset_transaction(tx: _Transaction) -> None:
+        tx.depth = 0
+        tx.data, tx.dirty, tx.lock_file = None, False, None
+        tx.original, tx.changes, tx.touched = None, [], set()
+
+    @staticmethod
+    def _base_records(original: Optional[List[dict]], touched: set) -> Dict[int, dict]:
+        """Registros, como lidos pela transação, dos trades existentes que ela alterou"""
+        return {item['id']: item for item in original or () if item.get('id') in touched}
+
+    @staticmethod
+    def _replay(data: List[dict], changes: List[Callable[[List[dict]], Any]], base: Dict[int, dict]) -> None:
+        """Reaplica as alterações da transação sobre o arquivo atual, se os trades que ela alterou não mudaram"""
+        if base:
+            current = {item.get('id'): item for item in data if item.get('id') in base}
+            for trade_id, record in base.items():
+                if current.get(trade_id) != record:
+                    raise ValueError(f"Trade {trade_id} foi alterado por outra transação")
+        for apply in changes:
+            apply(data)
+
+    def cache_token(self) -> Optional[tuple]:
+        """Token de invalidação de cache baseado em mtime/tamanho do arquivo"""
+        try:
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, self._generation)
+
     def add(self, entity: TradeResult) -> None:
-        data = self._load_data()
-        # Gera um ID sequencial se não existir
-        if entity.id is None:
-            entity.id = max([item.get('id', 0) for item in data], default=0) + 1
-        data.append(entity.__dict__)
-        self._save_data(data)
+        # Decidido antes: no group commit a alteração é reaplicada no commit e gera o ID de novo
+        assign_id = entity.id is None
+        def apply(data: List[dict]) -> None:
+            # Gera um ID sequencial se não existir (sob o lock, para não repetir IDs)
+            if assign_id:
+                entity.id = max([item.get('id', 0) for item in data], default=0) + 1
+            data.append(entity.to_record())
+        self._mutate(apply)
+        
+    def add_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Adiciona vários trades com uma única regravação do arquivo"""
+        assign_ids = [entity.id is None for entity in entities]
+        def apply(data: List[dict]) -> None:
+            next_id = max([item.get('id', 0) for item in data], default=0) + 1
+            for entity, assign_id in zip(entities, assign_ids):
+                if assign_id:
+                    entity.id = next_id
+                next_id = max(next_id, entity.id + 1)
+                data.append(entity.to_record())
+        self._mutate(apply)
         
     def get(self, id: int) -> Optional[TradeResult]:
         data = self._load_data()
         for item in data:
             if item.get('id') == id:
-                # Converte strings para int se necessário
-                if isinstance(item.get('id'), str):
-                    item['id'] = int(item['id'])
-                return TradeResult(**item)
+                return TradeResult.from_record(item)
         return None
         
     def list(self) -> List[TradeResult]:
-        data = self._load_data()
-        # Converte IDs para int se necessário
-        for item in data:
-            if 'id' in item and isinstance(item['id'], str):
-                item['id'] = int(item['id'])
-        return [TradeResult(**item) for item in data]
+        return [TradeResult.from_record(item) for item in self._load_data()]
+        
+    def find(self, **criteria) -> List[TradeResult]:
+        """Filtra os registros antes de decodificá-los em TradeResult"""
+        expected = {name: _field_value(name, value) for name, value in criteria.items()}
+        return [TradeResult.from_record(item) for item in self._load_data() if _matches(item, expected)]
+        
+    def iter_trades(self, batch_size: int = 1000, after_id: Any = None,
+                    order_by: str = 'id', **criteria) -> Iterator[TradeResult]:
+        """Itera sobre os trades decodificando o arquivo de forma incremental
+
+        Os IDs são atribuídos em ordem crescente, então a ordem do arquivo já é
+        a ordem por ID; outras ordenações recorrem à implementação padrão.
+        """
+        if order_by != 'id':
+            yield from super().iter_trades(batch_size, after_id, order_by, **criteria)
+            return
+        expected = {name: _field_value(name, value) for name, value in criteria.items()}
+        for item in self._iter_records():
+            if after_id is not None and (item.get('id') is None or item['id'] <= after_id):
+                continue
+            if _matches(item, expected):
+                yield TradeResult.from_record(item)
+        
+    def list_open(self) -> List[TradeResult]:
+        """Lista os trades abertos"""
+        return self.find(status=TradeStatus.OPEN)
         
     def update(self, entity: TradeResult) -> None:
-        data = self._load_data()
-        for i, item in enumerate(data):
-            # Converte strings para int se necessário
-            item_id = int(item.get('id')) if isinstance(item.get('id'), str) else item.get('id')
-            if item_id == entity.id:
-                data[i] = entity.__dict__
-                break
-        self._save_data(data)
+        def apply(data: List[dict]) -> None:
+            for i, item in enumerate(data):
+                # Converte strings para int se necessário
+                item_id = int(item.get('id')) if isinstance(item.get('id'), str) else item.get('id')
+                if item_id == entity.id:
+                    data[i] = entity.to_record()
+                    break
+        self._mutate(apply, (entity.id,))
+        
+    def update_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Atualiza vários trades com uma única regravação do arquivo"""
+        updated = {entity.id: entity for entity in entities}
+        def apply(data: List[dict]) -> None:
+            for i, item in enumerate(data):
+                item_id = int(item.get('id')) if isinstance(item.get('id'), str) else item.get('id')
+                if item_id in updated:
+                    data[i] = updated[item_id].to_record()
+        self._mutate(apply, updated)
         
     def delete(self, id: str) -> None:
-        data = self._load_data()
-        data = [item for item in data if item.get('id') != id]
-        self._save_data(data)
+        def apply(data: List[dict]) -> None:
+            data[:] = [item for item in data if item.get('id') != id]
+        self._mutate(apply, (id,))
         
     def load_trade_plan(self) -> TradePlan:
-        """Carrega o TradePlan do arquivo"""
+        """Carrega o TradePlan do último checkpoint, reaplicando só os eventos posteriores"""
+        from utils.plan_checkpoint import PlanStateStore
+        
+        store = PlanStateStore(str(self.file_path))
+        if store.exists():
+            return store.load(TradePlan(initial_balance=1000.0, total_trades=10))
+        
+        # Formato antigo: o plano inteiro em um único JSON (convertido uma vez)
         data = self._load_data()
-        if not data:
+        if not data or not isinstance(data, dict):
             return TradePlan(initial_balance=1000.0, total_trades=10)
-            
         trade_plan = TradePlan(
             initial_balance=data.get('current_balance', 1000.0),
             total_trades=10
         )
-        
-        # Carrega histórico de trades
-        trade_plan.trade_history = [
-            TradeResult(**trade_data) for trade_data in data.get('trade_history', [])
-        ]
-        
-        return trade_plan
+        return store.import_legacy(data, trade_plan)
         
     def save_trade_plan(self, trade_plan: TradePlan) -> None:
-        """Salva o TradePlan no arquivo"""
-        data = {
-            'current_balance': trade_plan.current_balance,
-            'completed_trades': trade_plan.completed_trades,
-            'max_drawdown': trade_plan.max_drawdown,
-            'max_balance': trade_plan.max_balance,
-            'leverage': trade_plan.leverage,
-            'position_size_percent': trade_plan.position_size_percent,
-            'trade_history': [trade.__dict__ for trade in trade_plan.trade_history],
-            'account_operations': trade_plan.account_operations
-        }
-        self._save_data(data)
+        """Salva o TradePlan acrescentando ao log apenas o que mudou"""
+        from utils.plan_checkpoint import PlanStateStore
+        
+        PlanStateStore(str(self.file_path)).save(trade_plan)
 
 class FileUnitOfWork(UnitOfWork):
     """Implementação de Unit of Work para operações com arquivos"""
     
     def __init__(self, repository: FileRepository):
         self.repository = repository
-        self._original_data = None
         
     def __enter__(self):
-        self._original_data = self.repository._load_data()
+        # As alterações ficam em memória até o commit; nada é lido aqui
+        self.repository.begin_transaction()
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
             self.rollback()
+        else:
+            self.commit()
             
     def commit(self):
-        self._original_data = None
+        self.repository.commit_transaction()
         
     def rollback(self):
-        if self._original_data is not None:
-            self.repository._save_data(self._original_data)
\ No newline at end of file
+        self.repository.rollback_transaction()
\ No newline at end of file
@@ -0,0 +1,362 @@
+import json
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+from models.trade import TradeResult
+from repositories.file_repository import FileRepository
+
+# Tipos de eventos gravados no journal
+OP_CREATE = 'create'
+OP_UPDATE = 'update'
+OP_DELETE = 'delete'
+
+class JournalFileRepository(FileRepository):
+    """FileRepository com journal append-only (JSONL) e compactação em snapshot
+
+    O arquivo JSON original passa a ser o snapshot. Cada add/update/delete
+    grava apenas uma linha no journal e o índice em memória guarda, para cada
+    ID, o offset do último registro no journal (ou None se o registro atual
+    está no snapshot). A compactação incorpora o journal ao snapshot.
+    Os registros do journal contêm o estado completo do trade, então
+    reaplicá-los após uma queda durante a compactação é idempotente.
+    Gravações, transações e compactação usam o lock entre processos do
+    FileRepository; ao obtê-lo, o índice incorpora o que outros processos
+    (daemon, GUI) gravaram: só a cauda nova do journal ou, se o snapshot foi
+    substituído, tudo.
+    """
+
+    # Cada commit só acrescenta linhas ao journal
+    rewrites_on_commit = False
+
+    def __init__(self, file_path: str, journal_path: Optional[str] = None,
+                 compact_threshold: Optional[int] = 1000, background_compaction: bool = True,
+                 fsync: bool = False):
+        super().__init__(file_path, fsync=fsync)
+        self.journal_path = Path(journal_path) if journal_path else Path(f'{self.file_path}.journal')
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._tx_start = 0
+        self._lock_file = None
+        self._lock_depth = 0
+        # Estado (inode, mtime, tamanho) do snapshot e do journal refletido no índice
+        self._disk_state: Optional[tuple] = None
+        self._sync()
+
+    def _stat_files(self) -> tuple:
+        state = []
+        for path in (self.file_path, self.journal_path):
+            try:
+                stat = path.stat()
+                state.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def _lock_files(self) -> None:
+        """Obtém o lock entre processos (reentrante, com self._lock) e atualiza o índice"""
+        if not self._lock_depth:
+            self._lock_file = self._acquire_lock()
+            try:
+                self._refresh()
+            except BaseException:
+                lock_file, self._lock_file = self._lock_file, None
+                self._release_lock(lock_file)
+                raise
+        self._lock_depth += 1
+
+    def _unlock_files(self) -> None:
+        self._lock_depth -= 1
+        if not self._lock_depth:
+            lock_file, self._lock_file = self._lock_file, None
+            self._release_lock(lock_file)
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Lock da thread e entre processos, com o índice em dia com o disco"""
+        with self._lock:
+            self._lock_files()
+            try:
+                yield
+            finally:
+                self._unlock_files()
+
+    def _sync(self) -> None:
+        """Antes de uma leitura: relê o disco (sob o lock) só se snapshot ou journal mudaram"""
+        with self._lock:
+            if self._lock_depth or self._stat_files() == self._disk_state:
+                return
+            with self._exclusive():
+                pass
+
+    def _refresh(self) -> None:
+        """Incorpora ao índice o que outros processos gravaram (chamado sob o lock do arquivo)"""
+        state = self._stat_files()
+        known = self._disk_state
+        if state == known:
+            return
+        snapshot, journal = state
+        if (known is not None and snapshot == known[0] and journal is not None and known[1] is not None
+                and journal[0] == known[1][0] and journal[2] > known[1][2]):
+            # Só o journal cresceu: lê apenas os registros novos
+            self._read_journal()
+            self._disk_state = self._stat_files()
+        else:
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Carrega o snapshot e reconstrói o índice a partir do journal (sob o lock do arquivo)"""
+        with self._lock:
+            snapshot = self._read_file()
+            self._snapshot: Dict[Union[int, tuple], dict] = {}
+            self._index: Dict[Union[int, tuple], Optional[int]] = {}
+            if isinstance(snapshot, list):
+                for position, item in enumerate(snapshot):
+                    # Registros sem ID não são endereçáveis, mas continuam sendo listados
+                    key = item['id'] if item.get('id') is not None else ('_', position)
+                    self._snapshot[key] = item
+                    self._index[key] = None
+            self._next_id = max([k for k in self._index if isinstance(k, int)], default=0) + 1
+            self._journal_records = 0
+            self._journal_size = 0
+            self._read_journal()
+            self._disk_state = self._stat_files()
+
+    def _read_journal(self) -> None:
+        """Aplica os registros gravados a partir de _journal_size (uma cauda incompleta é descartada)"""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_size)
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.endswith(b'\n'):
+                    # Registro incompleto (escrita interrompida): descarta a cauda
+                    break
+                record = json.loads(line)
+                self._apply_record(record, offset)
+                self._journal_size = f.tell()
+        if self._journal_size != self.journal_path.stat().st_size:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self._journal_size)
+
+    def _apply_record(self, record: dict, offset: int) -> None:
+        """Aplica um registro do journal ao índice em memória"""
+        trade_id = record['id']
+        if record['op'] == OP_DELETE:
+            self._index.pop(trade_id, None)
+            self._snapshot.pop(trade_id, None)
+        else:
+            self._index[trade_id] = offset
+            self._next_id = max(self._next_id, trade_id + 1)
+        self._journal_records += 1
+
+    def _append(self, op: str, trade_id: int, data: Optional[dict] = None) -> None:
+        """Grava um registro no final do journal e atualiza o índice"""
+        self._append_many([(op, trade_id, data)])
+
+    def _append_many(self, events: List[tuple]) -> None:
+        """Grava vários registros com uma única escrita no journal"""
+        records = []
+        for op, trade_id, data in events:
+            record = {'op': op, 'id': trade_id}
+            if data is not None:
+                record['data'] = data
+            records.append(record)
+        lines = [(json.dumps(record, default=str) + '\n').encode('utf-8') for record in records]
+        with self._exclusive():
+            offset = self._journal_size
+            with open(self.journal_path, 'ab') as f:
+                f.write(b''.join(lines))
+            for record, line in zip(records, lines):
+                self._apply_record(record, offset)
+                offset += len(line)
+            self._journal_size = offset
+            self._disk_state = self._stat_files()
+            if not self._tx.depth:
+                self._maybe_compact()
+
+    def _read_record(self, f, offset: int) -> dict:
+        """Lê o registro do journal no offset informado"""
+        f.seek(offset)
+        return json.loads(f.readline())['data']
+
+    def _load_data(self) -> List[dict]:
+        """Retorna o estado atual (snapshot + journal) como lista de dicts"""
+        with self._lock:
+            self._sync()
+            return list(self._iter_records())
+
+    def _iter_records(self) -> Iterator[dict]:
+        """Itera sobre o estado atual, lendo do journal um registro por vez"""
+        with self._lock:
+            self._sync()
+            # A compactação substitui (e não trunca) o journal, então o arquivo
+            # aberto aqui continua válido mesmo que ela ocorra durante a iteração
+            index = list(self._index.items())
+            snapshot = self._snapshot
+            f = open(self.journal_path, 'rb') if self._journal_size else None
+        with f if f is not None else nullcontext():
+            for key, offset in index:
+                yield snapshot[key] if offset is None else self._read_record(f, offset)
+
+    def _save_data(self, data: List[dict]) -> None:
+        """Substitui todo o conteúdo: grava um novo snapshot e zera o journal"""
+        with self._exclusive():
+            self._write_snapshot(data)
+            self._rebuild_index()
+
+    def _write_snapshot(self, data: List[dict]) -> None:
+        """Grava o snapshot de forma atômica e zera o journal"""
+        for item in data if isinstance(data, list) else []:
+            if 'id' in item and isinstance(item['id'], str):
+                item['id'] = int(item['id'])
+        # O snapshot precisa estar em disco antes de o journal ser zerado, com ou sem fsync
+        self._write_atomic(data, fsync=True)
+        empty_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+        with open(empty_path, 'wb'):
+            pass
+        os.replace(empty_path, self.journal_path)
+
+    def begin_transaction(self) -> None:
+        """Marca o tamanho do journal para permitir o rollback por truncamento
+
+        A transação mais externa mantém os locks (da thread e entre processos)
+        até o commit/rollback: o truncamento não pode descartar registros
+        gravados por outras threads ou processos.
+        """
+        self._lock.acquire()
+        if self._tx.depth:
+            self._lock.release()
+        else:
+            try:
+                self._lock_files()
+            except BaseException:
+                self._lock.release()
+                raise
+            self._tx_start = self._journal_size
+        self._tx.depth += 1
+
+    def commit_transaction(self) -> None:
+        """Confirma os registros gravados no journal durante a transação"""
+        if not self._tx.depth:
+            return
+        self._tx.depth -= 1
+        if self._tx.depth:
+            return
+        try:
+            if self.fsync and self._journal_size != self._tx_start:
+                with open(self.journal_path, 'ab') as f:
+                    os.fsync(f.fileno())
+        finally:
+            self._unlock_files()
+            self._lock.release()
+        self._maybe_compact()
+
+    def rollback_transaction(self) -> None:
+        """Remove do journal os registros gravados durante a transação"""
+        if not self._tx.depth:
+            return
+        self._tx.depth = 0
+        try:
+            if self._journal_size != self._tx_start:
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(self._tx_start)
+                self._generation += 1
+                self._rebuild_index()
+        finally:
+            self._unlock_files()
+            self._lock.release()
+
+    def compact(self) -> None:
+        """Incorpora o journal ao snapshot (compactação sob demanda)"""
+        with self._exclusive():
+            if not self._journal_records or self._tx.depth:
+                return
+            self._save_data(self._load_data())
+
+    def _maybe_compact(self) -> None:
+        """Dispara a compactação quando o journal atinge o limite configurado"""
+        if not self.compact_threshold or self._journal_records < self.compact_threshold:
+            return
+        if not self.background_compaction:
+            self.compact()
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self) -> None:
+        """Aguarda o término de uma compactação em segundo plano"""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+
+    def cache_token(self) -> Optional[tuple]:
+        """Token de invalidação considerando snapshot e journal"""
+        try:
+            stat = self.journal_path.stat()
+            journal = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            journal = None
+        return (super().cache_token(), journal)
+
+    def add(self, entity: TradeResult) -> None:
+        # O próximo ID é lido com o índice em dia com outros processos
+        with self._exclusive():
+            if entity.id is None:
+                entity.id = self._next_id
+            self._append(OP_CREATE, entity.id, entity.to_record())
+
+    def add_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        with self._exclusive():
+            for start in range(0, len(entities), batch_size):
+                events = []
+                for entity in entities[start:start + batch_size]:
+                    if entity.id is None:
+                        entity.id = self._next_id
+                    self._next_id = max(self._next_id, entity.id + 1)
+                    events.append((OP_CREATE, entity.id, entity.to_record()))
+                self._append_many(events)
+
+    def get(self, id: int) -> Optional[TradeResult]:
+        with self._lock:
+            self._sync()
+            if id not in self._index:
+                return None
+            offset = self._index[id]
+            if offset is None:
+                return TradeResult.from_record(self._snapshot[id])
+            with open(self.journal_path, 'rb') as f:
+                return TradeResult.from_record(self._read_record(f, offset))
+
+    def list(self) -> List[TradeResult]:
+        return [TradeResult.from_record(item) for item in self._load_data()]
+
+    def update(self, entity: TradeResult) -> None:
+        with self._exclusive():
+            if entity.id not in self._index:
+                return
+            self._append(OP_UPDATE, entity.id, entity.to_record())
+
+    def update_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        with self._exclusive():
+            for start in range(0, len(entities), batch_size):
+                self._append_many([
+                    (OP_UPDATE, entity.id, entity.to_record())
+                    for entity in entities[start:start + batch_size]
+                    if entity.id in self._index
+                ])
+
+    def delete(self, id: int) -> None:
+        with self._exclusive():
+            if id not in self._index:
+                return
+            self._append(OP_DELETE, id)
+
@@ -0,0 +1,271 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+from core.repository import Repository
+from models.account import TradePlan
+from models.records import TRADE_DTYPE, decode_record, encode_field, encode_records
+from models.trade import TradeResult, TradeStatus
+
+# Cabeçalho: identificação do formato e quantidade de registros
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4'), ('count', '<u8'), ('live', '<u8')])
+HEADER_SIZE = 64
+MAGIC = b'PLTRADES'
+VERSION = 1
+
+INITIAL_CAPACITY = 1024
+
+class MmapTradeRepository(Repository[TradeResult]):
+    """Repositório de trades em registros binários de tamanho fixo mapeados em memória
+
+    O registro do trade de ID n fica na posição n - 1, então get() é um cálculo
+    de offset e update() uma escrita no próprio lugar. IDs removidos deixam
+    lacunas (id = 0 no registro). records() devolve uma visão NumPy do arquivo,
+    sem criar objetos Python, para as análises sobre históricos muito grandes.
+
+    Os timestamps são gravados em microssegundos (UTC quando o texto tem fuso).
+    O estado fica no mapeamento compartilhado: sem fsync=True, a gravação em
+    disco fica a cargo do sistema operacional. Pressupõe um único processo
+    escrevendo no arquivo.
+    """
+
+    def __init__(self, file_path: str, fsync: bool = False):
+        self.file_path = Path(file_path)
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        self._undo: Dict[int, np.void] = {}
+        self._tx_count = self._tx_live = 0
+        if not self.file_path.exists() or self.file_path.stat().st_size == 0:
+            self._create_file()
+        self._map()
+
+    def _create_file(self) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        header = np.zeros(1, HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, TRADE_DTYPE.itemsize, 0, 0)
+        with open(self.file_path, 'wb') as f:
+            f.write(header.tobytes().ljust(HEADER_SIZE, b'\0'))
+            f.truncate(HEADER_SIZE + INITIAL_CAPACITY * TRADE_DTYPE.itemsize)
+
+    def _map(self) -> None:
+        self._mmap = np.memmap(self.file_path, dtype=np.uint8, mode='r+')
+        header = self._mmap[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        if header['magic'][0] != MAGIC or header['record_size'][0] != TRADE_DTYPE.itemsize:
+            raise ValueError(f"{self.file_path} não é um arquivo de trades em formato binário")
+        self._header = header
+        self._capacity = (len(self._mmap) - HEADER_SIZE) // TRADE_DTYPE.itemsize
+        self._records = self._mmap[HEADER_SIZE:HEADER_SIZE + self._capacity * TRADE_DTYPE.itemsize].view(TRADE_DTYPE)
+        self._count = int(header['count'][0])
+        self._live = int(header['live'][0])
+
+    def _store_header(self) -> None:
+        self._header['count'] = self._count
+        self._header['live'] = self._live
+
+    def _ensure_capacity(self, count: int) -> None:
+        """Aumenta o arquivo (dobrando a capacidade) e refaz o mapeamento"""
+        if count <= self._capacity:
+            return
+        capacity = max(count, self._capacity * 2, INITIAL_CAPACITY)
+        self._mmap.flush()
+        # Visões já entregues por records() continuam válidas no mapeamento antigo
+        self._mmap = self._header = self._records = None
+        with open(self.file_path, 'r+b') as f:
+            f.truncate(HEADER_SIZE + capacity * TRADE_DTYPE.itemsize)
+        self._map()
+
+    def _sync(self) -> None:
+        if self.fsync and not self._tx_depth:
+            self._mmap.flush()
+
+    def _remember(self, index: int) -> None:
+        """Guarda o registro original para o rollback da transação"""
+        if self._tx_depth and index < self._tx_count and index not in self._undo:
+            self._undo[index] = self._records[index].copy()
+
+    def _write(self, index: int, record: np.void) -> None:
+        self._remember(index)
+        if index >= self._count:
+            self._ensure_capacity(index + 1)
+            self._count = index + 1
+        if self._records[index]['id'] == 0:
+            self._live += 1
+        self._records[index] = record
+
+    def begin_transaction(self) -> None:
+        """Inicia (ou aninha) uma transação; as escritas vão direto para o mapeamento com log de desfazer"""
+        self._lock.acquire()
+        if self._tx_depth:
+            # Só a transação mais externa mantém o lock até o commit/rollback
+            self._lock.release()
+        else:
+            self._undo = {}
+            self._tx_count, self._tx_live = self._count, self._live
+        self._tx_depth += 1
+
+    def commit_transaction(self) -> None:
+        if not self._tx_depth:
+            return
+        self._tx_depth -= 1
+        if self._tx_depth:
+            return
+        self._undo = {}
+        try:
+            self._sync()
+        finally:
+            self._lock.release()
+
+    def rollback_transaction(self) -> None:
+        """Restaura os registros alterados e descarta os acrescentados na transação"""
+        if not self._tx_depth:
+            return
+        self._tx_depth = 0
+        try:
+            for index, record in self._undo.items():
+                self._records[index] = record
+            if self._count > self._tx_count:
+                self._records[self._tx_count:self._count] = np.zeros(self._count - self._tx_count, TRADE_DTYPE)
+            self._count, self._live = self._tx_count, self._tx_live
+            self._store_header()
+            self._undo = {}
+        finally:
+            self._lock.release()
+
+    def add(self, entity: TradeResult) -> None:
+        self.add_many([entity])
+
+    def add_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Acrescenta os trades; IDs explícitos ocupam a posição correspondente"""
+        with self._lock:
+            next_id = self._count + 1
+            for entity in entities:
+                if entity.id is None:
+                    entity.id = next_id
+                next_id = max(next_id, entity.id + 1)
+            records = encode_records(entities)
+            start, end = self._count, self._count + len(records)
+            if np.array_equal(records['id'], np.arange(start + 1, end + 1)):
+                # Caso comum: IDs sequenciais gravados em um único bloco
+                self._ensure_capacity(end)
+                self._records[start:end] = records
+                self._count, self._live = end, self._live + len(records)
+            else:
+                for record in records:
+                    index = int(record['id']) - 1
+                    if index < 0 or (index < self._count and self._records[index]['id'] != 0):
+                        raise ValueError(f"ID de trade inválido ou já existente: {record['id']}")
+                    self._write(index, record)
+            self._store_header()
+            self._sync()
+
+    def _index_of(self, id: Any) -> Optional[int]:
+        if id is None:
+            return None
+        index = int(id) - 1
+        if 0 <= index < self._count and self._records[index]['id'] != 0:
+            return index
+        return None
+
+    def get(self, id: int) -> Optional[TradeResult]:
+        with self._lock:
+            index = self._index_of(id)
+            return decode_record(self._records[index].item()) if index is not None else None
+
+    def list(self) -> List[TradeResult]:
+        with self._lock:
+            records = self._records[:self._count]
+            return [decode_record(values) for values in records[records['id'] != 0].tolist()]
+
+    def _mask(self, records: np.ndarray, criteria: dict) -> np.ndarray:
+        mask = records['id'] != 0
+        for name, value in criteria.items():
+            mask &= records[name] == encode_field(name, value)
+        return mask
+
+    def find(self, **criteria) -> List[TradeResult]:
+        """Filtra os registros de forma vetorizada antes de decodificá-los"""
+        if any(name not in TRADE_DTYPE.names for name in criteria):
+            return super().find(**criteria)
+        with self._lock:
+            records = self._records[:self._count]
+            return [decode_record(values) for values in records[self._mask(records, criteria)].tolist()]
+
+    def iter_trades(self, batch_size: int = 1000, after_id: Any = None,
+                    order_by: str = 'id', **criteria) -> Iterator[TradeResult]:
+        """Itera em blocos a partir da posição seguinte a after_id"""
+        if order_by != 'id' or any(name not in TRADE_DTYPE.names for name in criteria):
+            yield from super().iter_trades(batch_size, after_id, order_by, **criteria)
+            return
+        start = max(int(after_id), 0) if after_id is not None else 0
+        while True:
+            with self._lock:
+                if start >= self._count:
+                    return
+                chunk = self._records[start:min(start + batch_size, self._count)]
+                batch = [decode_record(values) for values in chunk[self._mask(chunk, criteria)].tolist()]
+            start += batch_size
+            yield from batch
+
+    def list_open(self) -> List[TradeResult]:
+        """Lista os trades abertos"""
+        return self.find(status=TradeStatus.OPEN)
+
+    def update(self, entity: TradeResult) -> None:
+        self.update_many([entity])
+
+    def update_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Regrava os registros no próprio lugar (IDs inexistentes são ignorados)"""
+        with self._lock:
+            for entity, record in zip(entities, encode_records(entities)):
+                index = self._index_of(entity.id)
+                if index is not None:
+                    self._remember(index)
+                    self._records[index] = record
+            self._sync()
+
+    def delete(self, id: str) -> None:
+        with self._lock:
+            index = self._index_of(id)
+            if index is None:
+                return
+            self._remember(index)
+            self._records[index]['id'] = 0
+            self._live -= 1
+            self._store_header()
+            self._sync()
+
+    def records(self) -> np.ndarray:
+        """Visão somente leitura dos registros, sem cópia quando não há lacunas
+
+        Os campos são acessados diretamente no arquivo mapeado (ex.:
+        records()['result']); com IDs removidos, devolve uma cópia só dos
+        registros existentes.
+        """
+        with self._lock:
+            records = self._records[:self._count]
+            if self._live != self._count:
+                return records[records['id'] != 0]
+            view = records.view()
+            view.flags.writeable = False
+            return view
+
+    def close(self) -> None:
+        """Grava o mapeamento em disco e o libera"""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.flush()
+                self._mmap = self._header = self._records = None
+
+    def load_trade_plan(self) -> TradePlan:
+        """Carrega o TradePlan do checkpoint + eventos ao lado do arquivo binário"""
+        from utils.plan_checkpoint import PlanStateStore
+
+        trade_plan = TradePlan(initial_balance=1000.0, total_trades=10)
+        store = PlanStateStore(str(self.file_path))
+        return store.load(trade_plan) if store.exists() else trade_plan
+
+    def save_trade_plan(self, trade_plan: TradePlan) -> None:
+        from utils.plan_checkpoint import PlanStateStore
+
+        PlanStateStore(str(self.file_path)).save(trade_plan)
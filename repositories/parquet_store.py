@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+import pandas as pd
+from models.trade import TradeResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Códigos dos campos enumerados (coluna dictionary<int8, string>)
+TRADE_TYPES = ('long', 'short')
+TRADE_STATUSES = ('open', 'closed')
+
+PRICE_COLUMNS = ('entry', 'target', 'stop', 'result', 'balance_before', 'balance_after', 'close_price', 'position_size_percent')
+TIME_COLUMNS = ('timestamp', 'close_timestamp')
+
+def _schema():
+    enum = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema(
+        [('id', pa.int64()), ('type', enum), ('status', enum), ('leverage', pa.int32())]
+        + [(name, pa.float64()) for name in PRICE_COLUMNS]
+        + [(name, pa.timestamp('us')) for name in TIME_COLUMNS]
+    )
+
+def _enum_codes(values: List, choices: Sequence[str]):
+    """Converte os membros de TradeType/TradeStatus no código do dicionário"""
+    codes = [choices.index(value.value) for value in values]
+    return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int8()), pa.array(choices))
+
+class ParquetTradeStore:
+    """Armazenamento colunar (Parquet) dos trades fechados para consultas analíticas
+
+    As linhas são gravadas como novos arquivos part-*.parquet. Fechamentos
+    usam flush=True e chegam ao disco logo após o commit, visíveis para
+    outros processos; cargas em lote (importação inicial) são acumuladas em
+    memória até flush_every, flush() ou a saída do processo. Com muitos
+    arquivos pequenos, compact() os junta em um só.
+    A leitura usa projeção de colunas e filtros aplicados pelo pyarrow
+    (estatísticas dos row groups), então um relatório que precisa só de
+    result e close_timestamp não decodifica as demais colunas.
+    """
+
+    def __init__(self, directory: str, flush_every: int = 1000, compact_every: int = 64):
+        if pa is None:
+            raise ValueError("O armazenamento colunar requer o pacote pyarrow")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.compact_every = compact_every
+        self.schema = _schema()
+        self._buffer: List[TradeResult] = []
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.directory.glob('part-*.parquet'))
+
+    def is_empty(self) -> bool:
+        return not self._buffer and not self._parts()
+
+    def append(self, trade: TradeResult, flush: bool = False) -> None:
+        """Registra um trade fechado (gravado no próximo flush, ou já com flush=True)"""
+        self.append_many([trade], flush)
+
+    def append_many(self, trades: Iterable[TradeResult], flush: bool = False) -> None:
+        with self._lock:
+            self._buffer.extend(trades)
+            if len(self._buffer) >= self.flush_every:
+                self._write_part()
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava as linhas pendentes e compacta quando há arquivos demais"""
+        with self._lock:
+            self._write_part()
+            if len(self._parts()) > self.compact_every:
+                self._compact()
+
+    def compact(self) -> None:
+        """Junta todos os arquivos em um único Parquet ordenado por data de fechamento"""
+        with self._lock:
+            self._write_part()
+            self._compact()
+
+    def _to_table(self, trades: List[TradeResult]):
+        columns = {
+            'id': pa.array([trade.id for trade in trades], pa.int64()),
+            'type': _enum_codes([trade.type for trade in trades], TRADE_TYPES),
+            'status': _enum_codes([trade.status for trade in trades], TRADE_STATUSES),
+            'leverage': pa.array([trade.leverage for trade in trades], pa.int32()),
+        }
+        for name in PRICE_COLUMNS:
+            columns[name] = pa.array([getattr(trade, name) for trade in trades], pa.float64())
+        for name in TIME_COLUMNS:
+            times = pd.to_datetime(pd.Series([getattr(trade, name) for trade in trades], dtype=object),
+                                   format='mixed', errors='coerce')
+            columns[name] = pa.array(times.dt.as_unit('us'), pa.timestamp('us'), from_pandas=True)
+        return pa.table(columns, schema=self.schema)
+
+    def _write_atomic(self, table) -> None:
+        # Arquivos iniciados por '.' são ignorados na leitura do diretório
+        name = f'part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet'
+        tmp_path = self.directory / f'.{name}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.directory / name)
+
+    def _write_part(self) -> None:
+        if not self._buffer:
+            return
+        trades, self._buffer = self._buffer, []
+        self._write_atomic(self._to_table(trades))
+
+    def _compact(self) -> None:
+        parts = self._parts()
+        if len(parts) < 2:
+            return
+        table = pq.read_table(parts, schema=self.schema)
+        self._write_atomic(table.sort_by([('close_timestamp', 'ascending'), ('id', 'ascending')]))
+        for part in parts:
+            part.unlink()
+
+    def read_table(self, columns: Optional[Sequence[str]] = None, filters=None):
+        """Lê a tabela Arrow com projeção de colunas e filtros
+
+        filters aceita uma expressão do pyarrow.dataset ou a forma em tuplas
+        usada pelo pandas, ex.: [('type', '==', 'short'), ('result', '<', 0)].
+        """
+        self.flush()
+        parts = self._parts()
+        if not parts:
+            table = self.schema.empty_table()
+            return table.select(list(columns)) if columns else table
+        return pq.read_table(parts, schema=self.schema, columns=list(columns) if columns else None, filters=filters)
+
+    def read(self, columns: Optional[Sequence[str]] = None, filters=None) -> pd.DataFrame:
+        """Lê os trades fechados como DataFrame (tipos enumerados como categorias)"""
+        return self.read_table(columns, filters).to_pandas()
@@ -1,9 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, Float, String, Enum, DateTime
-from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, inspect, insert, update, text, and_, or_, Column, Integer, Float, String, Enum, DateTime
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional
 from datetime import datetime
-from models.trade import TradeResult, TradeType
+from models.trade import TradeResult, TradeType, TradeStatus
 from core.repository import Repository, UnitOfWork
 from config.settings import settings
 
@@ -21,33 +23,103 @@ class TradeModel(Base):
     result = Column(Float, default=0)
     balance_before = Column(Float, nullable=False)
     balance_after = Column(Float, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     leverage = Column(Integer, nullable=False)
     position_size_percent = Column(Float, nullable=False)
+    status = Column(Enum(TradeStatus), nullable=False, default=TradeStatus.OPEN, index=True)
+    close_price = Column(Float, default=0.0)
+    close_timestamp = Column(String(32), nullable=True)
 
 class SQLAlchemyRepository(Repository[TradeResult]):
     """Implementação de Repository usando SQLAlchemy"""
     
     def __init__(self, db_url: str):
         self.engine = create_engine(db_url)
-        Base.metadata.create_all(self.engine)
+        self._ensure_schema()
         self.Session = sessionmaker(bind=self.engine)
+        # Sessão da Unit of Work ativa (por thread)
+        self._local = threading.local()
+        
+    def _ensure_schema(self) -> None:
+        """Cria o schema apenas quando necessário (uma inspeção quando já existe)"""
+        with self.engine.begin() as conn:
+            self._migrate(conn)
+        
+    @staticmethod
+    def _migrate(conn) -> None:
+        """Cria a tabela ou adiciona colunas/índices ausentes em bancos criados por versões anteriores"""
+        table = TradeModel.__table__
+        inspector = inspect(conn)
+        if not inspector.has_table(table.name):
+            Base.metadata.create_all(conn)
+            return
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing_indexes = [index for index in table.indexes if index.name not in existing_indexes]
+        for column in missing:
+            if isinstance(column.type, Enum):
+                # No PostgreSQL o tipo enum precisa existir antes da coluna (no-op nos outros bancos)
+                column.type.create(conn, checkfirst=True)
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        if 'status' in {column.name for column in missing}:
+            # Trades antigos com resultado registrado são considerados fechados
+            # (valores tipados pela coluna, aceitos também por colunas enum nativas)
+            conn.execute(update(table).where(table.c.result != 0).values(status=TradeStatus.CLOSED))
+            conn.execute(update(table).where(table.c.result == 0).values(status=TradeStatus.OPEN))
+        for index in missing_indexes:
+            index.create(conn)
+        
+    @property
+    def active_session(self) -> Optional[Session]:
+        """Sessão da Unit of Work ativa na thread atual, se houver"""
+        return getattr(self._local, 'session', None)
+        
+    @active_session.setter
+    def active_session(self, session: Optional[Session]) -> None:
+        self._local.session = session
+        
+    @contextmanager
+    def _session_scope(self) -> Iterator[Session]:
+        """Usa a sessão da Unit of Work ativa ou abre uma sessão própria"""
+        session = self.active_session
+        if session is not None:
+            # O commit/rollback fica a cargo da Unit of Work
+            yield session
+            return
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
         
     def _to_model(self, entity: TradeResult) -> TradeModel:
         """Converte TradeResult para TradeModel"""
-        return TradeModel(
-            id=entity.id,
-            type=entity.type,
-            entry=entity.entry,
-            target=entity.target,
-            stop=entity.stop,
-            result=entity.result,
-            balance_before=entity.balance_before,
-            balance_after=entity.balance_after,
-            timestamp=entity.timestamp,
-            leverage=entity.leverage,
-            position_size_percent=entity.position_size_percent
-        )
+        return TradeModel(**self._to_mapping(entity))
+        
+    def _to_mapping(self, entity: TradeResult) -> dict:
+        """Converte TradeResult para um dicionário de colunas"""
+        return {
+            'id': entity.id,
+            'type': entity.type,
+            'entry': entity.entry,
+            'target': entity.target,
+            'stop': entity.stop,
+            'result': entity.result,
+            'balance_before': entity.balance_before,
+            'balance_after': entity.balance_after,
+            'timestamp': entity.timestamp,
+            'leverage': entity.leverage,
+            'position_size_percent': entity.position_size_percent,
+            'status': entity.status,
+            'close_price': entity.close_price,
+            'close_timestamp': entity.close_timestamp
+        }
         
     def _from_model(self, model: TradeModel) -> TradeResult:
         """Converte TradeModel para TradeResult"""
@@ -62,88 +134,164 @@ class SQLAlchemyRepository(Repository[TradeResult]):
             balance_after=model.balance_after,
             timestamp=model.timestamp,
             leverage=model.leverage,
-            position_size_percent=model.position_size_percent
+            position_size_percent=model.position_size_percent,
+            status=model.status,
+            close_price=model.close_price,
+            close_timestamp=model.close_timestamp
         )
         
     def add(self, entity: TradeResult) -> None:
-        session = self.Session()
-        try:
-            session.add(self._to_model(entity))
-            session.commit()
-        except SQLAlchemyError as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        with self._session_scope() as session:
+            model = self._to_model(entity)
+            session.add(model)
+            session.flush()
+            entity.id = model.id
+            
+    def add_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Insere vários trades com um INSERT em lote por bloco"""
+        with self._session_scope() as session:
+            for start in range(0, len(entities), batch_size):
+                batch = entities[start:start + batch_size]
+                # O INSERT em lote exige o mesmo conjunto de colunas em todas as linhas
+                self._insert_batch(session, [e for e in batch if e.id is not None])
+                self._insert_batch(session, [e for e in batch if e.id is None])
+                
+    def _insert_batch(self, session: Session, batch: List[TradeResult]) -> None:
+        """Executa um INSERT ... RETURNING id para o bloco e atribui os IDs"""
+        if not batch:
+            return
+        mappings = [self._to_mapping(e) for e in batch]
+        if batch[0].id is None:
+            for mapping in mappings:
+                del mapping['id']
+        ids = session.scalars(
+            insert(TradeModel).returning(TradeModel.id, sort_by_parameter_order=True),
+            mappings
+        ).all()
+        for entity, new_id in zip(batch, ids):
+            entity.id = new_id
             
     def get(self, id: int) -> Optional[TradeResult]:
-        session = self.Session()
-        try:
-            model = session.query(TradeModel).get(id)
+        with self._session_scope() as session:
+            model = session.get(TradeModel, id)
             return self._from_model(model) if model else None
-        finally:
-            session.close()
             
     def list(self) -> List[TradeResult]:
-        session = self.Session()
-        try:
+        with self._session_scope() as session:
             models = session.query(TradeModel).all()
             return [self._from_model(m) for m in models]
-        finally:
-            session.close()
+            
+    def find(self, **criteria) -> List[TradeResult]:
+        """Lista os trades que atendem aos critérios (executado como WHERE)"""
+        with self._session_scope() as session:
+            query = session.query(TradeModel).filter_by(**criteria).order_by(TradeModel.id)
+            return [self._from_model(m) for m in query]
+            
+    def iter_trades(self, batch_size: int = 1000, after_id: Any = None,
+                    order_by: str = 'id', **criteria) -> Iterator[TradeResult]:
+        """Itera sobre os trades com paginação por chave (order_by, id)
+
+        Cada página é uma consulta própria com yield_per, então nenhuma sessão
+        fica aberta entre páginas e a memória não cresce com o histórico.
+        """
+        order_column = getattr(TradeModel, order_by)
+        last_key = None
+        if after_id is not None:
+            if order_by == 'id':
+                last_key = (after_id, after_id)
+            else:
+                with self._session_scope() as session:
+                    model = session.get(TradeModel, after_id)
+                    if model is None:
+                        return
+                    last_key = (getattr(model, order_by), model.id)
+        while True:
+            with self._session_scope() as session:
+                query = session.query(TradeModel).filter_by(**criteria)
+                if last_key is not None:
+                    value, last_id = last_key
+                    if order_by == 'id':
+                        query = query.filter(TradeModel.id > last_id)
+                    else:
+                        query = query.filter(or_(
+                            order_column > value,
+                            and_(order_column == value, TradeModel.id > last_id)
+                        ))
+                if order_by != 'id':
+                    query = query.order_by(order_column)
+                query = query.order_by(TradeModel.id).limit(batch_size)
+                page = [self._from_model(m) for m in query.yield_per(batch_size)]
+            yield from page
+            if len(page) < batch_size:
+                return
+            last_key = (getattr(page[-1], order_by), page[-1].id)
+            
+    def list_open(self) -> List[TradeResult]:
+        """Lista os trades abertos usando o índice de status"""
+        return self.find(status=TradeStatus.OPEN)
             
     def update(self, entity: TradeResult) -> None:
-        session = self.Session()
-        try:
-            model = session.query(TradeModel).get(entity.id)
+        with self._session_scope() as session:
+            model = session.get(TradeModel, entity.id)
             if model:
-                model.type = entity.type
-                model.entry = entity.entry
-                model.target = entity.target
-                model.stop = entity.stop
-                model.result = entity.result
-                model.balance_before = entity.balance_before
-                model.balance_after = entity.balance_after
-                model.timestamp = entity.timestamp
-                model.leverage = entity.leverage
-                model.position_size_percent = entity.position_size_percent
-                session.commit()
-        except SQLAlchemyError as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+                for column, value in self._to_mapping(entity).items():
+                    setattr(model, column, value)
+                session.flush()
+                
+    def update_many(self, entities: List[TradeResult], batch_size: int = 1000) -> None:
+        """Atualiza vários trades com um UPDATE em lote (por chave primária) por bloco"""
+        with self._session_scope() as session:
+            for start in range(0, len(entities), batch_size):
+                mappings = [self._to_mapping(e) for e in entities[start:start + batch_size]]
+                session.execute(update(TradeModel), mappings)
             
     def delete(self, id: int) -> None:
-        session = self.Session()
-        try:
-            model = session.query(TradeModel).get(id)
+        with self._session_scope() as session:
+            model = session.get(TradeModel, id)
             if model:
                 session.delete(model)
-                session.commit()
-        except SQLAlchemyError as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+                session.flush()
 
 class SQLAlchemyUnitOfWork(UnitOfWork):
-    """Implementação de Unit of Work para SQLAlchemy"""
+    """Implementação de Unit of Work para SQLAlchemy
+
+    Enquanto o bloco está ativo, o repositório usa a sessão da Unit of Work,
+    de modo que todas as operações formam uma única transação.
+    """
     
     def __init__(self, repository: SQLAlchemyRepository):
         self.repository = repository
-        self.session = repository.Session()
+        self._local = threading.local()
+        
+    @property
+    def session(self) -> Optional[Session]:
+        return self.repository.active_session
         
     def __enter__(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self.repository.active_session = self.repository.Session()
+        self._local.depth = depth + 1
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            self.session.rollback()
-        self.session.close()
+        self._local.depth -= 1
+        if self._local.depth:
+            return
+        session = self.repository.active_session
+        try:
+            if exc_type is not None:
+                session.rollback()
+            else:
+                session.commit()
+        finally:
+            session.close()
+            self.repository.active_session = None
         
     def commit(self):
-        self.session.commit()
+        if self.session is not None:
+            self.session.commit()
         
     def rollback(self):
-        self.session.rollback()
\ No newline at end of file
+        if self.session is not None:
+            self.session.rollback()
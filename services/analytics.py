@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable
+import numpy as np
+import pandas as pd
+from models.records import TRADE_STATUSES, TRADE_TYPES
+from models.trade import TradeResult, TradeStatus, TradeType
+from utils.math_utils import calculate_pnl_batch
+
+# Colunas numéricas extraídas de cada TradeResult fechado
+FRAME_COLUMNS = ('id', 'entry', 'stop', 'result', 'leverage', 'position_size_percent')
+
+# Colunas necessárias para os múltiplos de R
+R_COLUMNS = ('entry', 'stop', 'leverage', 'position_size_percent', 'is_short')
+
+# Colunas lidas do armazenamento colunar para o relatório de desempenho
+STORE_COLUMNS = ('id', 'type', 'entry', 'stop', 'result', 'leverage', 'position_size_percent', 'timestamp', 'close_timestamp')
+
+@dataclass
+class PerformanceReport:
+    """Métricas de desempenho calculadas sobre o histórico de trades fechados"""
+    initial_balance: float
+    final_balance: float
+    total_trades: int
+    wins: int
+    losses: int
+    win_rate: float
+    gross_profit: float
+    gross_loss: float
+    profit_factor: float
+    expectancy: float
+    average_r_multiple: float
+    max_balance: float
+    max_drawdown: float
+    max_drawdown_percent: float
+    max_win_streak: int
+    max_loss_streak: int
+    current_streak: int
+
+def build_trade_frame(trades: Iterable[TradeResult]) -> pd.DataFrame:
+    """Carrega os trades em um DataFrame colunar, na ordem de fechamento"""
+    if hasattr(trades, 'column'):
+        # TradeHistory: as colunas já estão prontas
+        return _frame_from_columns(trades.column)
+    columns = {name: [] for name in FRAME_COLUMNS}
+    is_short = []
+    closed_at = []
+    for trade in trades:
+        for name in FRAME_COLUMNS:
+            columns[name].append(getattr(trade, name))
+        is_short.append(trade.type is TradeType.SHORT)
+        closed_at.append(trade.close_timestamp or trade.timestamp)
+
+    frame = pd.DataFrame({name: np.asarray(values, dtype='float64') for name, values in columns.items()})
+    frame['is_short'] = np.asarray(is_short, dtype=bool)
+    frame['closed_at'] = pd.to_datetime(pd.Series(closed_at, dtype=object), format='mixed', errors='coerce')
+    # Ordenação estável: trades sem data mantêm a ordem de ID
+    return frame.sort_values(['closed_at', 'id'], kind='mergesort', na_position='first').reset_index(drop=True)
+
+def frame_from_records(records: np.ndarray) -> pd.DataFrame:
+    """Monta o mesmo DataFrame de build_trade_frame a partir dos registros do MmapTradeRepository
+
+    Copia só os trades fechados e as colunas usadas no relatório, sem criar
+    nenhum TradeResult.
+    """
+    closed = records['status'] == TRADE_STATUSES.index(TradeStatus.CLOSED)
+    return _frame_from_columns(lambda name: records[name][closed])
+
+def _frame_from_columns(column: Callable[[str], np.ndarray]) -> pd.DataFrame:
+    """DataFrame de build_trade_frame a partir de colunas no layout de TRADE_DTYPE"""
+    frame = pd.DataFrame({name: column(name).astype('float64', copy=False) for name in FRAME_COLUMNS})
+    frame['is_short'] = column('type') == TRADE_TYPES.index(TradeType.SHORT)
+    closed_at = column('close_timestamp')
+    frame['closed_at'] = np.where(np.isnat(closed_at), column('timestamp'), closed_at)
+    return frame.sort_values(['closed_at', 'id'], kind='mergesort', na_position='first').reset_index(drop=True)
+
+def frame_from_store(store, columns=STORE_COLUMNS, filters=None) -> pd.DataFrame:
+    """Monta o mesmo DataFrame de build_trade_frame lendo só as colunas pedidas do ParquetTradeStore
+
+    Com apenas ('id', 'result', 'close_timestamp') o relatório calcula curva de
+    capital, drawdown e sequências, sem os múltiplos de R.
+    """
+    frame = store.read(columns=columns, filters=filters)
+    if 'type' in frame:
+        frame['is_short'] = (frame.pop('type').astype(str) == 'short').to_numpy()
+    closed_at = frame.pop('close_timestamp') if 'close_timestamp' in frame else None
+    opened_at = frame.pop('timestamp') if 'timestamp' in frame else None
+    if closed_at is None:
+        closed_at = opened_at
+    elif opened_at is not None:
+        closed_at = closed_at.fillna(opened_at)
+    frame['closed_at'] = closed_at if closed_at is not None else pd.NaT
+    sort_by = ['closed_at', 'id'] if 'id' in frame else ['closed_at']
+    return frame.sort_values(sort_by, kind='mergesort', na_position='first').reset_index(drop=True)
+
+def compute_performance(frame: pd.DataFrame, initial_balance: float) -> PerformanceReport:
+    """Calcula curva de capital, drawdown, taxa de acerto, fator de lucro e sequências"""
+    results = frame['result'].to_numpy(dtype='float64')
+    total = len(results)
+
+    # Curva de capital começando no saldo inicial
+    equity = initial_balance + np.concatenate(([0.0], np.cumsum(results)))
+    running_max = np.maximum.accumulate(equity)
+    drawdown = running_max - equity
+    drawdown_percent = np.divide(drawdown, running_max, out=np.zeros_like(drawdown), where=running_max > 0) * 100
+
+    wins = results > 0
+    losses = results < 0
+    gross_profit = float(results[wins].sum())
+    gross_loss = float(abs(results[losses].sum()))
+
+    if all(column in frame for column in R_COLUMNS):
+        r_multiples = compute_r_multiples(frame)
+    else:
+        r_multiples = np.full(total, np.nan)
+
+    max_win_streak, max_loss_streak, current_streak = _streaks(results)
+
+    return PerformanceReport(
+        initial_balance=initial_balance,
+        final_balance=float(equity[-1]),
+        total_trades=total,
+        wins=int(wins.sum()),
+        losses=int(losses.sum()),
+        win_rate=float(wins.mean() * 100) if total else 0.0,
+        gross_profit=gross_profit,
+        gross_loss=gross_loss,
+        profit_factor=gross_profit / gross_loss if gross_loss else (float('inf') if gross_profit else 0.0),
+        expectancy=float(results.mean()) if total else 0.0,
+        average_r_multiple=float(np.nanmean(r_multiples)) if np.isfinite(r_multiples).any() else 0.0,
+        max_balance=float(running_max[-1]),
+        max_drawdown=float(drawdown.max()),
+        max_drawdown_percent=float(drawdown_percent.max()),
+        max_win_streak=max_win_streak,
+        max_loss_streak=max_loss_streak,
+        current_streak=current_streak
+    )
+
+def compute_r_multiples(frame: pd.DataFrame) -> np.ndarray:
+    """Múltiplo de R: resultado dividido pelo valor arriscado até o stop (NaN sem risco)"""
+    results = frame['result'].to_numpy(dtype='float64')
+    exposure = (frame['position_size_percent'].to_numpy() / 100) * frame['leverage'].to_numpy()
+    # Valor arriscado = |PnL no stop|
+    risk = np.abs(calculate_pnl_batch(frame['entry'], frame['stop'], exposure, frame['is_short']))
+    return np.divide(results, risk, out=np.full(len(results), np.nan), where=risk > 0)
+
+def _streaks(results: np.ndarray) -> tuple:
+    """Retorna (maior sequência de ganhos, maior de perdas, sequência atual com sinal)"""
+    if not len(results):
+        return 0, 0, 0
+    sign = np.sign(results).astype(np.int8)
+    starts = np.flatnonzero(np.concatenate(([True], sign[1:] != sign[:-1])))
+    lengths = np.diff(np.append(starts, len(sign)))
+    run_sign = sign[starts]
+    max_win = int(lengths[run_sign > 0].max(initial=0))
+    max_loss = int(lengths[run_sign < 0].max(initial=0))
+    return max_win, max_loss, int(lengths[-1] * run_sign[-1])
+
+def performance_from_trades(trades: Iterable[TradeResult], initial_balance: float) -> PerformanceReport:
+    """Atalho: monta o DataFrame e calcula as métricas"""
+    return compute_performance(build_trade_frame(trades), initial_balance)
@@ -0,0 +1,66 @@
+from typing import List, Optional
+from models.account import TradePlan
+from models.trade import TradeResult, TradeStatus
+from core.repository import AsyncRepository, AsyncUnitOfWork
+from services.trade_service import apply_close, build_open_trade, undo_close
+
+class AsyncTradeService:
+    """Versão assíncrona do TradeService para atender muitas requisições concorrentes
+
+    As regras (validação, cálculo do resultado, saldo) são as mesmas do
+    TradeService; apenas o acesso ao repositório é aguardado, permitindo que
+    o I/O de várias operações se sobreponha.
+    """
+
+    def __init__(self,
+                 trade_plan: TradePlan,
+                 trade_repository: AsyncRepository[TradeResult],
+                 unit_of_work: AsyncUnitOfWork):
+        self.trade_plan = trade_plan
+        self.trade_repository = trade_repository
+        self.unit_of_work = unit_of_work
+
+    async def get_open_trades(self) -> List[TradeResult]:
+        """Retorna uma lista de trades abertos"""
+        return await self.trade_repository.find(status=TradeStatus.OPEN)
+
+    async def create_trade(self, trade_data: dict) -> TradeResult:
+        """Cria um novo trade"""
+        from core.schemas import validate_trade
+
+        trade = build_open_trade(self.trade_plan, validate_trade(trade_data))
+        async with self.unit_of_work:
+            await self.trade_repository.add(trade)
+        return trade
+
+    async def close_trade(self, trade_id: int, close_price: float, result: Optional[float] = None) -> TradeResult:
+        """Fecha uma operação aberta"""
+        from core.logging import logger
+
+        # O que já foi aplicado ao plano, para desfazer se o commit falhar
+        applied, history_length = False, None
+        try:
+            async with self.unit_of_work:
+                trade = await self.trade_repository.get(trade_id)
+                if not trade:
+                    logger.error(f"Operação {trade_id} não encontrada")
+                    raise ValueError(f"Operação {trade_id} não encontrada")
+
+                apply_close(self.trade_plan, trade, close_price, result)
+                applied = True
+                await self.trade_repository.update(trade)
+
+                self.trade_plan.completed_trades += 1
+                history_length = len(self.trade_plan.trade_history)
+                self.trade_plan.trade_history.append(trade)
+            logger.info(f"Operação {trade_id} fechada com sucesso")
+            return trade
+        except Exception as e:
+            if applied:
+                undo_close(self.trade_plan, trade, applied, history_length)
+            logger.error(f"Erro ao fechar operação {trade_id}: {str(e)}")
+            raise
+
+    async def close(self) -> None:
+        """Libera os recursos do repositório"""
+        await self.trade_repository.close()
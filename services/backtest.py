@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from core.repository import Repository
+from models.trade import TradeResult, TradeType, TradeStatus
+from utils.file_utils import iter_rows
+from utils.math_utils import calculate_pnl_batch
+
+# Limite de células (trades x barras) avaliadas de uma vez na detecção vetorizada
+MAX_CELLS = 20_000_000
+
+@dataclass
+class BacktestSummary:
+    """Resumo da execução do backtest"""
+    total: int
+    target_hits: int
+    stop_hits: int
+    unresolved: int
+    bars: int
+
+def load_setups(path: str) -> List[dict]:
+    """Lê as configurações de trade (campos do TradeSchema) de um arquivo JSONL ou CSV"""
+    return [row for _, row in iter_rows(path)]
+
+def _prepare_setups(setups: List[dict]) -> dict:
+    """Valida as configurações e as converte em colunas NumPy"""
+    columns = {name: [] for name in ('entry', 'target', 'stop', 'leverage', 'position_size')}
+    is_short, opened_at = [], []
+    for i, setup in enumerate(setups, 1):
+        trade_type = str(setup['type']).lower()
+        if trade_type not in ('long', 'short'):
+            raise ValueError(f"Configuração {i}: tipo de operação inválido. Use 'long' ou 'short'")
+        entry, target, stop = float(setup['entry']), float(setup['target']), float(setup['stop'])
+        # Sem níveis coerentes não há como decidir entre alvo e stop
+        if trade_type == 'long' and not stop < entry < target:
+            raise ValueError(f"Configuração {i}: para long, use stop < entrada < alvo")
+        if trade_type == 'short' and not target < entry < stop:
+            raise ValueError(f"Configuração {i}: para short, use alvo < entrada < stop")
+        columns['entry'].append(entry)
+        columns['target'].append(target)
+        columns['stop'].append(stop)
+        columns['leverage'].append(int(setup.get('leverage', 1)))
+        columns['position_size'].append(float(setup.get('position_size', 100)))
+        is_short.append(trade_type == 'short')
+        opened_at.append(setup.get('timestamp'))
+
+    prepared = {name: np.asarray(values, dtype='float64') for name, values in columns.items()}
+    prepared['is_short'] = np.asarray(is_short, dtype=bool)
+    # Configurações sem data ficam ativas desde a primeira barra
+    opened = pd.to_datetime(pd.Series(opened_at, dtype=object), format='mixed', errors='coerce')
+    prepared['opened_ns'] = np.where(opened.isna(), np.iinfo(np.int64).min, opened.to_numpy('datetime64[ns]').astype(np.int64))
+    return prepared
+
+def iter_bar_chunks(path: str, chunk_size: int = 100_000, time_column: str = 'timestamp',
+                    high_column: str = 'high', low_column: str = 'low') -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Lê as barras OHLC em blocos, retornando (tempo em ns, máximas, mínimas)"""
+    columns = [time_column, high_column, low_column]
+    if Path(path).suffix.lower() == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Leitura de Parquet requer o pacote pyarrow")
+        batches = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns))
+    else:
+        batches = pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+    for frame in batches:
+        times = pd.to_datetime(frame[time_column], format='mixed').to_numpy('datetime64[ns]').astype(np.int64)
+        yield times, frame[high_column].to_numpy('float64'), frame[low_column].to_numpy('float64')
+
+def _first_hits(times, high, low, opened_ns, is_short, target, stop) -> Tuple[np.ndarray, np.ndarray]:
+    """Índice da primeira barra que atinge o alvo e o stop de cada trade (-1 se nenhuma)"""
+    eligible = times[None, :] >= opened_ns[:, None]
+    short = is_short[:, None]
+    target_hit = np.where(short, low[None, :] <= target[:, None], high[None, :] >= target[:, None]) & eligible
+    stop_hit = np.where(short, high[None, :] >= stop[:, None], low[None, :] <= stop[:, None]) & eligible
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), -1)
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), -1)
+    return first_target, first_stop
+
+def run_backtest(bars_path: str, setups: List[dict], repository: Repository[TradeResult],
+                 initial_balance: float, chunk_size: int = 100_000) -> BacktestSummary:
+    """Reproduz as barras e grava cada trade como TradeResult no repositório informado
+
+    Quando alvo e stop são atingidos na mesma barra, considera-se o stop
+    (não há como saber a ordem dentro da barra).
+    """
+    prepared = _prepare_setups(setups)
+    total = len(setups)
+    exit_price = np.full(total, np.nan)
+    exit_ns = np.zeros(total, dtype=np.int64)
+    hit_target = np.zeros(total, dtype=bool)
+    resolved = np.zeros(total, dtype=bool)
+    first_bar_ns = None
+    bars = 0
+
+    for times, high, low in iter_bar_chunks(bars_path, chunk_size):
+        if not len(times):
+            continue
+        if first_bar_ns is None:
+            first_bar_ns = int(times[0])
+        bars += len(times)
+        pending = np.flatnonzero(~resolved & (prepared['opened_ns'] <= times[-1]))
+        step = max(1, MAX_CELLS // len(times))
+        for start in range(0, len(pending), step):
+            batch = pending[start:start + step]
+            first_target, first_stop = _first_hits(
+                times, high, low,
+                prepared['opened_ns'][batch], prepared['is_short'][batch],
+                prepared['target'][batch], prepared['stop'][batch]
+            )
+            stop_first = (first_stop >= 0) & ((first_target < 0) | (first_stop <= first_target))
+            target_first = (first_target >= 0) & ~stop_first
+            for mask, bar_index, levels, is_target in (
+                (stop_first, first_stop, prepared['stop'], False),
+                (target_first, first_target, prepared['target'], True)
+            ):
+                hit = batch[mask]
+                exit_price[hit] = levels[hit]
+                exit_ns[hit] = times[bar_index[mask]]
+                hit_target[hit] = is_target
+                resolved[hit] = True
+
+    trades = _build_results(prepared, setups, exit_price, exit_ns, resolved, initial_balance, first_bar_ns)
+    repository.add_many(trades)
+    return BacktestSummary(
+        total=total,
+        target_hits=int((resolved & hit_target).sum()),
+        stop_hits=int((resolved & ~hit_target).sum()),
+        unresolved=int((~resolved).sum()),
+        bars=bars
+    )
+
+def _build_results(prepared: dict, setups: List[dict], exit_price: np.ndarray, exit_ns: np.ndarray,
+                   resolved: np.ndarray, initial_balance: float, first_bar_ns: Optional[int]) -> List[TradeResult]:
+    """Converte os resultados em TradeResult, encadeando os saldos na ordem de fechamento"""
+    exposure = (prepared['position_size'] / 100) * prepared['leverage']
+    results = np.where(resolved, calculate_pnl_batch(prepared['entry'], np.nan_to_num(exit_price), exposure, prepared['is_short']), 0.0)
+
+    order = np.flatnonzero(resolved)
+    order = order[np.argsort(exit_ns[order], kind='stable')]
+    balance_after = np.full(len(setups), np.nan)
+    balance_after[order] = initial_balance + np.cumsum(results[order])
+    final_balance = float(balance_after[order[-1]]) if len(order) else initial_balance
+
+    def iso(ns: int) -> str:
+        return pd.Timestamp(ns).isoformat()
+
+    trades = []
+    for i, setup in enumerate(setups):
+        opened_ns = int(prepared['opened_ns'][i])
+        if opened_ns == np.iinfo(np.int64).min:
+            opened_ns = first_bar_ns if first_bar_ns is not None else 0
+        closed = bool(resolved[i])
+        after = float(balance_after[i]) if closed else final_balance
+        trades.append(TradeResult(
+            type=TradeType.SHORT if prepared['is_short'][i] else TradeType.LONG,
+            entry=float(prepared['entry'][i]),
+            target=float(prepared['target'][i]),
+            stop=float(prepared['stop'][i]),
+            result=float(results[i]),
+            balance_before=after - float(results[i]),
+            balance_after=after,
+            timestamp=iso(opened_ns),
+            leverage=int(prepared['leverage'][i]),
+            position_size_percent=float(prepared['position_size'][i]),
+            status=TradeStatus.CLOSED if closed else TradeStatus.OPEN,
+            close_price=float(exit_price[i]) if closed else 0.0,
+            close_timestamp=iso(int(exit_ns[i])) if closed else None
+        ))
+    return trades
@@ -0,0 +1,285 @@
+import csv
+import os
+import socket
+import stat
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from models.trade import TradeResult
+from utils.math_utils import calculate_pnl_batch, side_vector
+
+# Bloco de ticks: (instrumento de cada tick, preços)
+TickBatch = Tuple[List[str], np.ndarray]
+
+DEFAULT_BATCH_SIZE = 10_000
+
+def parse_ticks(lines: Iterable[str], default_instrument: str) -> TickBatch:
+    """Converte linhas 'instrumento,preço' (ou só 'preço') em um bloco de ticks
+
+    Linhas vazias e cabeçalhos (preço não numérico) são ignorados; colunas
+    além das duas primeiras (ex.: timestamp) também.
+    """
+    instruments, prices = [], []
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        if len(row) == 1:
+            instruments.append(default_instrument)
+            prices.append(row[0])
+        else:
+            instruments.append(row[0].strip())
+            prices.append(row[1])
+    try:
+        values = np.array(prices, dtype='float64')
+    except ValueError:
+        # Caminho lento só quando há cabeçalho ou lixo no bloco
+        keep = [i for i, price in enumerate(prices) if _is_number(price)]
+        instruments = [instruments[i] for i in keep]
+        values = np.array([prices[i] for i in keep], dtype='float64')
+    return instruments, values
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+class TickSource(ABC):
+    """Origem de ticks consumida pelo PriceFeed, em blocos"""
+
+    @abstractmethod
+    def batches(self) -> Iterator[TickBatch]:
+        """Gera os blocos de ticks até a origem se esgotar"""
+        pass
+
+class CsvTickSource(TickSource):
+    """Replay de um arquivo CSV com linhas 'instrumento,preço'"""
+
+    def __init__(self, path: str, default_instrument: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.default_instrument = default_instrument
+        self.batch_size = batch_size
+
+    def batches(self) -> Iterator[TickBatch]:
+        with open(self.path, newline='', encoding='utf-8') as f:
+            while True:
+                lines = list(islice(f, self.batch_size))
+                if not lines:
+                    return
+                batch = parse_ticks(lines, self.default_instrument)
+                if batch[0]:
+                    yield batch
+
+class SocketTickSource(TickSource):
+    """Ticks recebidos por socket local (TCP 'host:porta' ou caminho de socket Unix)
+
+    O protocolo é o mesmo do CSV, uma linha por tick. Cada bloco reúne as
+    linhas completas já recebidas (até batch_size), então o atraso não
+    depende de o bloco encher.
+    """
+
+    def __init__(self, address: str, default_instrument: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.address = address
+        self.default_instrument = default_instrument
+        self.batch_size = batch_size
+
+    def _connect(self) -> socket.socket:
+        host, _, port = self.address.rpartition(':')
+        if port.isdigit() and not os.path.exists(self.address):
+            return socket.create_connection((host or 'localhost', int(port)))
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.address)
+        return sock
+
+    def batches(self) -> Iterator[TickBatch]:
+        with self._connect() as sock:
+            pending = b''
+            while True:
+                data = sock.recv(1 << 16)
+                if not data:
+                    break
+                pending += data
+                end = pending.rfind(b'\n')
+                if end < 0:
+                    continue
+                lines = pending[:end].decode('utf-8').split('\n')
+                pending = pending[end + 1:]
+                for start in range(0, len(lines), self.batch_size):
+                    batch = parse_ticks(lines[start:start + self.batch_size], self.default_instrument)
+                    if batch[0]:
+                        yield batch
+            if pending.strip():
+                batch = parse_ticks([pending.decode('utf-8')], self.default_instrument)
+                if batch[0]:
+                    yield batch
+
+def open_tick_source(source: str, default_instrument: str, batch_size: int = DEFAULT_BATCH_SIZE) -> TickSource:
+    """Arquivo existente (que não seja socket) vira replay de CSV; o resto é tratado como endereço de socket"""
+    if os.path.exists(source) and not stat.S_ISSOCK(os.stat(source).st_mode):
+        return CsvTickSource(source, default_instrument, batch_size)
+    return SocketTickSource(source, default_instrument, batch_size)
+
+class PriceBook:
+    """Último preço de cada instrumento, em um array indexado pelo código do instrumento"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.prices = np.full(16, np.nan)
+        self.ticks = 0
+
+    def code(self, instrument: str) -> int:
+        code = self.codes.get(instrument)
+        if code is None:
+            code = self.codes[instrument] = len(self.codes)
+            if code >= len(self.prices):
+                self.prices = np.concatenate([self.prices, np.full(len(self.prices), np.nan)])
+        return code
+
+    def apply(self, instruments: List[str], prices: np.ndarray) -> None:
+        """Aplica um bloco de ticks; para cada instrumento vale o último tick do bloco"""
+        codes = self.codes
+        lookup = [codes.get(instrument) for instrument in instruments]
+        if None in lookup:
+            lookup = [self.code(instrument) for instrument in instruments]
+        indexes = np.array(lookup, dtype=np.intp)
+        # Só a última ocorrência de cada código (atribuição com índices repetidos não garante a ordem)
+        reverse = indexes[::-1]
+        _, last = np.unique(reverse, return_index=True)
+        self.prices[reverse[last]] = prices[::-1][last]
+        self.ticks += len(indexes)
+
+    def last(self, instrument: str) -> Optional[float]:
+        code = self.codes.get(instrument)
+        if code is None or np.isnan(self.prices[code]):
+            return None
+        return float(self.prices[code])
+
+@dataclass
+class MarkToMarket:
+    """Marcação a mercado das operações abertas com os últimos preços
+
+    Os arrays seguem a ordem de trade_ids; operações de instrumentos ainda
+    sem preço ficam com NaN e não entram nos totais.
+    """
+    trade_ids: np.ndarray
+    prices: np.ndarray
+    unrealized: np.ndarray
+    exposure: np.ndarray
+    ticks: int
+
+    @property
+    def total_unrealized(self) -> float:
+        return float(np.nansum(self.unrealized))
+
+    @property
+    def net_exposure(self) -> float:
+        return float(np.nansum(self.exposure))
+
+    @property
+    def gross_exposure(self) -> float:
+        return float(np.nansum(np.abs(self.exposure)))
+
+    @property
+    def priced(self) -> int:
+        """Operações com preço conhecido"""
+        return int(np.count_nonzero(~np.isnan(self.prices)))
+
+    def by_trade(self) -> Dict[int, Tuple[float, float]]:
+        """{id do trade: (preço atual, PnL não realizado)} das operações com preço"""
+        priced = ~np.isnan(self.prices)
+        return dict(zip(self.trade_ids[priced].tolist(),
+                        zip(self.prices[priced].tolist(), self.unrealized[priced].tolist())))
+
+class OpenPositions:
+    """Colunas das operações abertas usadas na marcação a mercado
+
+    Os trades não têm campo de instrumento: instrument pode ser um nome (todas
+    as operações do plano no mesmo ativo) ou uma função que devolve o
+    instrumento de cada trade.
+    """
+
+    def __init__(self, trades: Iterable[TradeResult], book: PriceBook,
+                 instrument: Union[str, Callable[[TradeResult], str]]):
+        trades = list(trades)
+        instrument_of = instrument if callable(instrument) else (lambda trade: instrument)
+        self.book = book
+        self.trade_ids = np.array([trade.id for trade in trades], dtype='int64')
+        self.entry = np.array([trade.entry for trade in trades], dtype='float64')
+        self.size = np.array([(trade.position_size_percent / 100) * trade.leverage for trade in trades], dtype='float64')
+        self.is_short = side_vector(trade.type for trade in trades)
+        self.codes = np.array([book.code(instrument_of(trade)) for trade in trades], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.trade_ids)
+
+    def mark(self) -> MarkToMarket:
+        """Recalcula PnL não realizado e exposição de todas as operações em uma passada"""
+        prices = self.book.prices[self.codes]
+        unrealized = calculate_pnl_batch(self.entry, prices, self.size, self.is_short)
+        # Exposição com sinal: positiva para long, negativa para short
+        exposure = np.where(self.is_short, -self.size, self.size) * prices
+        return MarkToMarket(self.trade_ids, prices, unrealized, exposure, self.book.ticks)
+
+class PriceFeed:
+    """Consome uma origem de ticks e marca as operações abertas a cada bloco"""
+
+    def __init__(self, source: TickSource, trades: Iterable[TradeResult],
+                 instrument: Union[str, Callable[[TradeResult], str]], book: Optional[PriceBook] = None):
+        self.source = source
+        self.instrument = instrument
+        self.book = book or PriceBook()
+        self.positions = OpenPositions(trades, self.book, instrument)
+        self.snapshot: Optional[MarkToMarket] = None
+        self._pending_trades: Optional[List[TradeResult]] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def set_trades(self, trades: Iterable[TradeResult]) -> None:
+        """Troca as operações abertas (ex.: após abrir ou fechar uma operação)
+
+        Pode ser chamado de outra thread: com o feed rodando, a troca é feita
+        por run() antes do próximo bloco; com ele parado, a marcação é refeita
+        na hora com os últimos preços.
+        """
+        with self._lock:
+            if self._running:
+                self._pending_trades = list(trades)
+                return
+        self.positions = OpenPositions(trades, self.book, self.instrument)
+        self.snapshot = self.positions.mark()
+
+    def run(self, on_update: Optional[Callable[[MarkToMarket], None]] = None,
+            stop: Optional[Callable[[], bool]] = None,
+            on_ticks: Optional[Callable[[List[str], np.ndarray], None]] = None) -> Optional[MarkToMarket]:
+        """Processa os blocos até a origem acabar (ou stop() ser verdadeiro); retorna a última marcação
+
+        on_ticks recebe cada bloco antes da marcação (ex.: gatilhos de
+        stop/alvo); um set_trades() feito nele já vale para o mesmo bloco.
+        """
+        with self._lock:
+            self._running = True
+        try:
+            for instruments, prices in self.source.batches():
+                if on_ticks is not None:
+                    on_ticks(instruments, prices)
+                with self._lock:
+                    trades, self._pending_trades = self._pending_trades, None
+                if trades is not None:
+                    self.positions = OpenPositions(trades, self.book, self.instrument)
+                self.book.apply(instruments, prices)
+                self.snapshot = self.positions.mark()
+                if on_update is not None:
+                    on_update(self.snapshot)
+                if stop is not None and stop():
+                    break
+        finally:
+            with self._lock:
+                self._running = False
+                trades, self._pending_trades = self._pending_trades, None
+            if trades is not None:
+                self.set_trades(trades)
+        return self.snapshot
@@ -0,0 +1,112 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+@dataclass
+class SimulationResult:
+    """Resumo de uma simulação de Monte Carlo do plano de trade"""
+    paths: int
+    trades_per_path: int
+    workers: int
+    ruin_probability: float
+    max_drawdown_percentiles: Dict[int, float]
+    final_balance_percentiles: Dict[int, float]
+    elapsed: float
+
+    @property
+    def paths_per_second(self) -> float:
+        return self.paths / self.elapsed if self.elapsed else float('inf')
+
+def _simulate_chunk(seed: np.random.SeedSequence, paths: int, total_trades: int,
+                    risk_fraction: float, initial_balance: float, ruin_balance: float,
+                    r_multiples: Optional[np.ndarray], win_rate: float, reward_risk: float) -> np.ndarray:
+    """Simula um bloco de caminhos; retorna (saldo final, drawdown máximo %, ruína) por caminho"""
+    rng = np.random.default_rng(seed)
+    if r_multiples is not None:
+        # Bootstrap: reamostra os múltiplos de R do histórico com reposição
+        outcomes = rng.choice(r_multiples, size=(paths, total_trades), replace=True)
+    else:
+        wins = rng.random((paths, total_trades)) < win_rate
+        outcomes = np.where(wins, reward_risk, -1.0)
+
+    # Cada trade arrisca uma fração fixa do saldo corrente (juros compostos)
+    growth = np.maximum(1.0 + risk_fraction * outcomes, 0.0)
+    equity = initial_balance * np.cumprod(growth, axis=1)
+    running_max = np.maximum(np.maximum.accumulate(equity, axis=1), initial_balance)
+    drawdown = (running_max - equity) / running_max * 100
+
+    summary = np.empty((paths, 3))
+    summary[:, 0] = equity[:, -1]
+    summary[:, 1] = drawdown.max(axis=1)
+    summary[:, 2] = equity.min(axis=1) <= ruin_balance
+    return summary
+
+def simulate(total_trades: int, risk_per_trade: float, initial_balance: float,
+             paths: int = 10000, r_multiples: Optional[Sequence[float]] = None,
+             win_rate: Optional[float] = None, reward_risk: Optional[float] = None,
+             ruin_percent: float = 50.0, seed: Optional[int] = None,
+             workers: int = 1, chunk_size: int = 2000) -> SimulationResult:
+    """Executa a simulação de Monte Carlo distribuindo blocos de caminhos entre processos
+
+    Usa os múltiplos de R históricos (bootstrap) ou uma taxa de acerto (%) com
+    relação risco/recompensa fixa. As sementes são derivadas por bloco, então
+    o resultado para uma mesma semente não depende do número de processos.
+    """
+    if r_multiples is not None:
+        r_multiples = np.asarray(r_multiples, dtype='float64')
+        r_multiples = r_multiples[np.isfinite(r_multiples)]
+        if not len(r_multiples):
+            raise ValueError("Não há múltiplos de R válidos no histórico para reamostrar")
+    elif win_rate is None or reward_risk is None:
+        raise ValueError("Informe o histórico de múltiplos de R ou a taxa de acerto e a relação R:R")
+    elif not 0 <= win_rate <= 100 or reward_risk <= 0:
+        raise ValueError("Taxa de acerto deve estar entre 0% e 100% e R:R deve ser positivo")
+    if paths < 1 or total_trades < 1:
+        raise ValueError("Número de caminhos e de operações deve ser positivo")
+
+    chunk_sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    common = (
+        total_trades,
+        risk_per_trade / 100,
+        initial_balance,
+        initial_balance * (1 - ruin_percent / 100),
+        r_multiples,
+        (win_rate or 0) / 100,
+        reward_risk or 0
+    )
+
+    started = time.perf_counter()
+    if workers <= 1:
+        chunks = [_simulate_chunk(s, n, *common) for s, n in zip(seeds, chunk_sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_simulate_chunk, s, n, *common) for s, n in zip(seeds, chunk_sizes)]
+            chunks = [future.result() for future in futures]
+    summary = np.concatenate(chunks)
+    elapsed = time.perf_counter() - started
+
+    return SimulationResult(
+        paths=paths,
+        trades_per_path=total_trades,
+        workers=max(workers, 1),
+        ruin_probability=float(summary[:, 2].mean() * 100),
+        max_drawdown_percentiles=dict(zip(PERCENTILES, np.percentile(summary[:, 1], PERCENTILES).tolist())),
+        final_balance_percentiles=dict(zip(PERCENTILES, np.percentile(summary[:, 0], PERCENTILES).tolist())),
+        elapsed=elapsed
+    )
+
+def scaling_worker_counts(max_workers: Optional[int] = None) -> List[int]:
+    """Números de processos (potências de 2) usados para medir a escalabilidade"""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
@@ -1,20 +1,109 @@
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Iterable, Iterator, Optional, List, Tuple
 from models.account import TradePlan
 from models.trade import TradeResult, TradeType, TradeStatus
 from core.repository import Repository, UnitOfWork
 from utils.math_utils import calculate_position_size, calculate_pnl
 
+@dataclass
+class ImportSummary:
+    """Resumo de uma importação em lote"""
+    total: int
+    imported: int
+    rejected: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+def build_open_trade(trade_plan: TradePlan, validated_data: dict) -> TradeResult:
+    """Cria um TradeResult aberto a partir de dados já validados"""
+    return TradeResult(
+        type=TradeType(validated_data['type']),
+        entry=validated_data['entry'],
+        target=validated_data['target'],
+        stop=validated_data['stop'],
+        result=0,
+        balance_before=trade_plan.current_balance,
+        balance_after=trade_plan.current_balance,
+        timestamp=validated_data['timestamp'],
+        leverage=validated_data['leverage'],
+        position_size_percent=validated_data['position_size']
+    )
+
+def apply_close(trade_plan: TradePlan, trade: TradeResult, close_price: float, result: Optional[float] = None) -> TradeResult:
+    """Marca o trade como fechado e atualiza o saldo do plano (sem gravar)"""
+    from core.logging import logger
+    
+    if trade.status == TradeStatus.CLOSED:
+        logger.error(f"Operação {trade.id} já está fechada")
+        raise ValueError(f"Operação {trade.id} já está fechada")
+        
+    # Calcula o resultado se não foi fornecido
+    if result is None:
+        logger.debug("Calculando resultado automaticamente")
+        result = calculate_pnl(
+            entry=trade.entry,
+            exit_price=close_price,
+            position_size=(trade.position_size_percent / 100) * trade.leverage,
+            trade_type=trade.type.value
+        )
+        logger.debug(f"Resultado calculado: {result}")
+        
+    # Atualiza o trade
+    trade.status = TradeStatus.CLOSED
+    trade.close_price = close_price
+    trade.close_timestamp = datetime.now().isoformat()
+    trade.result = result
+    
+    # Atualiza o saldo
+    trade_plan.current_balance += result
+    trade.balance_after = trade_plan.current_balance
+    return trade
+
+def truncate_history(history, length: int) -> None:
+    """Descarta os itens do histórico a partir de length
+
+    No histórico carregado do log de eventos (LazyEventList), itens ainda não
+    gravados saem sem decodificar o log nem forçar sua regravação.
+    """
+    from utils.plan_checkpoint import LazyEventList
+    
+    if isinstance(history, LazyEventList):
+        history.truncate(length)
+    else:
+        del history[length:]
+
+def undo_close(trade_plan: TradePlan, trade: TradeResult, applied: bool, history_length: Optional[int]) -> None:
+    """Desfaz no plano um fechamento cujo commit falhou
+
+    applied: apply_close já alterou o saldo; history_length: tamanho do
+    histórico antes de o trade ser acrescentado (None se o contador e o
+    histórico ainda não o receberam).
+    """
+    if applied:
+        trade_plan.current_balance -= trade.result
+    if history_length is not None:
+        trade_plan.completed_trades -= 1
+        truncate_history(trade_plan.trade_history, history_length)
+
 class TradeService:
     """Serviço para gerenciamento de operações de trade"""
     
     def __init__(self, 
                  trade_plan: TradePlan,
                  trade_repository: Repository[TradeResult],
-                 unit_of_work: UnitOfWork):
+                 unit_of_work: UnitOfWork,
+                 analytics_store=None):
         self.trade_plan = trade_plan
         self.trade_repository = trade_repository
         self.unit_of_work = unit_of_work
+        # Armazenamento colunar opcional (ParquetTradeStore) alimentado a cada fechamento
+        self.analytics_store = analytics_store
 
     def calculate_position(self, entry: float, stop: float) -> float:
         """Calcula o tamanho da posição"""
@@ -40,7 +129,34 @@ class TradeService:
 
     def get_open_trades(self) -> List[TradeResult]:
         """Retorna uma lista de trades abertos"""
-        return [t for t in self.trade_repository.list() if t.result == 0]
+        return self.trade_repository.find(status=TradeStatus.OPEN)
+
+    def iter_open_trades(self, after_id: Optional[int] = None, batch_size: int = 1000) -> Iterator[TradeResult]:
+        """Itera sobre os trades abertos sem carregar todo o histórico"""
+        return self.trade_repository.iter_trades(
+            batch_size=batch_size,
+            after_id=after_id,
+            status=TradeStatus.OPEN
+        )
+
+    def get_performance_report(self):
+        """Calcula as métricas de desempenho sobre os trades fechados"""
+        from services.analytics import compute_performance, frame_from_records, frame_from_store, performance_from_trades
+        
+        if self.analytics_store is not None:
+            return compute_performance(frame_from_store(self.analytics_store), self.trade_plan.initial_balance)
+        if hasattr(self.trade_repository, 'records'):
+            # Repositório binário: lê as colunas direto do arquivo mapeado
+            return compute_performance(frame_from_records(self.trade_repository.records()), self.trade_plan.initial_balance)
+        closed_trades = self.trade_repository.iter_trades(status=TradeStatus.CLOSED)
+        return performance_from_trades(closed_trades, self.trade_plan.initial_balance)
+
+    def get_r_multiples(self):
+        """Retorna os múltiplos de R dos trades fechados"""
+        from services.analytics import build_trade_frame, compute_r_multiples
+        
+        closed_trades = self.trade_repository.iter_trades(status=TradeStatus.CLOSED)
+        return compute_r_multiples(build_trade_frame(closed_trades))
 
     def create_trade(self, trade_data: dict) -> TradeResult:
         """Cria um novo trade"""
@@ -57,6 +173,8 @@ class TradeService:
         """Fecha uma operação aberta"""
         from core.logging import logger
         
+        # O que já foi aplicado ao plano, para desfazer se o commit falhar
+        applied, history_length = False, None
         try:
             with self.unit_of_work:
                 logger.debug(f"Tentando fechar operação {trade_id}")
@@ -68,64 +186,125 @@ class TradeService:
                     
                 logger.debug(f"Operação encontrada: {trade}")
                 
-                if trade.status == TradeStatus.CLOSED:
-                    logger.error(f"Operação {trade_id} já está fechada")
-                    raise ValueError(f"Operação {trade_id} já está fechada")
-                    
-                # Calcula o resultado se não foi fornecido
-                if result is None:
-                    logger.debug("Calculando resultado automaticamente")
-                    result = calculate_pnl(
-                        entry=trade.entry,
-                        exit_price=close_price,
-                        position_size=(trade.position_size_percent / 100) * trade.leverage,
-                        trade_type=trade.type.value
-                    )
-                    logger.debug(f"Resultado calculado: {result}")
-                    
-                # Atualiza o trade
-                trade.status = TradeStatus.CLOSED
-                trade.close_price = close_price
-                trade.close_timestamp = datetime.now().isoformat()
-                trade.result = result
-                
-                # Atualiza o saldo
-                self.trade_plan.current_balance += result
-                trade.balance_after = self.trade_plan.current_balance
+                apply_close(self.trade_plan, trade, close_price, result)
+                applied = True
                 
                 logger.debug(f"Atualizando trade no repositório: {trade}")
                 self.trade_repository.update(trade)
                 
                 self.trade_plan.completed_trades += 1
+                history_length = len(self.trade_plan.trade_history)
                 self.trade_plan.trade_history.append(trade)
                 
-                logger.info(f"Operação {trade_id} fechada com sucesso")
-                return trade
+            # Só trades efetivamente gravados entram no armazenamento analítico, já em disco:
+            # relatórios de outros processos leem apenas os arquivos
+            if self.analytics_store is not None:
+                self.analytics_store.append(trade, flush=True)
+                
+            logger.info(f"Operação {trade_id} fechada com sucesso")
+            return trade
                 
         except Exception as e:
+            # Ex.: no group commit, outra transação fechou o mesmo trade antes do commit
+            if applied:
+                undo_close(self.trade_plan, trade, applied, history_length)
             logger.error(f"Erro ao fechar operação {trade_id}: {str(e)}")
             logger.exception(e)
             raise
 
+    def close_trades(self, closes: Iterable[Tuple[int, float]]) -> List[TradeResult]:
+        """Fecha várias operações (id, preço) com close_trade em uma única transação
+
+        Tudo ou nada: se um fechamento falhar, a transação é desfeita e o
+        saldo, o contador e o histórico do plano voltam ao estado anterior.
+        """
+        plan = self.trade_plan
+        saved = (plan.current_balance, plan.completed_trades, len(plan.trade_history))
+        # O armazenamento analítico só recebe os trades depois do commit
+        analytics_store, self.analytics_store = self.analytics_store, None
+        closed = []
+        try:
+            with self.unit_of_work:
+                for trade_id, close_price in closes:
+                    closed.append(self.close_trade(trade_id, close_price))
+        except Exception:
+            plan.current_balance, plan.completed_trades = saved[0], saved[1]
+            truncate_history(plan.trade_history, saved[2])
+            raise
+        finally:
+            self.analytics_store = analytics_store
+        if analytics_store is not None and closed:
+            analytics_store.append_many(closed, flush=True)
+        return closed
+
+    def validate_trade_batch(self, rows: List[dict]) -> Tuple[List[TradeResult], List[Tuple[int, str]]]:
+        """Valida um lote de trades; retorna os trades válidos e (posição, motivo) dos rejeitados"""
+        from pydantic import ValidationError
+        from core.schemas import validate_trades
+        
+        trades, rejects = [], []
+        for position, validated in enumerate(validate_trades(rows)):
+            if isinstance(validated, ValidationError):
+                reason = '; '.join(
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in validated.errors()
+                )
+                rejects.append((position, reason))
+            else:
+                trades.append(self._create_trade(validated))
+        return trades, rejects
+
+    def import_trades(self,
+                      rows: Iterable[Tuple[int, dict]],
+                      chunk_size: int = 5000,
+                      on_reject: Optional[Callable[[int, dict, str], None]] = None,
+                      on_progress: Optional[Callable[[ImportSummary], None]] = None) -> ImportSummary:
+        """Importa trades em blocos: valida o bloco e grava os válidos com add_many
+
+        Em repositórios que regravam o arquivo inteiro a cada commit
+        (rewrites_on_commit), todos os blocos ficam em uma única transação:
+        gravar bloco a bloco custaria O(n²/chunk_size) bytes. Nesse caso um
+        erro de gravação desfaz a importação inteira.
+        """
+        started = time.perf_counter()
+        summary = ImportSummary(total=0, imported=0, rejected=0, elapsed=0.0)
+        chunk: List[Tuple[int, dict]] = []
+        
+        def flush():
+            trades, rejects = self.validate_trade_batch([row for _, row in chunk])
+            if trades:
+                with self.unit_of_work:
+                    self.trade_repository.add_many(trades, batch_size=chunk_size)
+            for position, reason in rejects:
+                if on_reject is not None:
+                    line_number, row = chunk[position]
+                    on_reject(line_number, row, reason)
+            summary.total += len(chunk)
+            summary.imported += len(trades)
+            summary.rejected += len(rejects)
+            summary.elapsed = time.perf_counter() - started
+            chunk.clear()
+            if on_progress is not None:
+                on_progress(summary)
+        
+        single_transaction = getattr(self.trade_repository, 'rewrites_on_commit', False)
+        with self.unit_of_work if single_transaction else nullcontext():
+            for item in rows:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    flush()
+            if chunk:
+                flush()
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
     def _validate_and_create_trade(self, trade_data: dict) -> TradeResult:
         """Valida os dados e cria um novo TradeResult"""
-        from core.schemas import TradeSchema
-        
-        # Valida os dados usando o schema
-        validated_data = TradeSchema(**trade_data).dict()
+        from core.schemas import validate_trade
         
-        # Cria o trade
-        return TradeResult(
-            type=TradeType(validated_data['type']),
-            entry=validated_data['entry'],
-            target=validated_data['target'],
-            stop=validated_data['stop'],
-            result=0,
-            balance_before=self.trade_plan.current_balance,
-            balance_after=self.trade_plan.current_balance,
-            timestamp=validated_data['timestamp'],
-            leverage=validated_data['leverage'],
-            position_size_percent=validated_data['position_size']
-        )
+        return self._create_trade(validate_trade(trade_data))
+
+    def _create_trade(self, validated_data: dict) -> TradeResult:
+        """Cria um TradeResult aberto a partir de dados já validados"""
+        return build_open_trade(self.trade_plan, validated_data)
 
     # ... (outros métodos atualizados)
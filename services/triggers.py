@@ -0,0 +1,184 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from models.trade import TradeResult, TradeType
+
+STOP = 'stop'
+TARGET = 'target'
+
+# Níveis disparados quando o preço sobe até eles; os demais, quando o preço cai até eles
+_RISING = {(TradeType.LONG, TARGET), (TradeType.SHORT, STOP)}
+
+class Trigger(NamedTuple):
+    """Nível cruzado por um preço"""
+    trade_id: int
+    kind: str
+    level: float
+
+class _LevelList:
+    """Níveis ordenados em listas paralelas (a busca binária compara só floats)"""
+
+    __slots__ = ('levels', 'ids')
+
+    def __init__(self):
+        self.levels: List[float] = []
+        self.ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def insert(self, level: float, trade_id: int) -> None:
+        position = bisect_right(self.levels, level)
+        self.levels.insert(position, level)
+        self.ids.insert(position, trade_id)
+
+    def remove(self, level: float, trade_id: int) -> None:
+        # Níveis iguais ficam juntos: procura o ID só entre eles
+        position = bisect_left(self.levels, level)
+        position += self.ids[position:bisect_right(self.levels, level)].index(trade_id)
+        del self.levels[position], self.ids[position]
+
+    def rebuild(self, pairs: List[Tuple[float, int]]) -> None:
+        pairs.sort()
+        self.levels = [level for level, _ in pairs]
+        self.ids = [trade_id for _, trade_id in pairs]
+
+class TriggerIndex:
+    """Operações abertas indexadas pelos níveis de stop e alvo, por lado
+
+    Cada lado (long/short) tem uma lista ordenada de níveis para os stops e
+    outra para os alvos. Os níveis cruzados por um preço formam um prefixo
+    ou um sufixo de cada lista, encontrado por busca binária: crossed()
+    custa O(log n + k) para k disparos, sem percorrer as n operações em
+    repouso.
+    """
+
+    def __init__(self, trades: Iterable[TradeResult] = ()):
+        self._levels: Dict[Tuple[TradeType, str], _LevelList] = {
+            (side, kind): _LevelList() for side in TradeType for kind in (STOP, TARGET)
+        }
+        # (lista, tipo de nível, dispara na alta?) pré-calculado para o crossed()
+        self._scans = [(levels, key[1], key in _RISING) for key, levels in self._levels.items()]
+        self._trades: Dict[int, TradeResult] = {}
+        self.add_many(trades)
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __contains__(self, trade_id: int) -> bool:
+        return trade_id in self._trades
+
+    def trades(self) -> List[TradeResult]:
+        """Operações indexadas"""
+        return list(self._trades.values())
+
+    @staticmethod
+    def _check(trade: TradeResult) -> None:
+        if trade.type == TradeType.LONG and not trade.stop < trade.entry < trade.target:
+            raise ValueError(f"Operação {trade.id}: para long, use stop < entrada < alvo")
+        if trade.type == TradeType.SHORT and not trade.target < trade.entry < trade.stop:
+            raise ValueError(f"Operação {trade.id}: para short, use alvo < entrada < stop")
+
+    def add(self, trade: TradeResult) -> None:
+        """Indexa a operação; níveis incoerentes com o lado geram ValueError"""
+        self._check(trade)
+        self.remove(trade.id)
+        self._trades[trade.id] = trade
+        self._levels[(trade.type, STOP)].insert(float(trade.stop), trade.id)
+        self._levels[(trade.type, TARGET)].insert(float(trade.target), trade.id)
+
+    def add_many(self, trades: Iterable[TradeResult]) -> List[Tuple[TradeResult, str]]:
+        """Indexa várias operações ordenando cada lista uma única vez
+
+        Retorna (operação, motivo) das que foram recusadas por níveis incoerentes.
+        """
+        rejected = []
+        for trade in trades:
+            try:
+                self._check(trade)
+            except ValueError as e:
+                rejected.append((trade, str(e)))
+                continue
+            self._trades[trade.id] = trade
+        pairs = {key: [] for key in self._levels}
+        for trade in self._trades.values():
+            pairs[(trade.type, STOP)].append((float(trade.stop), trade.id))
+            pairs[(trade.type, TARGET)].append((float(trade.target), trade.id))
+        for key, levels in self._levels.items():
+            levels.rebuild(pairs[key])
+        return rejected
+
+    def remove(self, trade_id: int) -> Optional[TradeResult]:
+        trade = self._trades.pop(trade_id, None)
+        if trade is None:
+            return None
+        self._levels[(trade.type, STOP)].remove(float(trade.stop), trade_id)
+        self._levels[(trade.type, TARGET)].remove(float(trade.target), trade_id)
+        return trade
+
+    def crossed(self, price: float) -> List[Trigger]:
+        """Níveis cruzados pelo preço, em ordem de ID"""
+        triggers = []
+        for levels, kind, rising in self._scans:
+            if rising:
+                # Níveis <= preço: prefixo da lista
+                end = bisect_right(levels.levels, price)
+                if end:
+                    triggers.extend(map(Trigger, levels.ids[:end], [kind] * end, levels.levels[:end]))
+            else:
+                # Níveis >= preço: sufixo da lista
+                start = bisect_left(levels.levels, price)
+                if start < len(levels):
+                    count = len(levels) - start
+                    triggers.extend(map(Trigger, levels.ids[start:], [kind] * count, levels.levels[start:]))
+        triggers.sort()
+        return triggers
+
+    def bounds(self) -> Tuple[float, float]:
+        """(maior nível disparado na queda, menor nível disparado na alta)
+
+        Preços estritamente entre os dois não cruzam nenhum nível.
+        """
+        falling = max((levels.levels[-1] for levels, _, rising in self._scans if not rising and levels),
+                      default=-math.inf)
+        rising = min((levels.levels[0] for levels, _, rising in self._scans if rising and levels),
+                     default=math.inf)
+        return falling, rising
+
+class TriggerEngine:
+    """Fecha pelo TradeService as operações cujo stop ou alvo foi cruzado
+
+    O fechamento usa o próprio nível como preço (como no backtest) e todos
+    os disparos de um preço são gravados em uma única transação
+    (TradeService.close_trades).
+    """
+
+    def __init__(self, trade_service, trades: Optional[Iterable[TradeResult]] = None):
+        from core.logging import logger
+
+        self.trade_service = trade_service
+        self.index = TriggerIndex()
+        rejected = self.index.add_many(trades if trades is not None else trade_service.get_open_trades())
+        for _, reason in rejected:
+            logger.warning(f"{reason}; operação ignorada pelos gatilhos")
+
+    def on_price(self, price: float) -> List[TradeResult]:
+        """Aplica um preço e retorna as operações fechadas"""
+        triggers = self.index.crossed(price)
+        if not triggers:
+            return []
+        closed = self.trade_service.close_trades([(trigger.trade_id, trigger.level) for trigger in triggers])
+        for trigger in triggers:
+            self.index.remove(trigger.trade_id)
+        return closed
+
+    def on_prices(self, prices: np.ndarray) -> List[TradeResult]:
+        """Aplica um bloco de preços em ordem; só os ticks fora da faixa sem disparos são examinados"""
+        falling, rising = self.index.bounds()
+        # Fechamentos só estreitam os níveis restantes, então os candidatos continuam válidos
+        candidates = np.flatnonzero((prices <= falling) | (prices >= rising))
+        closed = []
+        for price in prices[candidates].tolist():
+            closed.extend(self.on_price(price))
+        return closed
@@ -1,89 +1,65 @@
+import csv
 import json
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
 from models.account import TradePlan
-from models.trade import TradeResult, AccountOperation, TradeType, AccountOperationType
+from models.history import TradeHistory, OperationHistory
+from utils.plan_checkpoint import PlanStateStore
+
+# Arquivo do plano (o log de eventos e o checkpoint ficam ao lado)
+TRADES_FILE = 'trades.json'
+
+def _reset_plan(trade_plan: TradePlan):
+    trade_plan.current_balance = trade_plan.initial_balance
+    trade_plan.completed_trades = 0
+    trade_plan.max_drawdown = 0
+    trade_plan.max_balance = trade_plan.initial_balance
+    trade_plan.trade_history = TradeHistory()
+    trade_plan.account_operations = OperationHistory()
 
 def load_trades(trade_plan: TradePlan):
+    store = PlanStateStore(TRADES_FILE)
+    if store.exists():
+        store.load(trade_plan)
+        return
+    # Formato antigo (um único JSON): convertido para log + checkpoint na primeira carga
     try:
-        with open('trades.json', 'r') as file:
+        with open(TRADES_FILE, 'r') as file:
             try:
-                data = json.load(file)
-                trade_plan.current_balance = data['current_balance']
-                trade_plan.completed_trades = data['completed_trades']
-                trade_plan.max_drawdown = data['max_drawdown']
-                trade_plan.max_balance = data['max_balance']
-                trade_plan.leverage = data.get('leverage', 2)
-                trade_plan.position_size_percent = data.get('position_size_percent', 10)
-                trade_plan.trade_history = [
-                    TradeResult(
-                        type=TradeType(trade['type']),
-                        entry=trade['entry'],
-                        target=trade['target'],
-                        stop=trade['stop'],
-                        result=trade['result'],
-                        balance_before=trade['balance_before'],
-                        balance_after=trade['balance_after'],
-                        timestamp=trade['timestamp'],
-                        leverage=trade.get('leverage', 2),
-                        position_size_percent=trade.get('position_size_percent', 10)
-                    )
-                    for trade in data['trade_history']
-                ]
-                trade_plan.account_operations = [
-                    AccountOperation(
-                        type=AccountOperationType(operation['type']),
-                        amount=operation['amount'],
-                        timestamp=operation['timestamp']
-                    )
-                    for operation in data.get('account_operations', [])
-                ]
+                store.import_legacy(json.load(file), trade_plan)
             except json.JSONDecodeError:
                 # Arquivo está vazio ou corrompido, começar do zero
-                trade_plan.current_balance = trade_plan.initial_balance
-                trade_plan.completed_trades = 0
-                trade_plan.max_drawdown = 0
-                trade_plan.max_balance = trade_plan.initial_balance
-                trade_plan.trade_history = []
-                trade_plan.account_operations = []
+                _reset_plan(trade_plan)
     except FileNotFoundError:
         # Arquivo não existe, começar do zero
-        trade_plan.current_balance = trade_plan.initial_balance
-        trade_plan.completed_trades = 0
-        trade_plan.max_drawdown = 0
-        trade_plan.max_balance = trade_plan.initial_balance
-        trade_plan.trade_history = []
-        trade_plan.account_operations = []
+        _reset_plan(trade_plan)
 
 def save_trades(trade_plan: TradePlan):
-    data = {
-        'current_balance': trade_plan.current_balance,
-        'completed_trades': trade_plan.completed_trades,
-        'max_drawdown': trade_plan.max_drawdown,
-        'max_balance': trade_plan.max_balance,
-        'leverage': trade_plan.leverage,
-        'position_size_percent': trade_plan.position_size_percent,
-        'trade_history': [
-            {
-                'type': trade.type.value,
-                'entry': trade.entry,
-                'target': trade.target,
-                'stop': trade.stop,
-                'result': trade.result,
-                'balance_before': trade.balance_before,
-                'balance_after': trade.balance_after,
-                'timestamp': trade.timestamp,
-                'leverage': trade.leverage,
-                'position_size_percent': trade.position_size_percent
-            }
-            for trade in trade_plan.trade_history
-        ],
-        'account_operations': [
-            {
-                'type': operation.type.value,
-                'amount': operation.amount,
-                'timestamp': operation.timestamp
-            }
-            for operation in trade_plan.account_operations
-        ]
-    }
-    with open('trades.json', 'w') as file:
-        json.dump(data, file, indent=2)
\ No newline at end of file
+    PlanStateStore(TRADES_FILE).save(trade_plan)
+
+def iter_rows(path: str, on_error: Optional[Callable[[int, str, str], None]] = None) -> Iterator[Tuple[int, dict]]:
+    """Lê registros de um arquivo CSV ou JSONL em streaming, com o número da linha
+
+    Linhas JSONL inválidas vão para on_error(número da linha, linha, motivo)
+    e a leitura continua; sem on_error, levantam ValueError.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if path.suffix.lower() == '.csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                # Células vazias são tratadas como campos ausentes
+                yield reader.line_num, {k: v for k, v in row.items() if v not in ('', None)}
+        else:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    reason = f"JSON inválido: {e.msg} (coluna {e.colno})"
+                    if on_error is None:
+                        raise ValueError(f"Linha {line_number}: {reason}") from e
+                    on_error(line_number, line.rstrip('\r\n'), reason)
+                    continue
+                yield line_number, row
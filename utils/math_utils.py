@@ -1,5 +1,18 @@
-from typing import Union
-from pydantic import BaseModel, ValidationError, validator, Field
+from typing import TYPE_CHECKING, Iterable, Union
+
+# NumPy só é importado pelas versões em lote, mantendo leve a importação do módulo
+if TYPE_CHECKING:
+    import numpy as np
+
+# Os kernels usam apenas aritmética, então servem tanto para escalares quanto
+# para arrays NumPy e garantem a mesma semântica nas versões em lote.
+
+def _position_size_kernel(risk_amount, entry_price, stop_price, leverage):
+    return (risk_amount / abs(entry_price - stop_price)) * leverage
+
+def _pnl_kernel(entry, exit_price, position_size, is_short):
+    # Direção: +1 para long, -1 para short
+    return (exit_price - entry) * (1 - 2 * is_short) * position_size
 
 def calculate_position_size(
     risk_amount: float, 
@@ -11,7 +24,7 @@ def calculate_position_size(
     risk_per_unit = abs(entry_price - stop_price)
     if risk_per_unit <= 0:
         raise ValueError("Preço de entrada e stop-loss não podem ser iguais")
-    return (risk_amount / risk_per_unit) * leverage
+    return _position_size_kernel(risk_amount, entry_price, stop_price, leverage)
 
 def calculate_pnl(
     entry: float,
@@ -23,29 +36,42 @@ def calculate_pnl(
     if trade_type not in ['long', 'short']:
         raise ValueError("Tipo de operação inválido. Use 'long' ou 'short'")
         
-    price_diff = exit_price - entry
-    if trade_type == 'short':
-        price_diff = -price_diff
-        
-    return price_diff * position_size
-
-class TradeValidationSchema(BaseModel):
-    entry_price: float = Field(..., gt=0)
-    stop_price: float = Field(..., gt=0)
-    target_price: float = Field(..., gt=0)
-    leverage: float = Field(..., ge=1, le=100)
-    position_size_percent: float = Field(..., ge=1, le=100)
+    return _pnl_kernel(entry, exit_price, position_size, int(trade_type == 'short'))
+
+def side_vector(trade_types: Iterable) -> 'np.ndarray':
+    """Converte tipos ('long'/'short' ou TradeType) em um vetor booleano (True = short)"""
+    import numpy as np
     
-    @validator('stop_price')
-    def validate_stop_price(cls, v, values):
-        entry = values.get('entry_price')
-        if entry and v == entry:
-            raise ValueError('Preço de stop não pode ser igual ao de entrada')
-        return v
+    values = [getattr(t, 'value', t) for t in trade_types]
+    if any(v not in ('long', 'short') for v in values):
+        raise ValueError("Tipo de operação inválido. Use 'long' ou 'short'")
+    return np.array([v == 'short' for v in values], dtype=bool)
+
+def calculate_position_size_batch(risk_amounts, entry_prices, stop_prices, leverages) -> 'np.ndarray':
+    """Versão vetorizada de calculate_position_size"""
+    import numpy as np
+    
+    risk_amounts = np.asarray(risk_amounts, dtype='float64')
+    entry_prices = np.asarray(entry_prices, dtype='float64')
+    stop_prices = np.asarray(stop_prices, dtype='float64')
+    if np.any(np.abs(entry_prices - stop_prices) <= 0):
+        raise ValueError("Preço de entrada e stop-loss não podem ser iguais")
+    return _position_size_kernel(risk_amounts, entry_prices, stop_prices, np.asarray(leverages, dtype='float64'))
+
+def calculate_pnl_batch(entries, exit_prices, position_sizes, sides) -> 'np.ndarray':
+    """Versão vetorizada de calculate_pnl
+
+    sides é um vetor booleano ou inteiro (0/1) em que True/1 indica short.
+    """
+    import numpy as np
     
-    @validator('target_price')
-    def validate_target_price(cls, v, values):
-        entry = values.get('entry_price')
-        if entry and v == entry:
-            raise ValueError('Preço alvo não pode ser igual ao de entrada')
-        return v
+    sides = np.asarray(sides)
+    if sides.dtype != bool:
+        if not np.isin(sides, (0, 1)).all():
+            raise ValueError("Tipo de operação inválido. Use 0/False (long) ou 1/True (short)")
+    return _pnl_kernel(
+        np.asarray(entries, dtype='float64'),
+        np.asarray(exit_prices, dtype='float64'),
+        np.asarray(position_sizes, dtype='float64'),
+        sides.astype(np.int8)
+    )
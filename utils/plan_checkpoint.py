@@ -0,0 +1,289 @@
+import json
+import os
+from collections.abc import MutableSequence
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+from models.account import TradePlan
+from models.history import TradeHistory, OperationHistory
+from models.trade import TradeResult, AccountOperation, AccountOperationType, enum_member
+
+# Campos do TradePlan guardados no checkpoint
+STATE_FIELDS = ('initial_balance', 'current_balance', 'completed_trades', 'max_drawdown', 'max_balance', 'leverage', 'position_size_percent')
+
+# Eventos acumulados após o checkpoint antes de gravar um novo
+CHECKPOINT_INTERVAL = 500
+
+def encode_operation(operation: AccountOperation) -> dict:
+    return {'type': enum_member(AccountOperationType, operation.type).value, 'amount': operation.amount, 'timestamp': operation.timestamp}
+
+def decode_operation(data: dict) -> AccountOperation:
+    return AccountOperation(
+        type=enum_member(AccountOperationType, data['type']),
+        amount=data['amount'],
+        timestamp=data['timestamp']
+    )
+
+class LazyEventList(MutableSequence):
+    """Sequência carregada do log de eventos apenas no primeiro acesso
+
+    append() não força a leitura: os itens novos ficam em pending até a
+    próxima gravação, então o fluxo comum (carregar, operar, salvar) não
+    decodifica o histórico inteiro.
+    """
+
+    def __init__(self, loader: Callable[[int], MutableSequence], count: int):
+        self._loader = loader
+        self._count = count
+        self._items: Optional[MutableSequence] = None
+        self.pending: List = []
+        # Itens já gravados no log
+        self._saved = count
+
+    @property
+    def loaded(self) -> bool:
+        return self._items is not None
+
+    def _materialize(self) -> MutableSequence:
+        if self._items is None:
+            self._items = self._loader(self._count)
+            self._items.extend(self.pending)
+            self.pending = []
+        return self._items
+
+    def __getattr__(self, name):
+        # Colunas e agregados do contêiner carregado (ex.: TradeHistory.column)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._materialize(), name)
+
+    @property
+    def edited(self) -> bool:
+        """Itens já gravados foram alterados, removidos ou inseridos (só possível depois da carga)"""
+        return self._items is not None and getattr(self._items, 'edited', False)
+
+    def mark_saved(self) -> None:
+        """Os itens pendentes passam a fazer parte do log"""
+        if self._items is None:
+            self._count += len(self.pending)
+            self.pending = []
+        elif hasattr(self._items, 'edited'):
+            self._items.edited = False
+        self._saved = len(self)
+
+    def truncate(self, length: int) -> None:
+        """Remove os itens a partir de length (ex.: desfazer um append)
+
+        Itens ainda não gravados saem de pending sem carregar o log, e a
+        remoção deles não marca o histórico como editado.
+        """
+        if self._items is None and length >= self._count:
+            del self.pending[length - self._count:]
+            return
+        items = self._materialize()
+        edited = self.edited
+        del items[length:]
+        if length >= self._saved and hasattr(items, 'edited'):
+            items.edited = edited
+
+    def __len__(self) -> int:
+        if self._items is None:
+            return self._count + len(self.pending)
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __setitem__(self, index, value):
+        self._materialize()[index] = value
+
+    def __delitem__(self, index):
+        del self._materialize()[index]
+
+    def insert(self, index: int, value) -> None:
+        self._materialize().insert(index, value)
+
+    def append(self, value) -> None:
+        if self._items is None:
+            self.pending.append(value)
+        else:
+            self._items.append(value)
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f'LazyEventList({len(self)} itens)'
+
+class PlanStateStore:
+    """Persistência do TradePlan em log de eventos (JSONL) com checkpoints
+
+    Cada gravação acrescenta ao log os trades/operações novos e um registro de
+    estado. A cada CHECKPOINT_INTERVAL eventos, o estado derivado e a posição
+    do log são gravados em <arquivo>.checkpoint.json; a carga lê o checkpoint
+    e reaplica somente os eventos posteriores. O histórico completo só é
+    decodificado quando acessado.
+    """
+
+    def __init__(self, path: str, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        self.path = Path(path)
+        self.events_path = self.path.with_name(self.path.name + '.events.jsonl')
+        self.checkpoint_path = self.path.with_name(self.path.name + '.checkpoint.json')
+        self.checkpoint_interval = checkpoint_interval
+
+    def exists(self) -> bool:
+        return self.events_path.exists() or self.checkpoint_path.exists()
+
+    def _read_checkpoint(self) -> dict:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'state': {}, 'trades': 0, 'operations': 0, 'offset': 0}
+
+    def _iter_events(self, offset: int = 0) -> Iterator[Tuple[int, dict]]:
+        """Itera sobre (posição final, evento) a partir da posição informada
+
+        Uma última linha incompleta (gravação interrompida) é ignorada.
+        """
+        try:
+            f = open(self.events_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    return
+                offset += len(line)
+                yield offset, json.loads(line)
+
+    def _scan(self) -> dict:
+        """Checkpoint + eventos posteriores: estado atual, contagens e fim válido do log"""
+        checkpoint = self._read_checkpoint()
+        scan = {
+            'state': dict(checkpoint['state']),
+            'trades': checkpoint['trades'],
+            'operations': checkpoint['operations'],
+            'offset': checkpoint['offset'],
+            'since_checkpoint': 0,
+        }
+        for offset, event in self._iter_events(checkpoint['offset']):
+            kind = event['kind']
+            if kind == 'trade':
+                scan['trades'] += 1
+            elif kind == 'operation':
+                scan['operations'] += 1
+            else:
+                scan['state'].update(event['data'])
+            scan['offset'] = offset
+            scan['since_checkpoint'] += 1
+        return scan
+
+    def _load_events(self, kind: str, decode: Callable[[dict], object], limit: int) -> List:
+        items = []
+        for _, event in self._iter_events():
+            if len(items) >= limit:
+                break
+            if event['kind'] == kind:
+                items.append(decode(event['data']))
+        return items
+
+    def _load_trades(self, count: int) -> TradeHistory:
+        return TradeHistory(self._load_events('trade', TradeResult.from_record, count))
+
+    def _load_operations(self, count: int) -> OperationHistory:
+        return OperationHistory(self._load_events('operation', decode_operation, count))
+
+    def load(self, trade_plan: TradePlan) -> TradePlan:
+        """Aplica o estado salvo ao TradePlan (custo proporcional aos eventos após o checkpoint)"""
+        scan = self._scan()
+        for name, value in scan['state'].items():
+            setattr(trade_plan, name, value)
+        trade_plan.trade_history = LazyEventList(self._load_trades, scan['trades'])
+        trade_plan.account_operations = LazyEventList(self._load_operations, scan['operations'])
+        return trade_plan
+
+    def save(self, trade_plan: TradePlan) -> None:
+        """Acrescenta ao log os eventos novos e o estado atual; grava checkpoint quando devido"""
+        scan = self._scan()
+        new_trades = self._new_items(trade_plan.trade_history, scan['trades'])
+        new_operations = self._new_items(trade_plan.account_operations, scan['operations'])
+        if new_trades is None or new_operations is None:
+            # O histórico foi reescrito (itens alterados ou removidos): recomeça o log
+            self.rewrite(trade_plan)
+            return
+
+        lines = [{'kind': 'trade', 'data': trade.to_record()} for trade in new_trades]
+        lines += [{'kind': 'operation', 'data': encode_operation(operation)} for operation in new_operations]
+        lines.append({'kind': 'state', 'data': {name: getattr(trade_plan, name) for name in STATE_FIELDS}})
+        payload = ''.join(json.dumps(line, default=str) + '\n' for line in lines).encode('utf-8')
+        with open(self.events_path, 'ab') as f:
+            # Descarta uma linha incompleta deixada por uma gravação interrompida
+            f.truncate(scan['offset'])
+            f.write(payload)
+        self._mark_saved(trade_plan.trade_history)
+        self._mark_saved(trade_plan.account_operations)
+
+        if scan['since_checkpoint'] + len(lines) >= self.checkpoint_interval:
+            self._write_checkpoint(
+                state={name: getattr(trade_plan, name) for name in STATE_FIELDS},
+                trades=scan['trades'] + len(new_trades),
+                operations=scan['operations'] + len(new_operations),
+                offset=scan['offset'] + len(payload)
+            )
+
+    def rewrite(self, trade_plan: TradePlan) -> None:
+        """Regrava o log inteiro a partir do TradePlan e cria um checkpoint no final"""
+        lines = [{'kind': 'trade', 'data': trade.to_record()} for trade in trade_plan.trade_history]
+        lines += [{'kind': 'operation', 'data': encode_operation(operation)} for operation in trade_plan.account_operations]
+        lines.append({'kind': 'state', 'data': {name: getattr(trade_plan, name) for name in STATE_FIELDS}})
+        payload = ''.join(json.dumps(line, default=str) + '\n' for line in lines).encode('utf-8')
+        tmp_path = self.events_path.with_name(self.events_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        # Checkpoint antigo aponta para posições do log anterior
+        self.checkpoint_path.unlink(missing_ok=True)
+        os.replace(tmp_path, self.events_path)
+        self._write_checkpoint(
+            state={name: getattr(trade_plan, name) for name in STATE_FIELDS},
+            trades=len(trade_plan.trade_history),
+            operations=len(trade_plan.account_operations),
+            offset=len(payload)
+        )
+        self._mark_saved(trade_plan.trade_history)
+        self._mark_saved(trade_plan.account_operations)
+
+    def _write_checkpoint(self, state: dict, trades: int, operations: int, offset: int) -> None:
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'state': state, 'trades': trades, 'operations': operations, 'offset': offset}, f, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _new_items(items, saved: int) -> Optional[List]:
+        """Itens acrescentados desde a última gravação (None se itens já gravados mudaram)"""
+        if isinstance(items, LazyEventList) and not items.loaded:
+            return list(items.pending)
+        if len(items) < saved or getattr(items, 'edited', False):
+            return None
+        return list(items[saved:])
+
+    @staticmethod
+    def _mark_saved(items) -> None:
+        if isinstance(items, LazyEventList):
+            items.mark_saved()
+        elif hasattr(items, 'edited'):
+            items.edited = False
+
+    def import_legacy(self, data: dict, trade_plan: TradePlan) -> TradePlan:
+        """Converte o formato antigo (um único JSON com o histórico) para o log com checkpoint"""
+        for name in STATE_FIELDS:
+            if name in data:
+                setattr(trade_plan, name, data[name])
+        trade_plan.trade_history = TradeHistory(TradeResult.from_record(trade) for trade in data.get('trade_history', []))
+        trade_plan.account_operations = OperationHistory(decode_operation(operation) for operation in data.get('account_operations', []))
+        self.rewrite(trade_plan)
+        return trade_plan
@@ -1,16 +1,34 @@
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 from services.trade_service import TradeService
 from models.account import TradePlan
 from repositories.file_repository import FileRepository, FileUnitOfWork
+from core.repository import CachedRepository
+from config.settings import settings
+from views.trade_table import VirtualTradeTable
+from views.worker import ServiceWorker
+
+# Intervalo de leitura da marcação a mercado do feed de preços
+PRICE_POLL_INTERVAL_MS = 250
 
 class TradeApp:
     def __init__(self, root, trade_plan):
         self.root = root
         repository = FileRepository('trades.json')
         unit_of_work = FileUnitOfWork(repository)
+        if settings.repository_cache_size > 0:
+            repository = CachedRepository(repository, settings.repository_cache_size)
         self.trade_service = TradeService(trade_plan, repository, unit_of_work)
         self.setup_ui()
+        # Todo acesso ao TradeService passa pela thread do worker
+        self.worker = ServiceWorker(root, on_busy=self.set_busy)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.price_feed = None
+        self.closing = False
+        if settings.price_feed_source:
+            self.start_price_feed(settings.price_feed_source)
+        self.schedule_refresh()
         
     def setup_ui(self):
         self.root.title("Plano de Trade")
@@ -35,6 +53,16 @@ class TradeApp:
         self.notebook.add(self.settings_frame, text="Configurações")
         self.setup_settings_tab()
         
+        # Barra de status com indicador de ocupado
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(fill='x', side='bottom')
+        self.status_label = ttk.Label(status_frame, text="")
+        self.status_label.pack(side='left', padx=5)
+        self.mark_label = ttk.Label(status_frame, text="")
+        self.mark_label.pack(side='left', padx=15)
+        self.busy_bar = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.busy_bar.pack(side='right', padx=5, pady=2)
+        
     def setup_new_trade_tab(self):
         # Tipo de Operação
         ttk.Label(self.new_trade_frame, text="Tipo de Operação:").grid(row=0, column=0, padx=5, pady=5)
@@ -70,15 +98,9 @@ class TradeApp:
         ttk.Button(self.new_trade_frame, text="Confirmar Operação", command=self.create_trade).grid(row=6, column=0, columnspan=2, pady=10)
         
     def setup_open_trades_tab(self):
-        # Treeview para mostrar operações abertas
-        columns = ("#", "Tipo", "Entrada", "Alvo", "Stop", "Ganho Potencial", "Perda Potencial", "Risco/Recompensa")
-        self.trades_tree = ttk.Treeview(self.open_trades_frame, columns=columns, show="headings")
-        
-        for col in columns:
-            self.trades_tree.heading(col, text=col)
-            self.trades_tree.column(col, width=100)
-            
-        self.trades_tree.pack(fill='both', expand=True)
+        # Tabela virtual: só as linhas visíveis existem no Treeview
+        self.trades_table = VirtualTradeTable(self.open_trades_frame)
+        self.trades_table.pack(fill='both', expand=True)
         
         # Botões de ação
         button_frame = ttk.Frame(self.open_trades_frame)
@@ -109,6 +131,54 @@ class TradeApp:
         
         ttk.Button(self.settings_frame, text="Salvar Configurações", command=self.save_settings).grid(row=3, column=0, columnspan=2, pady=10)
         
+    def set_busy(self, busy):
+        if busy:
+            self.status_label.config(text="Processando...")
+            self.busy_bar.start(10)
+        else:
+            self.status_label.config(text="")
+            self.busy_bar.stop()
+        
+    def show_error(self, prefix):
+        # Callback de erro do worker (executado na thread do Tk)
+        def on_error(error):
+            messagebox.showerror("Erro", f"{prefix}: {str(error)}")
+        return on_error
+        
+    def on_close(self):
+        # Conclui as gravações pendentes antes de fechar a janela
+        self.closing = True
+        self.worker.stop()
+        self.root.destroy()
+        
+    def start_price_feed(self, source):
+        # O feed roda em thread própria; a tela só lê a última marcação (ver poll_price_feed)
+        from services.price_feed import PriceFeed, open_tick_source
+        
+        instrument = settings.price_feed_instrument
+        self.price_feed = PriceFeed(open_tick_source(source, instrument), [], instrument)
+        self.shown_mark = None
+        
+        def run():
+            try:
+                self.price_feed.run(stop=lambda: self.closing)
+            except Exception as e:
+                self.root.after(0, lambda: self.mark_label.config(text=f"Feed de preços: {str(e)}"))
+                
+        threading.Thread(target=run, name='price-feed', daemon=True).start()
+        self.poll_price_feed()
+        
+    def poll_price_feed(self):
+        # Exibe só a marcação mais recente; blocos intermediários são descartados
+        mark = self.price_feed.snapshot
+        if mark is not None and mark is not self.shown_mark:
+            self.shown_mark = mark
+            self.trades_table.update_marks(mark.by_trade())
+            self.mark_label.config(text=f"PnL não realizado: ${mark.total_unrealized:.2f} | "
+                                        f"Exposição líquida: {mark.net_exposure:.2f}")
+        if not self.closing:
+            self.root.after(PRICE_POLL_INTERVAL_MS, self.poll_price_feed)
+        
     def create_trade(self):
         try:
             # Coleta os dados do formulário
@@ -120,68 +190,79 @@ class TradeApp:
                 'target': float(self.target_price.get()),
                 'stop': float(self.stop_price.get())
             }
+        except ValueError as e:
+            messagebox.showerror("Erro", f"Entrada inválida: {str(e)}")
+            return
             
-            # Mostra detalhes da operação e pede confirmação
-            confirm = messagebox.askyesno("Confirmar", "Deseja confirmar a operação?")
-            if confirm:
-                self.trade_service.create_trade(trade_data)
-                messagebox.showinfo("Sucesso", "Operação criada com sucesso!")
+        # Mostra detalhes da operação e pede confirmação
+        if not messagebox.askyesno("Confirmar", "Deseja confirmar a operação?"):
+            return
+        
+        def on_done(trade):
+            messagebox.showinfo("Sucesso", "Operação criada com sucesso!")
             self.update_open_trades()
             
-        except ValueError as e:
-            messagebox.showerror("Erro", f"Entrada inválida: {str(e)}")
+        self.worker.submit(self.trade_service.create_trade, trade_data,
+                           on_done=on_done, on_error=self.show_error("Entrada inválida"))
             
     def update_open_trades(self):
-        # Atualiza a lista de operações abertas
-        self.trades_tree.delete(*self.trades_tree.get_children())
-        open_trades = self.trade_service.get_open_trades()
-        
-        for i, trade in enumerate(open_trades, 1):
-            self.trades_tree.insert("", "end", values=(
-                i,
-                trade.type.value.upper(),
-                trade.entry,
-                trade.target,
-                trade.stop,
-                f"${trade.gain:.2f}",
-                f"${trade.loss:.2f}",
-                f"{trade.risk_reward:.2f}:1"
-            ))
+        # Atualizações seguidas são agrupadas; o diff por ID é aplicado na thread do Tk
+        self.worker.submit(self.trade_service.get_open_trades, on_done=self.show_open_trades,
+                           on_error=self.show_error("Erro ao atualizar operações"), key='refresh')
+        
+    def show_open_trades(self, open_trades):
+        self.trades_table.update(open_trades)
+        if self.price_feed is not None:
+            self.price_feed.set_trades(open_trades)
+        
+    def schedule_refresh(self):
+        # Atualização periódica da aba de operações abertas
+        if settings.gui_refresh_interval_ms <= 0:
+            return
+        if not self.worker.busy:
+            self.update_open_trades()
+        self.root.after(settings.gui_refresh_interval_ms, self.schedule_refresh)
             
     def close_trade(self):
-        selected = self.trades_tree.selection()
-        if not selected:
+        # O iid da linha é o ID do trade
+        trade_id = self.trades_table.selected_id()
+        if trade_id is None:
             messagebox.showwarning("Aviso", "Selecione uma operação para fechar")
             return
-            
-        # Obtém o índice da operação selecionada
-        item = self.trades_tree.item(selected[0])
-        trade_index = int(item['values'][0]) - 1
         
+        # Solicita o preço de fechamento (askfloat já recusa valores não numéricos)
+        close_price = simpledialog.askfloat("Fechar Operação", "Digite o preço de fechamento:",
+                                            parent=self.root)
+        if close_price is None:
+            return
+        
+        # Resultado opcional: em branco, é calculado a partir do preço de fechamento
+        answer = simpledialog.askstring("Fechar Operação",
+            "Digite o resultado da operação (positivo para lucro, negativo para prejuízo)\n"
+            "ou deixe em branco para calcular pelo preço de fechamento:", parent=self.root)
+        if answer is None:
+            return
         try:
-            # Solicita o resultado da operação
-            result = float(messagebox.askstring("Fechar Operação",
-                "Digite o resultado da operação (positivo para lucro, negativo para prejuízo):"))
-            
-            # Fecha a operação no serviço
-            self.trade_service.close_trade(trade_index, result)
-            
+            result = float(answer) if answer.strip() else None
+        except ValueError:
+            messagebox.showerror("Erro", f"Valor inválido para o resultado: {answer}")
+            return
+        
+        def on_done(trade):
             # Atualiza a lista de operações
             self.update_open_trades()
-            messagebox.showinfo("Sucesso", "Operação fechada com sucesso!")
+            messagebox.showinfo("Sucesso", f"Operação fechada com sucesso! Resultado: {trade.result:.2f}")
             
-        except ValueError:
-            messagebox.showerror("Erro", "Valor inválido para o resultado")
+        # Fecha a operação no serviço
+        self.worker.submit(self.trade_service.close_trade, trade_id, close_price, result,
+                           on_done=on_done, on_error=self.show_error("Erro ao fechar a operação"))
         
     def edit_trade(self):
-        selected = self.trades_tree.selection()
-        if not selected:
+        # O iid da linha é o ID do trade
+        trade_id = self.trades_table.selected_id()
+        if trade_id is None:
             messagebox.showwarning("Aviso", "Selecione uma operação para editar")
             return
-            
-        # Obtém o índice da operação selecionada
-        item = self.trades_tree.item(selected[0])
-        trade_index = int(item['values'][0]) - 1
         
         # Cria janela de edição
         edit_window = tk.Toplevel(self.root)
@@ -201,47 +282,51 @@ class TradeApp:
         stop_entry.grid(row=2, column=1, padx=5, pady=5)
         
         def save_changes():
-            try:
-                # Atualiza os campos que foram modificados
-                if entry_entry.get():
-                    self.trade_service.edit_trade(trade_index, 'entry', entry_entry.get())
-                if target_entry.get():
-                    self.trade_service.edit_trade(trade_index, 'target', target_entry.get())
-                if stop_entry.get():
-                    self.trade_service.edit_trade(trade_index, 'stop', stop_entry.get())
+            # Campos que foram modificados (lidos aqui, na thread do Tk)
+            changes = [(field, widget.get()) for field, widget in
+                       (('entry', entry_entry), ('target', target_entry), ('stop', stop_entry)) if widget.get()]
+            
+            def apply_changes():
+                for field, value in changes:
+                    self.trade_service.edit_trade(trade_id, field, value)
                     
+            def on_done(_):
                 self.update_open_trades()
                 edit_window.destroy()
                 messagebox.showinfo("Sucesso", "Operação atualizada com sucesso!")
                 
-            except ValueError as e:
-                messagebox.showerror("Erro", f"Erro ao editar operação: {str(e)}")
+            self.worker.submit(apply_changes, on_done=on_done, on_error=self.show_error("Erro ao editar operação"))
         
         ttk.Button(edit_window, text="Salvar", command=save_changes).grid(row=3, column=0, columnspan=2, pady=10)
 
     def save_settings(self):
         try:
-            # Atualiza saldo
+            # Valida os valores do formulário
             new_balance = float(self.initial_balance.get())
-            self.trade_service.trade_plan.current_balance = new_balance
             
-            # Atualiza risco por operação
             risk_per_trade = float(self.risk_per_trade.get())
             if not 0 < risk_per_trade <= 100:
                 raise ValueError("Risco por operação deve estar entre 0% e 100%")
-            self.trade_service.trade_plan.risk_per_trade = risk_per_trade
             
-            # Atualiza alavancagem padrão
             leverage = int(self.default_leverage.get())
             if not 1 <= leverage <= 10:
                 raise ValueError("Alavancagem deve estar entre 1x e 10x")
-            self.trade_service.trade_plan.leverage = leverage
-            
-            self.trade_service.trade_repository.save_trade_plan(self.trade_service.trade_plan)
-            messagebox.showinfo("Sucesso", "Configurações salvas com sucesso!")
             
         except ValueError as e:
             messagebox.showerror("Erro", f"Erro ao salvar configurações: {str(e)}")
+            return
+        
+        def apply_settings():
+            # O TradePlan é alterado e salvo na thread do worker, junto com as demais operações
+            trade_plan = self.trade_service.trade_plan
+            trade_plan.current_balance = new_balance
+            trade_plan.risk_per_trade = risk_per_trade
+            trade_plan.leverage = leverage
+            self.trade_service.trade_repository.save_trade_plan(trade_plan)
+            
+        self.worker.submit(apply_settings,
+                           on_done=lambda _: messagebox.showinfo("Sucesso", "Configurações salvas com sucesso!"),
+                           on_error=self.show_error("Erro ao salvar configurações"))
 
 def start_gui(trade_plan):
     root = tk.Tk()
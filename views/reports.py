@@ -1,9 +1,61 @@
 from models.account import TradePlan
+from services.analytics import PerformanceReport, performance_from_trades
+from services.simulation import SimulationResult
+from services.price_feed import MarkToMarket
 
 def show_final_report(trade_plan: TradePlan):
+    # Recalcula saldo máximo e drawdown a partir do histórico
+    report = performance_from_trades(trade_plan.trade_history, trade_plan.initial_balance)
+    trade_plan.max_balance = max(trade_plan.max_balance, report.max_balance)
+    trade_plan.max_drawdown = report.max_drawdown_percent
+
     print("\n--- Relatório Final ---")
     print(f"Saldo inicial: ${trade_plan.initial_balance:.2f}")
     print(f"Saldo final: ${trade_plan.current_balance:.2f}")
     print(f"Total de operações realizadas: {trade_plan.completed_trades}")
     print(f"Drawdown máximo: {trade_plan.max_drawdown:.2f}%")
-    print("-----------------------\n")
\ No newline at end of file
+    print(f"Taxa de acerto: {report.win_rate:.2f}%")
+    print(f"Fator de lucro: {report.profit_factor:.2f}")
+    print("-----------------------\n")
+
+def show_performance_report(report: PerformanceReport):
+    print("\n--- Relatório de Desempenho ---")
+    print(f"Saldo inicial: ${report.initial_balance:.2f}")
+    print(f"Saldo final: ${report.final_balance:.2f}")
+    print(f"Saldo máximo: ${report.max_balance:.2f}")
+    print(f"Operações fechadas: {report.total_trades} ({report.wins} ganhos / {report.losses} perdas)")
+    print(f"Taxa de acerto: {report.win_rate:.2f}%")
+    print(f"Lucro bruto: ${report.gross_profit:.2f}")
+    print(f"Prejuízo bruto: ${report.gross_loss:.2f}")
+    print(f"Fator de lucro: {report.profit_factor:.2f}")
+    print(f"Expectativa por operação: ${report.expectancy:.2f}")
+    print(f"Múltiplo de R médio: {report.average_r_multiple:.2f}R")
+    print(f"Drawdown máximo: ${report.max_drawdown:.2f} ({report.max_drawdown_percent:.2f}%)")
+    print(f"Maior sequência de ganhos: {report.max_win_streak}")
+    print(f"Maior sequência de perdas: {report.max_loss_streak}")
+    print(f"Sequência atual: {report.current_streak:+d}")
+    print("-------------------------------\n")
+
+def show_simulation_report(result: SimulationResult):
+    print("\n--- Simulação de Monte Carlo ---")
+    print(f"Caminhos: {result.paths} x {result.trades_per_path} operações")
+    print(f"Probabilidade de ruína: {result.ruin_probability:.2f}%")
+    print("Percentil | Drawdown máximo | Saldo final")
+    for percentile, drawdown in result.max_drawdown_percentiles.items():
+        balance = result.final_balance_percentiles[percentile]
+        print(f"P{percentile:<8} | {drawdown:14.2f}% | ${balance:.2f}")
+    print(f"Tempo: {result.elapsed:.3f}s ({result.paths_per_second:,.0f} caminhos/s com {result.workers} processo(s))")
+    print("--------------------------------\n")
+
+def show_mark_to_market(mark: MarkToMarket, limit: int = 20):
+    print("\n--- Marcação a Mercado ---")
+    print(f"Ticks processados: {mark.ticks}")
+    print(f"Operações com preço: {mark.priced} de {len(mark.trade_ids)}")
+    print("#        | Preço atual  | PnL não realizado")
+    for trade_id, (price, pnl) in list(mark.by_trade().items())[:limit]:
+        print(f"{trade_id:<8} | {price:>12.4f} | ${pnl:.2f}")
+    if mark.priced > limit:
+        print(f"... e mais {mark.priced - limit} operações")
+    print(f"PnL não realizado total: ${mark.total_unrealized:.2f}")
+    print(f"Exposição líquida: {mark.net_exposure:.2f} | bruta: {mark.gross_exposure:.2f}")
+    print("--------------------------\n")
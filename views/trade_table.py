@@ -0,0 +1,271 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from models.trade import TradeResult
+
+def _risk_reward(trade: TradeResult) -> float:
+    # Stop no preço de entrada: sem risco definido
+    return trade.risk_reward if trade.loss else float('inf')
+
+# Colunas da tabela: (título, chave de ordenação, formatação do texto exibido)
+COLUMNS: Tuple[Tuple[str, Callable[[TradeResult], object], Callable[[object], str]], ...] = (
+    ("#", lambda trade: trade.id, str),
+    ("Tipo", lambda trade: trade.type.value, str.upper),
+    ("Entrada", lambda trade: trade.entry, str),
+    ("Alvo", lambda trade: trade.target, str),
+    ("Stop", lambda trade: trade.stop, str),
+    ("Ganho Potencial", lambda trade: trade.gain, lambda value: f"${value:.2f}"),
+    ("Perda Potencial", lambda trade: trade.loss, lambda value: f"${value:.2f}"),
+    ("Risco/Recompensa", _risk_reward, lambda value: f"{value:.2f}:1"),
+)
+
+# Colunas da marcação a mercado, calculadas de (preço atual, PnL não realizado)
+MARK_COLUMNS: Tuple[Tuple[str, int, Callable[[float], str]], ...] = (
+    ("Preço Atual", 0, str),
+    ("PnL Não Realizado", 1, lambda value: f"${value:.2f}"),
+)
+
+# Operações sem preço ficam no início da ordem crescente
+_NO_MARK = float('-inf')
+
+class Row(NamedTuple):
+    keys: tuple
+    texts: tuple
+
+def _fingerprint(trade: TradeResult) -> tuple:
+    """Campos dos quais as colunas dependem (a linha só é refeita se mudarem)"""
+    return (trade.type, trade.entry, trade.target, trade.stop, trade.position_size_percent, trade.leverage)
+
+def _build_row(trade: TradeResult, mark: Optional[Tuple[float, float]] = None) -> Row:
+    keys = tuple(key(trade) for _, key, _ in COLUMNS)
+    texts = tuple(fmt(value) for (_, _, fmt), value in zip(COLUMNS, keys))
+    if mark is None:
+        return Row(keys + (_NO_MARK,) * len(MARK_COLUMNS), texts + ("-",) * len(MARK_COLUMNS))
+    mark_keys = tuple(mark[index] for _, index, _ in MARK_COLUMNS)
+    mark_texts = tuple(fmt(value) for (_, _, fmt), value in zip(MARK_COLUMNS, mark_keys))
+    return Row(keys + mark_keys, texts + mark_texts)
+
+@dataclass
+class TableDiff:
+    """IDs incluídos, alterados e removidos em uma atualização"""
+    added: List[int] = field(default_factory=list)
+    changed: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+class OpenTradesModel:
+    """Linhas da tabela de operações abertas, independentes do Tk
+
+    update() compara os trades recebidos com os atuais por ID e só formata
+    as linhas novas ou alteradas; update_marks() faz o mesmo com os preços
+    do feed (colunas de MARK_COLUMNS). A ordem é mantida em uma lista de chaves
+    (valor da coluna, ID) pré-calculadas: poucas alterações são aplicadas por
+    busca binária e a troca de coluna reordena sem recalcular nada.
+    """
+
+    def __init__(self):
+        self.rows: Dict[int, Row] = {}
+        self._trades: Dict[int, TradeResult] = {}
+        self._fingerprints: Dict[int, tuple] = {}
+        self._marks: Dict[int, Tuple[float, float]] = {}
+        self._order: List[int] = []
+        self._keys: List[tuple] = []
+        self.sort_column = 0
+        self.descending = False
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _sort_key(self, trade_id: int) -> tuple:
+        return (self.rows[trade_id].keys[self.sort_column], trade_id)
+
+    def _resort(self) -> None:
+        self._order = sorted(self.rows, key=self._sort_key)
+        self._keys = [self._sort_key(trade_id) for trade_id in self._order]
+
+    def _unlink(self, key: tuple) -> None:
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._order[position]
+
+    def update(self, trades: Iterable[TradeResult]) -> TableDiff:
+        """Aplica o estado atual dos trades abertos e retorna o que mudou"""
+        diff = TableDiff()
+        old_keys: Dict[int, tuple] = {}
+        seen = set()
+        for trade in trades:
+            seen.add(trade.id)
+            fingerprint = _fingerprint(trade)
+            previous = self._fingerprints.get(trade.id)
+            if previous == fingerprint:
+                continue
+            if previous is None:
+                diff.added.append(trade.id)
+            else:
+                diff.changed.append(trade.id)
+                old_keys[trade.id] = self._sort_key(trade.id)
+            self._fingerprints[trade.id] = fingerprint
+            self._trades[trade.id] = trade
+            self.rows[trade.id] = _build_row(trade, self._marks.get(trade.id))
+        for trade_id in self.rows.keys() - seen:
+            diff.removed.append(trade_id)
+            old_keys[trade_id] = self._sort_key(trade_id)
+        return self._reorder(diff, old_keys)
+
+    def update_marks(self, marks: Dict[int, Tuple[float, float]]) -> TableDiff:
+        """Aplica {id: (preço atual, PnL não realizado)} e refaz só as linhas cujo preço mudou"""
+        diff = TableDiff()
+        old_keys: Dict[int, tuple] = {}
+        previous, self._marks = self._marks, marks
+        for trade_id, trade in self._trades.items():
+            mark = marks.get(trade_id)
+            if mark == previous.get(trade_id):
+                continue
+            diff.changed.append(trade_id)
+            old_keys[trade_id] = self._sort_key(trade_id)
+            self.rows[trade_id] = _build_row(trade, mark)
+        return self._reorder(diff, old_keys)
+
+    def _reorder(self, diff: TableDiff, old_keys: Dict[int, tuple]) -> TableDiff:
+        """Atualiza a ordem após um diff (old_keys: chaves anteriores das linhas alteradas e removidas)"""
+        if not diff:
+            return diff
+        for trade_id in diff.removed:
+            # Remoção adiada: as chaves antigas já foram calculadas
+            del self.rows[trade_id], self._fingerprints[trade_id], self._trades[trade_id]
+        if len(old_keys) + len(diff.added) > len(self.rows) // 8:
+            self._resort()
+            return diff
+        for key in old_keys.values():
+            self._unlink(key)
+        for trade_id in diff.added + diff.changed:
+            key = self._sort_key(trade_id)
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._order.insert(position, trade_id)
+        return diff
+
+    def sort_by(self, column: int) -> None:
+        """Ordena pela coluna (clicar de novo na mesma coluna inverte a ordem)"""
+        if column == self.sort_column:
+            self.descending = not self.descending
+            return
+        self.sort_column = column
+        self.descending = False
+        self._resort()
+
+    def window(self, first: int, count: int) -> List[int]:
+        """IDs das linhas first..first+count na ordem exibida"""
+        if not self.descending:
+            return self._order[first:first + count]
+        end = len(self._order) - first
+        return self._order[max(end - count, 0):end][::-1]
+
+class VirtualTradeTable:
+    """Treeview que mantém só as linhas visíveis do OpenTradesModel
+
+    Rolagem e redimensionamento trocam apenas os itens que entram e saem da
+    janela; os itens usam o ID do trade como iid, então a seleção sobrevive
+    às atualizações.
+    """
+
+    def __init__(self, parent, model: Optional[OpenTradesModel] = None, row_height: int = 20):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.model = model or OpenTradesModel()
+        self.row_height = row_height
+        self.first = 0
+        self.visible_rows = 20
+        self._shown: List[int] = []
+
+        self.frame = ttk.Frame(parent)
+        titles = [title for title, _, _ in COLUMNS + MARK_COLUMNS]
+        self.tree = ttk.Treeview(self.frame, columns=titles, show="headings", selectmode="browse",
+                                 height=self.visible_rows)
+        for index, title in enumerate(titles):
+            self.tree.heading(title, text=title, command=lambda index=index: self.sort_by(index))
+            self.tree.column(title, width=100)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(1, 'units'))
+
+    def pack(self, **kwargs) -> None:
+        self.frame.pack(**kwargs)
+
+    def update(self, trades: Iterable[TradeResult]) -> TableDiff:
+        diff = self.model.update(trades)
+        if diff:
+            self.render(set(diff.changed))
+        return diff
+
+    def update_marks(self, marks: Dict[int, Tuple[float, float]]) -> TableDiff:
+        diff = self.model.update_marks(marks)
+        if diff:
+            self.render(set(diff.changed))
+        return diff
+
+    def sort_by(self, column: int) -> None:
+        self.model.sort_by(column)
+        self.render()
+
+    def selected_id(self) -> Optional[int]:
+        selected = self.tree.selection()
+        return int(selected[0]) if selected else None
+
+    def scroll(self, amount: int, unit: str) -> None:
+        step = self.visible_rows if unit == 'pages' else 1
+        self.first += amount * step
+        self.render()
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == 'moveto':
+            self.first = int(float(amount) * len(self.model))
+            self.render()
+        else:
+            self.scroll(int(amount), unit)
+
+    def _on_resize(self, event) -> None:
+        # Cabeçalho ocupa aproximadamente uma linha
+        rows = max(1, event.height // self.row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def render(self, changed: Iterable[int] = ()) -> None:
+        """Sincroniza os itens do Treeview com a janela visível"""
+        total = len(self.model)
+        self.first = min(max(self.first, 0), max(total - self.visible_rows, 0))
+        ids = self.model.window(self.first, self.visible_rows)
+        wanted = set(ids)
+        stale = [str(trade_id) for trade_id in self._shown if trade_id not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        shown = set(self._shown) - set(int(iid) for iid in stale)
+        changed = set(changed)
+        # Espelho da ordem atual dos itens, para mover só os que estão fora do lugar
+        current = [trade_id for trade_id in self._shown if trade_id in shown]
+        for position, trade_id in enumerate(ids):
+            iid = str(trade_id)
+            if trade_id not in shown:
+                self.tree.insert('', position, iid=iid, values=self.model.rows[trade_id].texts)
+                current.insert(position, trade_id)
+                continue
+            if trade_id in changed:
+                self.tree.item(iid, values=self.model.rows[trade_id].texts)
+            if current[position] != trade_id:
+                current.remove(trade_id)
+                current.insert(position, trade_id)
+                self.tree.move(iid, '', position)
+        self._shown = ids
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + len(ids)) / total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,104 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Intervalo com que o loop do Tk recolhe os resultados da thread
+POLL_INTERVAL_MS = 50
+
+@dataclass
+class _Command:
+    func: Callable[..., Any]
+    args: Tuple
+    on_done: Optional[Callable[[Any], None]]
+    on_error: Optional[Callable[[Exception], None]]
+    key: Optional[str]
+
+class ServiceWorker:
+    """Executa as chamadas ao TradeService em uma thread, fora do loop do Tk
+
+    Os comandos rodam em série, na ordem de envio, então o TradeService (que
+    não é thread-safe) só é usado por essa thread. Os resultados voltam por
+    uma fila recolhida com root.after: on_done/on_error sempre executam na
+    thread do Tk. Comandos com a mesma key que ainda não começaram são
+    agrupados (vale o último envio).
+    """
+
+    def __init__(self, root, on_busy: Optional[Callable[[bool], None]] = None):
+        self.root = root
+        self.on_busy = on_busy
+        self._commands: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._pending_keys: Dict[str, _Command] = {}
+        self._keys_lock = threading.Lock()
+        self._in_flight = 0
+        self._thread = threading.Thread(target=self._run, name='gui-worker', daemon=True)
+        self._thread.start()
+        self._poll_id = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight > 0
+
+    def submit(self, func: Callable[..., Any], *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               key: Optional[str] = None) -> None:
+        """Enfileira func(*args); chamado apenas na thread do Tk"""
+        with self._keys_lock:
+            pending = self._pending_keys.get(key) if key is not None else None
+            if pending is not None:
+                pending.func, pending.args = func, args
+                pending.on_done, pending.on_error = on_done, on_error
+                return
+            command = _Command(func, args, on_done, on_error, key)
+            if key is not None:
+                self._pending_keys[key] = command
+        self._in_flight += 1
+        if self._in_flight == 1 and self.on_busy:
+            self.on_busy(True)
+        self._commands.put(command)
+
+    def _run(self) -> None:
+        while True:
+            command = self._commands.get()
+            if command is None:
+                return
+            with self._keys_lock:
+                if command.key is not None:
+                    self._pending_keys.pop(command.key, None)
+                func, args = command.func, command.args
+                on_done, on_error = command.on_done, command.on_error
+            try:
+                self._results.put((on_done, func(*args), None))
+            except Exception as e:
+                self._results.put((on_error, None, e))
+
+    def _poll(self) -> None:
+        self._deliver()
+        self._poll_id = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _deliver(self) -> None:
+        while True:
+            try:
+                callback, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._in_flight -= 1
+            if self._in_flight == 0 and self.on_busy:
+                self.on_busy(False)
+            if error is not None:
+                if callback is None:
+                    # Mesmo tratamento de uma exceção em callback do Tk
+                    self.root.report_callback_exception(type(error), error, error.__traceback__)
+                else:
+                    callback(error)
+            elif callback is not None:
+                callback(result)
+
+    def stop(self) -> None:
+        """Espera os comandos já enviados terminarem e encerra a thread"""
+        self.root.after_cancel(self._poll_id)
+        self._commands.put(None)
+        self._thread.join()
+        self._deliver()